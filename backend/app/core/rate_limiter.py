@@ -37,4 +37,166 @@ class RateLimiter:
             self.request_timestamps.popleft()
         
         # Adiciona o timestamp da nova requisição
-        self.request_timestamps.append(time.time())
\ No newline at end of file
+        self.request_timestamps.append(time.time())
+
+class AdaptiveRateLimiter:
+    """
+    Limitador de taxa adaptativo (token bucket + AIMD) compartilhado por todo o processo.
+
+    - Taxa (requisições/s): sobe aditivamente a cada sucesso e cai
+      multiplicativamente a cada 429, no máximo uma vez por janela de throttle.
+    - `Retry-After`: pausa global, de modo que todos os chamadores esperam
+      juntos em vez de cada corrotina dormir por conta própria.
+    - Concorrência: o número de requisições em voo é ajustado pelo gradiente
+      entre a latência mínima observada e a latência recente (estilo Netflix
+      concurrency-limits), encolhendo quando a API começa a enfileirar.
+    """
+    def __init__(
+        self,
+        rate: float = 10.0,
+        min_rate: float = 1.0,
+        max_rate: float = 50.0,
+        burst: float = 10.0,
+        additive_increase: float = 0.1,
+        multiplicative_decrease: float = 0.5,
+        concurrency: int = 10,
+        min_concurrency: int = 2,
+        max_concurrency: int = 50,
+        latency_tolerance: float = 1.5,
+        default_cooldown: float = 5.0,
+        max_cooldown: float = 60.0,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.concurrency_limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.default_cooldown = default_cooldown
+        self.max_cooldown = max_cooldown
+
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.consecutive_throttles = 0
+        self.in_flight = 0
+        self.waiters = deque()
+
+        # Latências (segundos): mínima de referência e média móvel recente
+        self.min_latency: float = None
+        self.recent_latency: float = None
+
+        self.throttled_total = 0
+        self.acquired_total = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self):
+        """
+        Aguarda até que a pausa global tenha passado, haja vaga de concorrência
+        e um token disponível; então ocupa uma vaga.
+        """
+        while True:
+            now = time.monotonic()
+            if self.blocked_until > now:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            if self.in_flight >= int(self.concurrency_limit):
+                waiter = asyncio.get_running_loop().create_future()
+                self.waiters.append(waiter)
+                try:
+                    await waiter
+                finally:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+                continue
+
+            self._refill(now)
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            self.tokens -= 1
+            self.in_flight += 1
+            self.acquired_total += 1
+            return
+
+    def release(self):
+        """Libera a vaga ocupada por `acquire` e acorda quem espera por concorrência."""
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        free_slots = int(self.concurrency_limit) - self.in_flight
+        while free_slots > 0 and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+    def on_success(self, latency: float):
+        """Registra uma resposta bem-sucedida: aumento aditivo da taxa e ajuste da concorrência."""
+        self.consecutive_throttles = 0
+        self.rate = min(self.max_rate, self.rate + self.additive_increase)
+
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        else:
+            # Deixa a referência "esquecer" devagar, para acompanhar mudanças na API
+            self.min_latency += (latency - self.min_latency) * 0.001
+        self.recent_latency = latency if self.recent_latency is None else self.recent_latency * 0.9 + latency * 0.1
+
+        gradient = max(0.5, min(1.0, self.latency_tolerance * self.min_latency / self.recent_latency))
+        headroom = self.concurrency_limit ** 0.5
+        new_limit = self.concurrency_limit * gradient + headroom
+        # Suaviza para evitar oscilações bruscas
+        self.concurrency_limit = max(
+            self.min_concurrency,
+            min(self.max_concurrency, self.concurrency_limit * 0.8 + new_limit * 0.2),
+        )
+        self._wake_waiters()
+
+    def on_throttle(self, retry_after: float = None):
+        """
+        Registra um 429: pausa global (honrando `Retry-After` quando presente)
+        e redução multiplicativa da taxa e da concorrência.
+        """
+        now = time.monotonic()
+        self.throttled_total += 1
+        self.consecutive_throttles += 1
+
+        if retry_after is None:
+            retry_after = min(self.max_cooldown, self.default_cooldown * 2 ** (self.consecutive_throttles - 1))
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+        # Vários 429 da mesma rajada contam como um único sinal de congestionamento
+        if now - self.last_decrease >= max(retry_after, 1.0):
+            self.last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.multiplicative_decrease)
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit * self.multiplicative_decrease)
+            self.tokens = 0
+            logging.info(
+                f"--- [RATE LIMITER] 429 recebido. Pausando {retry_after:.1f}s; "
+                f"taxa={self.rate:.2f} req/s, concorrência={int(self.concurrency_limit)} ---"
+            )
+
+    def stats(self) -> dict:
+        """Retorna o estado atual do limitador."""
+        return {
+            "rate": round(self.rate, 2),
+            "concurrency_limit": int(self.concurrency_limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            "acquired_total": self.acquired_total,
+            "throttled_total": self.throttled_total,
+            "min_latency": self.min_latency,
+            "recent_latency": self.recent_latency,
+        }
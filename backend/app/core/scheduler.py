@@ -3,7 +3,8 @@ import logging
 # app/core/scheduler.py
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 # Importa a nova função mestre do nosso serviço de automação
-from app.services.automation_service import run_daily_update_task
+from app.services.automation_service import run_daily_update_task, run_freshness_refresh_task
+from app.core.settings import settings
 
 scheduler = AsyncIOScheduler(timezone="America/Sao_Paulo")
 
@@ -23,5 +24,19 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # Atualização contínua: a cada ciclo, os registros mais defasados em relação
+    # à própria volatilidade, dentro do orçamento de requisições por hora.
+    # A tarefa diária acima continua descobrindo registros novos e pontuando.
+    if settings.FRESHNESS_SCHEDULER_ENABLED:
+        scheduler.add_job(
+            run_freshness_refresh_task,
+            'interval',
+            minutes=settings.FRESHNESS_CYCLE_MINUTES,
+            id='freshness_refresh_task',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+    
     logging.info("Agendador iniciado com as tarefas configuradas.")
     scheduler.start()
\ No newline at end of file
@@ -16,6 +16,45 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: Optional[str] = None
     CI_ENV: str = CI_ENV
 
+    # Endereço da API de Dados Abertos; aponte para o substituto local
+    # (scripts/camara_standin.py) para testes e benchmarks sem rede
+    CAMARA_API_BASE_URL: str = "https://dadosabertos.camara.leg.br/api/v2"
+
+    # Pool de conexões do cliente da API da Câmara
+    CAMARA_API_MAX_CONNECTIONS: int = 20
+    CAMARA_API_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    CAMARA_API_KEEPALIVE_EXPIRY: float = 30.0
+    CAMARA_API_HTTP2: bool = False  # requer o pacote opcional 'h2'
+
+    # Limitador adaptativo de requisições à API da Câmara
+    CAMARA_API_RATE_LIMIT: float = 10.0  # taxa inicial (req/s)
+    CAMARA_API_MIN_RATE_LIMIT: float = 1.0
+    CAMARA_API_MAX_RATE_LIMIT: float = 50.0
+    CAMARA_API_CONCURRENCY: int = 10  # requisições simultâneas iniciais
+    CAMARA_API_MAX_CONCURRENCY: int = 50
+    CAMARA_API_PAGE_CONCURRENCY: int = 5  # páginas de uma listagem buscadas em paralelo
+
+    # Cache local de respostas da API da Câmara (requisições condicionais + TTL)
+    CAMARA_API_CACHE_ENABLED: bool = True
+    CAMARA_API_CACHE_PATH: str = ".cache/camara_api.sqlite3"
+    CAMARA_API_CACHE_MAX_AGE_DAYS: int = 30  # entradas mais velhas são descartadas
+    CAMARA_API_CACHE_MAX_ENTRIES: int = 200_000
+
+    # Atualização contínua por defasagem (ver src/services/freshness_scheduler.py)
+    FRESHNESS_SCHEDULER_ENABLED: bool = False  # inicia o agendador no lifespan da aplicação
+    FRESHNESS_REQUEST_BUDGET_PER_HOUR: int = 600  # requisições à API por hora
+    FRESHNESS_CYCLE_MINUTES: int = 10
+
+    # Monitoramento contínuo de proposições novas (comando `poll` ou junto com a API)
+    PROPOSITION_POLLER_ENABLED: bool = False  # inicia o monitor no lifespan da aplicação
+    PROPOSITION_POLLER_SESSION_INTERVAL: float = 60.0  # segundos, em horário de sessão
+    PROPOSITION_POLLER_OFF_HOURS_INTERVAL: float = 900.0  # segundos, fora do horário de sessão
+
+    # Arquivo comprimido dos payloads brutos (tabela raw_payloads, comando `reprocess`);
+    # usa zstd com o pacote opcional 'zstandard' e zlib sem ele
+    RAW_ARCHIVE_ENABLED: bool = True
+    RAW_ARCHIVE_COMPRESSION_LEVEL: int = 3
+
     model_config = SettingsConfigDict(env_file=env_file, extra="ignore")
 
 settings = Settings()
\ No newline at end of file
@@ -3,38 +3,364 @@ import logging
 # camara_insights/app/infra/camara_api.py
 import httpx
 import asyncio
+import copy
+import importlib.util
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+from app.core.settings import settings
+from app.core.rate_limiter import AdaptiveRateLimiter
+from app.infra.response_cache import ResponseCache
+
+# Limitador único do processo: scripts de sync, automation_service e os
+# endpoints da API compartilham o mesmo orçamento de requisições.
+camara_rate_limiter = AdaptiveRateLimiter(
+    rate=settings.CAMARA_API_RATE_LIMIT,
+    min_rate=settings.CAMARA_API_MIN_RATE_LIMIT,
+    max_rate=settings.CAMARA_API_MAX_RATE_LIMIT,
+    concurrency=settings.CAMARA_API_CONCURRENCY,
+    max_concurrency=settings.CAMARA_API_MAX_CONCURRENCY,
+)
+
+
+class IncompletePaginationError(Exception):
+    """Uma página de um endpoint paginado não pôde ser obtida (modo `strict`)."""
+    def __init__(self, endpoint: str, page: int):
+        super().__init__(f"Página {page} de {endpoint} não pôde ser obtida.")
+        self.endpoint = endpoint
+        self.page = page
+
 
 class CamaraAPI:
-    def __init__(self, base_url: str = "https://dadosabertos.camara.leg.br/api/v2"):
+    """
+    Cliente da API de Dados Abertos da Câmara.
+
+    Mantém um único `httpx.AsyncClient` por processo (e por event loop), com
+    pool de conexões limitado e keep-alive, para que milhares de chamadas de
+    detalhe reutilizem um punhado de conexões em vez de abrir um novo
+    handshake TCP+TLS a cada requisição.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.CAMARA_API_BASE_URL,
+        max_connections: int = settings.CAMARA_API_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.CAMARA_API_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.CAMARA_API_KEEPALIVE_EXPIRY,
+        http2: bool = settings.CAMARA_API_HTTP2,
+        timeout: float = 30.0,
+        rate_limiter: AdaptiveRateLimiter = camara_rate_limiter,
+        cache: Optional[ResponseCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.base_url = base_url
+        # Transporte alternativo (ex.: httpx.ASGITransport do substituto local da API)
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and self._http2_available()
+        self.timeout = timeout
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Contadores de ocupação do pool
+        self.requests_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+
+        # Single-flight: requisições idênticas em andamento, por chave, com o
+        # número de chamadas que se juntaram a cada uma
+        self._pending: Dict[str, list] = {}
+        self.coalesced = 0
 
-    async def get(self, endpoint: str, params: dict = None, retries: int = 3, backoff_factor: int = 60):
+        # Classe do último erro por endpoint, enquanto ele não voltar a responder
+        self.errors: Dict[str, str] = {}
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """HTTP/2 depende do pacote opcional `h2` (pip install httpx[http2])."""
+        if importlib.util.find_spec("h2") is None:
+            logging.warning("HTTP/2 solicitado, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+            return False
+        return True
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Retorna o cliente compartilhado, criando-o sob demanda.
+        Um AsyncClient fica preso ao event loop em que foi usado, então um novo
+        cliente é criado se o loop corrente mudou (ex.: vários `asyncio.run`).
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                transport=self.transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Hook de trace do httpcore: conta conexões novas abertas pelo pool."""
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de uso e ocupação do pool de conexões."""
+        open_connections = None
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None and self._client is not None and not self._client.is_closed:
+            open_connections = len(pool.connections)
+        return {
+            "requests_total": self.requests_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "connections_opened": self.connections_opened,
+            "open_connections": open_connections,
+            "max_connections": self.limits.max_connections,
+            "http2": self.http2,
+            "rate_limiter": self.rate_limiter.stats(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "coalesced": self.coalesced,
+        }
+
+    @staticmethod
+    def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+        """Interpreta o cabeçalho Retry-After (segundos ou data HTTP)."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def failure_reason(self, endpoint: str) -> Optional[str]:
+        """Classe do erro da última falha em `endpoint` (ex.: 'HTTP 503', 'ReadTimeout')."""
+        return self.errors.get(endpoint)
+
+    async def get(self, endpoint: str, params: dict = None, retries: int = 5, use_cache: bool = True):
         """
         Método GET com lógica de retry para lidar com o erro 429 (Too Many Requests).
+        A espera entre tentativas é coordenada pelo limitador compartilhado,
+        que honra o cabeçalho Retry-After.
+
+        Com o cache habilitado, respostas ainda frescas são servidas localmente
+        e as demais são revalidadas com uma requisição condicional.
+        `use_cache=False` força uma ida à API sem consultar nem gravar o cache.
+
+        Chamadas idênticas simultâneas são agrupadas em uma única requisição
+        (single-flight). Quando houve agrupamento, cada chamada, inclusive a
+        que disparou a requisição, recebe a sua própria cópia do resultado, já
+        que os chamadores alteram o payload no lugar.
         """
+        key = f"{ResponseCache.make_key(endpoint, params)}#{use_cache}"
+        entry = self._pending.get(key)
+        if entry is not None:
+            self.coalesced += 1
+            entry[1] += 1
+            # shield: cancelar um dos interessados não cancela a requisição dos demais
+            result = await asyncio.shield(entry[0])
+            return copy.deepcopy(result)
+
+        task = asyncio.ensure_future(self._get(endpoint, params, retries, use_cache))
+        entry = self._pending[key] = [task, 0]
+        task.add_done_callback(lambda _: self._pending.pop(key, None))
+        result = await asyncio.shield(task)
+        # Os seguidores só se juntam antes do fim da tarefa: a contagem já é final
+        return copy.deepcopy(result) if entry[1] else result
+
+    async def _get(self, endpoint: str, params: Optional[dict], retries: int, use_cache: bool):
         url = f"{self.base_url}{endpoint}"
+        client = self._get_client()
+
+        cache_key = cached = None
+        headers = {}
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cache_key = cache.make_key(endpoint, params)
+            # O cache é um SQLite síncrono: consultas e gravações rodam numa thread
+            cached = await asyncio.to_thread(cache.lookup, cache_key)
+            if cached is not None:
+                if cached.is_fresh(cache.ttl_for(endpoint)):
+                    cache.hits += 1
+                    return cached.json()
+                headers = cached.validators()
+
         for attempt in range(retries):
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.get(url, params=params, timeout=30.0)
-                    response.raise_for_status()
-                    return response.json()
-                except httpx.HTTPStatusError as e:
-                    # Se o erro for 429, espera e tenta novamente
-                    if e.response.status_code == 429:
-                        wait_time = backoff_factor * (attempt + 1)
-                        logging.info(f"Erro 429 - Too Many Requests. Aguardando {wait_time} segundos para tentar novamente...")
-                        await asyncio.sleep(wait_time)
-                        continue # Próxima tentativa
-                    else:
-                        logging.error(f"HTTP error occurred: {e}")
-                        return None
-                except httpx.RequestError as e:
-                    logging.error(f"An error occurred while requesting {e.request.url!r}.")
-                    return None
-        
+            await self.rate_limiter.acquire()
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            started = time.monotonic()
+            try:
+                response = await client.get(url, params=params, headers=headers, extensions={"trace": self._trace})
+                # Se o erro for 429, o limitador pausa todos os chamadores e tentamos novamente
+                if response.status_code == 429:
+                    retry_after = self._parse_retry_after(response)
+                    logging.info(f"Erro 429 - Too Many Requests em {url} (Retry-After: {retry_after}).")
+                    self.rate_limiter.on_throttle(retry_after)
+                    continue # Próxima tentativa
+                if response.status_code == 304 and cached is not None:
+                    self.rate_limiter.on_success(time.monotonic() - started)
+                    await asyncio.to_thread(cache.touch, cache_key)
+                    cache.revalidated += 1
+                    return cached.json()
+                response.raise_for_status()
+                self.rate_limiter.on_success(time.monotonic() - started)
+                self.errors.pop(endpoint, None)
+                data = response.json()
+                if cache is not None:
+                    cache.misses += 1
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if cache.is_cacheable(endpoint, etag, last_modified):
+                        await asyncio.to_thread(cache.store, cache_key, response.text, etag, last_modified)
+                return data
+            except httpx.HTTPStatusError as e:
+                logging.error(f"HTTP error occurred: {e}")
+                self.errors[endpoint] = f"HTTP {e.response.status_code}"
+                return None
+            except httpx.RequestError as e:
+                logging.error(f"An error occurred while requesting {e.request.url!r}.")
+                self.errors[endpoint] = type(e).__name__
+                return None
+            finally:
+                self.in_flight -= 1
+                self.rate_limiter.release()
+
         logging.error(f"Falha ao obter dados de {url} após {retries} tentativas.")
+        self.errors[endpoint] = "TooManyRequests"
         return None
 
+    @staticmethod
+    def _link(response: Dict[str, Any], rel: str) -> Optional[str]:
+        return next((link['href'] for link in response.get('links', []) if link.get('rel') == rel), None)
+
+    @classmethod
+    def last_page(cls, response: Dict[str, Any]) -> Optional[int]:
+        """Número da última página, lido do link `last` da resposta paginada."""
+        href = cls._link(response, 'last')
+        if not href:
+            return None
+        try:
+            return int(parse_qs(urlparse(href).query)['pagina'][0])
+        except (KeyError, IndexError, ValueError):
+            return None
+
+    async def paginate(
+        self, endpoint: str, params: dict = None, concurrency: int = settings.CAMARA_API_PAGE_CONCURRENCY,
+        strict: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Itera sobre todos os itens de um endpoint paginado.
+
+        A primeira página revela a última (link `last`); as demais são buscadas
+        em paralelo, com no máximo `concurrency` páginas em voo, e os itens são
+        entregues à medida que cada página chega (sem ordem garantida entre páginas).
+        Sem link `last`, recai na navegação sequencial pelo link `next`.
+
+        Com `strict=True`, uma página que falha levanta `IncompletePaginationError`
+        em vez de ser pulada, para quem precisa saber que recebeu a lista completa.
+        """
+        params = dict(params or {})
+        first_page = int(params.get('pagina', 1))
+        params['pagina'] = first_page
+
+        response = await self.get(endpoint, params=params)
+        if response is None and strict:
+            raise IncompletePaginationError(endpoint, first_page)
+        if not (response and response.get('dados')):
+            return
+        for item in response['dados']:
+            yield item
+
+        last_page = self.last_page(response)
+        if last_page is None:
+            page = first_page
+            while self._link(response, 'next') and self._link(response, 'next') != self._link(response, 'self'):
+                page += 1
+                response = await self.get(endpoint, params={**params, 'pagina': page})
+                if response is None and strict:
+                    raise IncompletePaginationError(endpoint, page)
+                if not (response and response.get('dados')):
+                    break
+                for item in response['dados']:
+                    yield item
+            return
+
+        remaining = iter(range(first_page + 1, last_page + 1))
+        pending = {}
+
+        def schedule():
+            for page in remaining:
+                task = asyncio.ensure_future(self.get(endpoint, params={**params, 'pagina': page}))
+                pending[task] = page
+                if len(pending) >= concurrency:
+                    break
+
+        schedule()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = pending.pop(task)
+                    page_response = task.result()
+                    if page_response is None and strict:
+                        raise IncompletePaginationError(endpoint, page)
+                    if not (page_response and page_response.get('dados')):
+                        logging.warning(f"Página {page} de {endpoint} veio vazia ou com erro.")
+                        continue
+                    for item in page_response['dados']:
+                        yield item
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        """Fecha o cliente compartilhado e libera as conexões do pool."""
+        if self._client is not None and not self._client.is_closed:
+            stats = self.pool_stats()
+            logging.info(
+                f"Fechando cliente da API da Câmara: {stats['requests_total']} requisições "
+                f"em {stats['connections_opened']} conexões (pico de {stats['peak_in_flight']} simultâneas)."
+            )
+            if stats["cache"]:
+                logging.info(f"Cache de respostas: {stats['cache']}")
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.prune)
+            self.cache.close()
+
+    # Alias mantido para os scripts que chamam `close()`
+    close = aclose
+
 
-camara_api_client = CamaraAPI()
\ No newline at end of file
+camara_api_client = CamaraAPI(
+    cache=ResponseCache(
+        settings.CAMARA_API_CACHE_PATH,
+        max_age=settings.CAMARA_API_CACHE_MAX_AGE_DAYS * 24 * 3600,
+        max_entries=settings.CAMARA_API_CACHE_MAX_ENTRIES,
+    ) if settings.CAMARA_API_CACHE_ENABLED else None,
+)
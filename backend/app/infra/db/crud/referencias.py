@@ -3,6 +3,7 @@ import logging
 # camara_insights/app/infra/db/crud/referencias.py
 from sqlalchemy.orm import Session
 from app.infra.db.models import referencias as models
+from src.data.upsert import bulk_upsert
 
 def upsert_referencia(db: Session, model, data: dict):
     """
@@ -35,11 +36,23 @@ def upsert_referencia(db: Session, model, data: dict):
 def bulk_upsert_referencias(db: Session, model, data_list: list[dict]):
     """
     Realiza o upsert de uma lista de dados de referência de forma eficiente.
+    Os registros existentes são localizados pelo 'nome' numa única consulta
+    e a gravação usa INSERT ... ON CONFLICT pela chave primária.
+    Retorna quantos registros foram inseridos ou de fato alterados.
     """
+    fields = {c.name for c in model.__table__.columns}
+    pk_column = model.__table__.primary_key.columns.values()[0].name
+    existing = dict(db.query(model.nome, getattr(model, pk_column)).all()) if 'nome' in fields else {}
+
+    rows = []
     for item_data in data_list:
         # Omitir chaves que não estão no modelo para evitar erros
-        fields = {c.name for c in model.__table__.columns}
         filtered_data = {k: v for k, v in item_data.items() if k in fields}
-        upsert_referencia(db, model, filtered_data)
-    
-    db.commit()
\ No newline at end of file
+        # Registro já existente: mantém a chave primária gravada
+        if filtered_data.get('nome') in existing:
+            filtered_data[pk_column] = existing[filtered_data['nome']]
+        rows.append(filtered_data)
+
+    written = bulk_upsert(db, model, rows).written
+    db.commit()
+    return written
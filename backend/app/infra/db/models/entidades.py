@@ -2,7 +2,7 @@ import logging
 
 # camara_insights/app/infra/db/models/entidades.py
 from sqlalchemy import (Column, Integer, String, Text, Date, DateTime,
-                        ForeignKey, JSON, Float, Table)
+                        ForeignKey, JSON, Float, Table, UniqueConstraint)
 from sqlalchemy.orm import relationship
 from .referencias import Base
 
@@ -53,6 +53,8 @@ class Deputado(Base):
     ultimoStatus_condicaoEleitoral = Column(String, nullable=True)
     ultimoStatus_descricaoStatus = Column(Text, nullable=True)
 
+    content_hash = Column(String(64), nullable=True)
+
 class Proposicao(Base):
     __tablename__ = "proposicoes"
     id = Column(Integer, primary_key=True, index=True)
@@ -92,6 +94,8 @@ class Proposicao(Base):
     statusProposicao_ambito = Column(String, nullable=True)
     statusProposicao_apreciacao = Column(String, nullable=True)
 
+    content_hash = Column(String(64), nullable=True)
+
     autores = relationship("Deputado", secondary=proposicao_autores, backref="proposicoes_autoradas")
     votacoes = relationship("Votacao", back_populates="proposicao")
     
@@ -124,6 +128,8 @@ class Partido(Base):
     urlWebSite = Column(String, nullable=True)
     urlFacebook = Column(String, nullable=True)
 
+    content_hash = Column(String(64), nullable=True)
+
 class Orgao(Base):
     __tablename__ = "orgaos"
     id = Column(Integer, primary_key=True, index=True)
@@ -137,6 +143,8 @@ class Orgao(Base):
     dataInicio = Column(Date, nullable=True)
     dataFim = Column(Date, nullable=True)
 
+    content_hash = Column(String(64), nullable=True)
+
 class Evento(Base):
     __tablename__ = "eventos"
     id = Column(Integer, primary_key=True, index=True)
@@ -149,6 +157,8 @@ class Evento(Base):
     localExterno = Column(String, nullable=True)
     localCamara_nome = Column(String, nullable=True)
 
+    content_hash = Column(String(64), nullable=True)
+
     participantes = relationship("Deputado", secondary=evento_deputados, backref="eventos_participados")
 
 class Votacao(Base):
@@ -164,6 +174,8 @@ class Votacao(Base):
     aprovacao = Column(Integer, nullable=True)
     proposicao_id = Column(Integer, ForeignKey('proposicoes.id'), nullable=True, index=True)
 
+    content_hash = Column(String(64), nullable=True)
+
     # Adicione o back_populates para completar o relacionamento
     proposicao = relationship("Proposicao", back_populates="votacoes")
 
@@ -181,9 +193,14 @@ class Despesa(Base):
     nomeFornecedor = Column(String)
     cnpjCpfFornecedor = Column(String, index=True)
     urlDocumento = Column(String, nullable=True)
+    codDocumento = Column(Integer, nullable=True)
+    parcela = Column(Integer, nullable=True)
 
     deputado = relationship("Deputado")
 
+    # Chave natural usada pela sincronização incremental das tabelas filhas
+    __table_args__ = (UniqueConstraint('deputado_id', 'codDocumento', 'parcela', name='uq_despesas_documento'),)
+
 class Discurso(Base):
     __tablename__ = "discursos"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -195,6 +212,8 @@ class Discurso(Base):
 
     deputado = relationship("Deputado")
 
+    __table_args__ = (UniqueConstraint('deputado_id', 'dataHoraInicio', name='uq_discursos_deputado_inicio'),)
+
 class Voto(Base):
     __tablename__ = "votos"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -205,6 +224,8 @@ class Voto(Base):
     votacao = relationship("Votacao")
     deputado = relationship("Deputado")
 
+    __table_args__ = (UniqueConstraint('votacao_id', 'deputado_id', name='uq_votos_votacao_deputado'),)
+
 class Tramitacao(Base):
     __tablename__ = "tramitacoes"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -216,6 +237,8 @@ class Tramitacao(Base):
     despacho = Column(Text)
 
     proposicao = relationship("Proposicao")
+
+    __table_args__ = (UniqueConstraint('proposicao_id', 'sequencia', name='uq_tramitacoes_proposicao_sequencia'),)
     
 class Frente(Base):
     __tablename__ = "frentes"
@@ -0,0 +1,124 @@
+import logging
+
+# camara_insights/app/infra/db/models/sync.py
+# Tabelas de controle da sincronização (não espelham entidades da Câmara).
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, UniqueConstraint
+from datetime import datetime
+from .referencias import Base
+
+class SyncState(Base):
+    """
+    Marca d'água (high-watermark) da última sincronização bem-sucedida
+    de um endpoint com um determinado conjunto de parâmetros.
+    """
+    __tablename__ = "sync_state"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    endpoint = Column(String, nullable=False)
+    params_key = Column(String, nullable=False)  # JSON canônico dos parâmetros fixos
+    watermark = Column(String, nullable=True)  # data ISO ou ID
+    records_synced = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint('endpoint', 'params_key', name='uq_sync_state_endpoint_params'),)
+
+class SyncCheckpoint(Base):
+    """
+    Progresso durável de uma etapa de sincronização longa, para retomada após falha.
+    `completed_ranges` guarda intervalos [início, fim) de posições de `discovered`
+    já gravadas no banco.
+    """
+    __tablename__ = "sync_checkpoints"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_key = Column(String, unique=True, nullable=False, index=True)
+    status = Column(String, nullable=False, default="running")  # running | done
+    discovered = Column(JSON, nullable=True)  # URIs ou IDs de pais, na ordem de processamento
+    completed_ranges = Column(JSON, nullable=True)
+    failed = Column(JSON, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SyncFreshness(Base):
+    """
+    Quando cada registro (ou partição, como uma tabela de referência) foi
+    atualizado pela última vez e com que frequência ele costuma mudar.
+    O agendador de atualização revisita primeiro os itens mais atrasados em
+    relação ao próprio intervalo, que encolhe quando o item muda e cresce
+    quando não muda.
+    """
+    __tablename__ = "sync_freshness"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # nome da tabela ou 'referencias'
+    record_id = Column(String, nullable=False)  # chave do registro ou endpoint da partição
+    tier = Column(String, nullable=False)  # classe de volatilidade (ex.: ativa, arquivada)
+    interval_seconds = Column(Integer, nullable=False)  # intervalo de revisita atual
+    last_synced_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    next_due_at = Column(DateTime, nullable=False, index=True)
+    checks = Column(Integer, nullable=False, default=0)
+    changes = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint('entity', 'record_id', name='uq_sync_freshness_entity_record'),)
+
+class SyncDeadLetter(Base):
+    """
+    Itens de trabalho cuja busca falhou (URI de detalhe ou pai de uma tabela
+    filha), guardados para nova tentativa com backoff em `retry-failed`, em vez
+    de ficarem faltando até a próxima sincronização completa.
+    """
+    __tablename__ = "sync_dead_letters"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # detail | child | authors
+    entity = Column(String, nullable=False)  # tabela de destino
+    work_item = Column(String, nullable=False)  # URI do detalhe ou ID do pai
+    context = Column(JSON, nullable=True)  # o necessário para refazer a busca (endpoint, parâmetros...)
+    error_class = Column(String, nullable=True)  # ex.: HTTP 503, ReadTimeout, TooManyRequests
+    attempts = Column(Integer, nullable=False, default=1)
+    status = Column(String, nullable=False, default="pending")  # pending | resolved | abandoned
+    first_failed_at = Column(DateTime, default=datetime.utcnow)
+    last_failed_at = Column(DateTime, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, nullable=True, index=True)
+
+    __table_args__ = (UniqueConstraint('kind', 'entity', 'work_item', name='uq_sync_dead_letters_item'),)
+
+class BackfillJob(Base):
+    """
+    Partição (entidade × ano × mês) de um backfill histórico, drenada por
+    vários processos trabalhadores. Um trabalhador só processa a partição
+    enquanto detém a concessão (`lease_owner` até `lease_expires_at`); se ele
+    morrer, a concessão expira e outro trabalhador retoma a partição.
+    """
+    __tablename__ = "backfill_jobs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_key = Column(String, unique=True, nullable=False, index=True)  # ex.: proposicoes:2021-03
+    entity = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=True)  # nulo para partições anuais
+    phase = Column(Integer, nullable=False, default=0)  # só roda depois de todas as fases anteriores
+    status = Column(String, nullable=False, default="pending", index=True)  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_owner = Column(String, nullable=True)  # host:pid do trabalhador
+    lease_expires_at = Column(DateTime, nullable=True)
+    records_synced = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RawPayload(Base):
+    """
+    Arquivo do `dados` bruto de cada resposta buscada, comprimido (zstd ou
+    zlib), para refazer a transformação localmente com `reprocess` quando um
+    modelo ganha colunas ou um bug de achatamento é corrigido, sem baixar tudo
+    de novo. Uma versão é guardada por conteúdo distinto de cada URI; buscar
+    de novo o mesmo conteúdo só atualiza `fetched_at`.
+    """
+    __tablename__ = "raw_payloads"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False, index=True)  # tabela de destino
+    uri = Column(String, nullable=False)  # endpoint buscado, com os parâmetros fixos
+    parent_fk = Column(String, nullable=True)  # coluna do pai, para payloads de tabelas filhas
+    parent_id = Column(String, nullable=True)
+    payload_hash = Column(String, nullable=False)  # SHA-256 do JSON descomprimido
+    codec = Column(String, nullable=False)  # zstd | zlib
+    payload = Column(LargeBinary, nullable=False)
+    first_fetched_at = Column(DateTime, default=datetime.utcnow)
+    fetched_at = Column(DateTime, default=datetime.utcnow)  # última vez que este conteúdo foi visto
+
+    __table_args__ = (UniqueConstraint('uri', 'payload_hash', name='uq_raw_payloads_uri_hash'),)
@@ -0,0 +1,182 @@
+import logging
+
+# camara_insights/app/infra/response_cache.py
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+# Tempo (segundos) em que uma resposta é considerada fresca sem consultar a API,
+# por família de endpoint. Fora dessas famílias, a resposta só é reaproveitada
+# via requisição condicional (ETag/Last-Modified).
+DEFAULT_TTLS: List[Tuple[str, int]] = [
+    (r"^/referencias/", 7 * 24 * 3600),
+    (r"^/(deputados|partidos|orgaos)/\d+$", 24 * 3600),
+    (r"^/(frentes|blocos|grupos)/\d+$", 24 * 3600),
+]
+
+
+@dataclass
+class CachedResponse:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: int) -> bool:
+        return ttl > 0 and (time.time() - self.fetched_at) < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Cabeçalhos para a requisição condicional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """
+    Cache local (SQLite) das respostas da API da Câmara, chaveado por URL + parâmetros.
+
+    Guarda ETag/Last-Modified para requisições condicionais e aplica um TTL
+    por família de endpoint. A conexão é aberta sob demanda e refeita após um
+    fork, para que vários processos possam compartilhar o mesmo arquivo.
+
+    O arquivo não cresce sem limite: `prune` descarta as entradas mais velhas
+    que `max_age` segundos e as que passarem de `max_entries`, a cada
+    `prune_every` gravações e no fechamento do cliente. Os métodos são
+    síncronos (o CamaraAPI os chama numa thread) e protegidos por um lock.
+    """
+    def __init__(self, path: str, ttls: List[Tuple[str, int]] = None, max_age: Optional[float] = None,
+                 max_entries: Optional[int] = None, prune_every: int = 5000):
+        self.path = path
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._stores_since_prune = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+                " body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        if not params:
+            return endpoint
+        return f"{endpoint}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+    def ttl_for(self, endpoint: str) -> int:
+        for pattern, ttl in self.ttls:
+            if pattern.search(endpoint):
+                return ttl
+        return 0
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def store(self, key: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, etag, last_modified, body, time.time()),
+            )
+            self._stores_since_prune += 1
+            if self._stores_since_prune >= self.prune_every:
+                self.prune()
+
+    def touch(self, key: str) -> None:
+        """Renova o `fetched_at` de uma entrada confirmada por um 304."""
+        with self._lock:
+            self._connection().execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def is_cacheable(self, endpoint: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        """Só vale guardar o que pode ser reaproveitado: via TTL ou via validadores."""
+        return self.ttl_for(endpoint) > 0 or bool(etag or last_modified)
+
+    def count(self, prefix: str = "") -> int:
+        """Número de entradas cuja chave começa com `prefix`."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM responses WHERE key LIKE ?", (f"{prefix}%",)
+            ).fetchone()[0]
+
+    def count_fresh(self, prefix: str = "") -> int:
+        """Número de entradas ainda dentro do TTL da sua família cuja chave começa com `prefix`."""
+        now = time.time()
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, fetched_at FROM responses WHERE key LIKE ?", (f"{prefix}%",)
+            ).fetchall()
+        return sum(1 for key, fetched_at in rows if now - fetched_at < self.ttl_for(key.split("?")[0]))
+
+    def purge(self, older_than: float) -> int:
+        """Remove entradas buscadas há mais de `older_than` segundos."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - older_than,)
+            )
+            return cursor.rowcount
+
+    def trim(self, max_entries: int) -> int:
+        """Mantém só as `max_entries` entradas buscadas mais recentemente."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)", (max_entries,)
+            )
+            return cursor.rowcount
+
+    def prune(self) -> int:
+        """Aplica os limites de idade e de tamanho configurados."""
+        with self._lock:
+            self._stores_since_prune = 0
+            removed = self.purge(self.max_age) if self.max_age else 0
+            if self.max_entries:
+                removed += self.trim(self.max_entries)
+        if removed:
+            logging.info(f"Cache de respostas: {removed} entradas antigas removidas.")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
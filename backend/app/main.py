@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import logging
 from fastapi import FastAPI, Depends
 from contextlib import asynccontextmanager
@@ -7,6 +9,8 @@ from sqlalchemy import text
 
 # Import the scheduler and API routers
 from app.core.scheduler import start_scheduler
+from app.core.settings import settings
+from app.services.automation_service import run_proposition_poller
 from app.api.v1 import deputados, proposicoes, partidos, orgaos, eventos, votacoes
 from app.infra.db.session import SessionLocal
 from app.infra.camara_api import camara_api_client
@@ -18,9 +22,16 @@ async def lifespan(app: FastAPI):
     # Code to be executed on startup
     logging.info("--- Application starting ---")
     start_scheduler()
+    poller_task = asyncio.create_task(run_proposition_poller()) if settings.PROPOSITION_POLLER_ENABLED else None
     yield
     # Code to be executed on shutdown
     logging.info("--- Application shutting down ---")
+    if poller_task is not None:
+        poller_task.cancel()
+        # Let the poller finish unwinding (request, DB write) before the client is closed
+        with contextlib.suppress(asyncio.CancelledError):
+            await poller_task
+    await camara_api_client.aclose()
 
 
 app = FastAPI(
@@ -77,7 +88,7 @@ async def health_check(db: Session = Depends(get_db)):
     # Check Câmara API connectivity
     try:
         # A simple request to a lightweight endpoint
-        response = await camara_api_client.get("/referencias/proposicoes/codTema")
+        response = await camara_api_client.get("/referencias/proposicoes/codTema", use_cache=False)
         if not response:
             camara_api_status = "error"
     except Exception as e:
@@ -7,10 +7,12 @@ from typing import Dict, Any, List, Type
 from datetime import datetime, timedelta
 
 # Importações de sincronização
-from app.infra.camara_api import camara_api_client
 from app.infra.db.models import entidades as models_entidades
-from app.infra.db.crud.entidades import upsert_entidade
 from app.infra.db.models.entidades import Base
+from src.services.data_sync_service import DataSyncService
+from src.services.freshness_scheduler import FreshnessScheduler
+from src.services.proposition_poller import PropositionPoller
+from app.core.settings import settings
 
 # Importações de scoring
 from app.infra.db.session import SessionLocal
@@ -20,60 +22,58 @@ from app.services.scoring_service import analyze_and_score_propositions
 
 # --- Lógica de Sincronização (Adaptada do sync_all.py) ---
 
-async def fetch_and_save_detail(db: Session, model: Type[Base], item_uri: str):
-    """ Busca os detalhes de uma entidade específica e salva no banco. """
-    try:
-        endpoint_path = item_uri.replace(camara_api_client.base_url, "")
-        detail_response = await camara_api_client.get(endpoint=endpoint_path)
-        if detail_response and 'dados' in detail_response:
-            upsert_entidade(db, model, detail_response['dados'])
-    except Exception as e:
-        logging.error(f"Erro ao processar a URI {item_uri}: {e}")
-
-async def sync_entity(db: Session, model: Type[Base], endpoint: str, params: Dict[str, Any] = {}):
-    """ Função genérica para sincronizar uma entidade (descoberta + enriquecimento). """
-    logging.info(f"--- [SYNC] Iniciando descoberta para {model.__tablename__}... ---")
-    summary_data: List[Dict[str, Any]] = []
-    next_url: str = f"{camara_api_client.base_url}{endpoint}"
-    current_params = params.copy()
-    
-    while next_url:
-        clean_endpoint = next_url.replace(camara_api_client.base_url, '')
-        api_response = await camara_api_client.get(endpoint=clean_endpoint)
-        if not (api_response and 'dados' in api_response):
-            break
-            
-        summary_data.extend(api_response['dados'])
-        self_link = next((link for link in api_response.get('links', []) if link['rel'] == 'self'), None)
-        next_link = next((link for link in api_response.get('links', []) if link['rel'] == 'next'), None)
-        next_url = None if (next_link and self_link and next_link['href'] == self_link['href']) else (next_link['href'] if next_link else None)
-
-    if summary_data:
-        logging.info(f"--- [SYNC] {len(summary_data)} itens descobertos. Iniciando enriquecimento... ---")
-        tasks = [fetch_and_save_detail(db, model, item['uri']) for item in summary_data if 'uri' in item]
-        batch_size = 10
-        for i in range(0, len(tasks), batch_size):
-            await asyncio.gather(*tasks[i:i + batch_size])
-        db.commit()
+async def sync_entity_incremental(db: Session, model: Type[Base], endpoint: str, params: Dict[str, Any],
+                                  default_since: str, overlap_days: int = 1):
+    """
+    Sincroniza apenas o que mudou desde a última execução bem-sucedida,
+    usando a marca d'água gravada em `sync_state` para o endpoint e parâmetros.
+    A marca d'água só avança quando todas as páginas e detalhes foram obtidos
+    (ver DataSyncService.sync_incremental); senão, a próxima execução repete a janela.
+    """
+    logging.info(f"--- [SYNC] Sincronização incremental de {model.__tablename__}... ---")
+    await DataSyncService(db).sync_incremental(model, endpoint, params, overlap_days=overlap_days,
+                                               default_since=default_since)
 
 async def run_full_sync():
     """ Executa a sincronização de todas as entidades principais. """
     db = SessionLocal()
     try:
-        # Para a sincronização diária, só precisamos buscar dados recentes.
-        # Buscamos os últimos 2 dias para garantir que não perdemos nada.
+        # Sem marca d'água (primeira execução), buscamos os últimos 2 dias.
         two_days_ago = (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d')
         
-        # Sincroniza apenas o que muda com frequência
-        await sync_entity(db, models_entidades.Proposicao, "/proposicoes", 
-                            params={'dataApresentacaoInicio': two_days_ago, 'itens': 100, 'ordem': 'ASC', 'ordenarPor': 'id'})
-        await sync_entity(db, models_entidades.Votacao, "/votacoes", 
-                            params={'dataInicio': two_days_ago, 'itens': 100, 'ordem': 'ASC', 'ordenarPor': 'id'})
+        # Sincroniza apenas o que muda com frequência. Para proposições, `dataInicio`
+        # filtra pela data da última tramitação: cobre as novas e as que andaram.
+        await sync_entity_incremental(db, models_entidades.Proposicao, "/proposicoes",
+                                      params={'itens': 100, 'ordem': 'ASC', 'ordenarPor': 'id'},
+                                      default_since=two_days_ago)
+        await sync_entity_incremental(db, models_entidades.Votacao, "/votacoes",
+                                      params={'itens': 100, 'ordem': 'ASC', 'ordenarPor': 'id'},
+                                      default_since=two_days_ago)
         # Outras entidades como deputados e partidos mudam com menos frequência e podem ter outra rotina
     finally:
         db.close()
 
 
+async def run_freshness_refresh_task():
+    """
+    Revisita os registros mais defasados em relação à própria volatilidade
+    (proposições ativas e eventos próximos com frequência, arquivados e
+    referências raramente), dentro do orçamento de requisições por hora.
+    """
+    db = SessionLocal()
+    try:
+        scheduler = FreshnessScheduler(
+            db,
+            budget_per_hour=settings.FRESHNESS_REQUEST_BUDGET_PER_HOUR,
+            cycle_minutes=settings.FRESHNESS_CYCLE_MINUTES,
+        )
+        await scheduler.run_cycle()
+    except Exception as e:
+        logging.error(f"--- [FRESHNESS] Erro no ciclo de atualização: {e}")
+    finally:
+        db.close()
+
+
 # --- Lógica de Scoring (Adaptada do score_propositions.py) ---
 
 async def run_scoring_task():
@@ -92,6 +92,61 @@ async def run_scoring_task():
         db.close()
 
 
+# --- Monitoramento Contínuo de Proposições Novas ---
+
+SCORING_BATCH_SIZE = 15
+
+async def _scoring_worker(queue: asyncio.Queue):
+    """ Consome a fila de proposições novas e as envia para análise em lotes. """
+    while True:
+        ids = [await queue.get()]
+        while not queue.empty() and len(ids) < SCORING_BATCH_SIZE:
+            ids.append(queue.get_nowait())
+        db = SessionLocal()
+        try:
+            propositions = db.query(models_entidades.Proposicao).filter(models_entidades.Proposicao.id.in_(ids)).all()
+            await analyze_and_score_propositions(db, propositions)
+        except Exception as e:
+            logging.error(f"--- [POLLER] Erro ao analisar as proposições {ids}: {e}")
+        finally:
+            db.close()
+            for _ in ids:
+                queue.task_done()
+
+async def run_proposition_poller(max_polls: int = None, score: bool = True):
+    """
+    Monitora /proposicoes continuamente: cada proposição nova tem detalhes e
+    autores sincronizados na hora e entra na fila de análise de IA.
+    Com `max_polls`, para após esse número de consultas (e espera a fila esvaziar).
+    """
+    db = SessionLocal()
+    queue: asyncio.Queue = asyncio.Queue()
+    worker = asyncio.create_task(_scoring_worker(queue)) if score else None
+
+    async def enqueue(proposition_ids: List[int]):
+        for proposition_id in proposition_ids:
+            queue.put_nowait(proposition_id)
+
+    poller = PropositionPoller(
+        db,
+        on_new=enqueue if score else None,
+        session_interval=settings.PROPOSITION_POLLER_SESSION_INTERVAL,
+        off_hours_interval=settings.PROPOSITION_POLLER_OFF_HOURS_INTERVAL,
+    )
+    logging.info("--- [POLLER] Monitorando proposições novas... ---")
+    try:
+        await poller.run(max_polls)
+        if worker is not None:
+            await queue.join()
+    finally:
+        if worker is not None:
+            worker.cancel()
+            # A análise em andamento termina de desfazer antes de a sessão ser fechada
+            await asyncio.gather(worker, return_exceptions=True)
+        db.close()
+        logging.info(f"--- [POLLER] Encerrado após {poller.polls} consultas, {poller.found} proposições novas. ---")
+
+
 # --- Tarefa Principal do Agendador ---
 
 async def run_daily_update_task():
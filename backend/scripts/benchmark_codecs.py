@@ -0,0 +1,133 @@
+import logging
+
+# camara_insights/scripts/benchmark_codecs.py
+# Mede o custo de CPU da transformação payload da API -> linha do banco, comparando
+# a implementação anterior (achatamento recursivo + varredura das colunas + dateutil
+# em toda data) com os codecs compilados por modelo de src.data.codecs.
+#
+# Uso: python scripts/benchmark_codecs.py [--records 100000]
+import argparse
+import os
+import random
+import sys
+import time
+from collections.abc import MutableMapping
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateutil.parser import parse
+from sqlalchemy import Date, DateTime
+
+from app.infra.db.models.entidades import Deputado, Proposicao, Voto
+from src.data.codecs import get_codec
+
+
+def gerar_fixture(n: int, seed: int = 42) -> list:
+    """Payloads sintéticos no formato dos endpoints de detalhe e de votos."""
+    rng = random.Random(seed)
+    fixture = []
+    for i in range(n):
+        tipo = i % 3
+        if tipo == 0:
+            fixture.append((Proposicao, {
+                "id": i, "uri": f"/proposicoes/{i}", "siglaTipo": "PL", "codTipo": 139,
+                "numero": rng.randint(1, 5000), "ano": 2023, "ementa": "Dispõe sobre " * 5,
+                "dataApresentacao": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:{rng.randint(0, 59):02d}",
+                "statusProposicao": {
+                    "dataHora": "2024-03-01T15:30", "sequencia": rng.randint(1, 80),
+                    "siglaOrgao": "PLEN", "regime": "Ordinário", "descricaoSituacao": "Aguardando Parecer",
+                    "codSituacao": 924, "despacho": "Às Comissões", "ambito": "Regimental",
+                },
+                "uriAutores": f"/proposicoes/{i}/autores", "keywords": "saúde,educação",
+            }))
+        elif tipo == 1:
+            fixture.append((Deputado, {
+                "id": i, "uri": f"/deputados/{i}", "nomeCivil": "Fulano de Tal", "cpf": "00000000000",
+                "sexo": "M", "dataNascimento": "1970-05-17", "dataFalecimento": None,
+                "ufNascimento": "SP", "municipioNascimento": "São Paulo", "escolaridade": "Superior",
+                "redeSocial": ["https://x.com/fulano"],
+                "ultimoStatus": {
+                    "id": i, "nome": "Fulano", "siglaPartido": "ABC", "siglaUf": "SP",
+                    "idLegislatura": 57, "data": "2023-02-01", "nomeEleitoral": "Fulano",
+                    "situacao": "Exercício", "condicaoEleitoral": "Titular",
+                    "gabinete": {"nome": "401", "predio": "4", "sala": "401", "andar": "4",
+                                 "telefone": "3215-5401", "email": "dep@camara.leg.br"},
+                },
+            }))
+        else:
+            fixture.append((Voto, {
+                "votacao_id": f"2401234-{i}", "tipoVoto": rng.choice(["Sim", "Não", "Abstenção"]),
+                "dataRegistroVoto": "2024-05-02T18:41:12",
+                "deputado_": {"id": rng.randint(1, 9999), "nome": "Fulano", "siglaPartido": "ABC",
+                              "siglaUf": "SP", "idLegislatura": 57},
+            }))
+    return fixture
+
+
+# --- Implementação anterior, mantida aqui apenas como referência de desempenho ---
+
+def _flatten_dict(d, parent_key='', sep='_'):
+    items = []
+    for k, v in d.items():
+        new_key = parent_key + sep + k if parent_key else k
+        if isinstance(v, MutableMapping):
+            items.extend(_flatten_dict(v, new_key, sep=sep).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def transformacao_legada(data, model):
+    flattened_data = _flatten_dict(data)
+    model_columns = {c.name: c.type for c in model.__table__.columns}
+    filtered_data = {k: v for k, v in flattened_data.items() if k in model_columns}
+    for key, value in filtered_data.items():
+        if value is None:
+            continue
+        column_type = model_columns.get(key)
+        if isinstance(column_type, (Date, DateTime)) and isinstance(value, str):
+            try:
+                parsed_datetime = parse(value)
+                filtered_data[key] = parsed_datetime.date() if isinstance(column_type, Date) else parsed_datetime
+            except (ValueError, TypeError):
+                filtered_data[key] = None
+    if model.__name__ == 'Voto':
+        filtered_data['deputado_id'] = flattened_data.get('deputado__id', filtered_data.get('deputado_id'))
+        filtered_data['voto'] = flattened_data.get('tipoVoto', filtered_data.get('voto'))
+    return filtered_data
+
+
+def transformacao_codec(data, model):
+    return get_codec(model).decode(data)
+
+
+def medir(nome, transformar, fixture):
+    inicio = time.perf_counter()
+    for model, data in fixture:
+        transformar(data, model)
+    duracao = time.perf_counter() - inicio
+    print(f"{nome:<10} {duracao:>8.2f}s {len(fixture) / duracao:>12,.0f} registros/s")
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da transformação de payloads")
+    parser.add_argument('--records', type=int, default=100_000, help='Tamanho da fixture sintética')
+    args = parser.parse_args()
+
+    fixture = gerar_fixture(args.records)
+
+    # As duas implementações precisam produzir as mesmas linhas
+    for model, data in fixture[:300]:
+        esperado, obtido = transformacao_legada(data, model), transformacao_codec(data, model)
+        if esperado != obtido:
+            raise SystemExit(f"Divergência em {model.__tablename__}: {esperado} != {obtido}")
+
+    print(f"{args.records} registros (proposições, deputados e votos)")
+    legado = medir("legado", transformacao_legada, fixture)
+    codec = medir("codec", transformacao_codec, fixture)
+    print(f"Aceleração: {legado / codec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import logging
+
+# camara_insights/scripts/benchmark_sync.py
+# Mede a vazão da sincronização de ponta a ponta (DataSyncService) contra o
+# substituto local da API (scripts/camara_standin.py, servido em processo via
+# httpx.ASGITransport) e um banco descartável, em vários fatores de escala.
+#
+# Por etapa (detalhes de deputados/proposições/votações, tabelas filhas e
+# autores), reporta registros/s, requisições/s, tempo gasto no banco e o pico
+# de memória (RSS) medido durante a etapa, amostrado em /proc/self/statm (só
+# no Linux); o pico acumulado do processo (ru_maxrss) vai junto no JSON, mas
+# não distingue etapas, pois nunca diminui. Grava os resultados em JSON. Com
+# --baseline, compara com uma execução anterior e termina com código 1 se
+# alguma etapa ficou mais lenta que o limite (--threshold).
+#
+# Uso:
+#   python scripts/benchmark_sync.py --scales 0.1 0.5 --output bench.json
+#   python scripts/benchmark_sync.py --scales 0.1 0.5 --baseline bench.json --threshold 0.15
+# Sem --database-url, usa um SQLite temporário. ATENÇÃO: com --database-url as
+# tabelas do banco informado são apagadas e recriadas a cada escala.
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_URL = "http://standin/api/v2"
+
+
+class DBTimer:
+    """Soma o tempo de execução de cursores no engine (inclui a thread de gravação)."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            self.seconds += elapsed
+
+
+def rss_atual_mb():
+    """RSS atual do processo, ou None onde não há /proc (ex.: macOS)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            paginas = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class PicoRSS:
+    """Amostra o RSS numa thread enquanto uma etapa roda e guarda o maior valor visto."""
+
+    def __init__(self, intervalo: float = 0.05):
+        self.intervalo = intervalo
+        self.pico = rss_atual_mb()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._registrar()
+
+    def _registrar(self):
+        atual = rss_atual_mb()
+        if atual is not None and (self.pico is None or atual > self.pico):
+            self.pico = atual
+
+    def __enter__(self):
+        if self.pico is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread.is_alive():
+            self._parar.set()
+            self._thread.join()
+        self._registrar()
+
+    def mb(self):
+        return None if self.pico is None else round(self.pico, 1)
+
+
+def pico_rss_processo_mb() -> float:
+    # Pico desde o início do processo; ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def etapas(models, ano: int):
+    """(nome, corrotina que recebe o serviço e devolve o número de registros)"""
+    async def contar(coro):
+        resultado = await coro
+        return len(resultado) if isinstance(resultado, list) else resultado
+
+    return [
+        ("deputados", lambda s: contar(s.sync_entity_with_details(
+            models.Deputado, "/deputados", {"itens": 100, "ordem": "ASC", "ordenarPor": "nome"}))),
+        ("proposicoes", lambda s: contar(s.sync_entity_with_details(
+            models.Proposicao, "/proposicoes", {"ano": ano, "itens": 100, "ordem": "ASC", "ordenarPor": "id"}))),
+        ("votacoes", lambda s: contar(s.sync_entity_with_details(
+            models.Votacao, "/votacoes", {"dataInicio": f"{ano}-01-01", "dataFim": f"{ano}-12-31", "itens": 100}))),
+        ("votos", lambda s: contar(s.sync_child_entities(
+            models.Votacao, models.Voto, "/votacoes/{id}/votos", "votacao_id", paginated=False))),
+        ("tramitacoes", lambda s: contar(s.sync_child_entities(
+            models.Proposicao, models.Tramitacao, "/proposicoes/{id}/tramitacoes", "proposicao_id", paginated=False))),
+        ("despesas", lambda s: contar(s.sync_child_entities(
+            models.Deputado, models.Despesa, "/deputados/{id}/despesas", "deputado_id",
+            params={"ano": ano, "itens": 100}))),
+        ("autores-por-proposicao", lambda s: contar(s.sync_proposition_authors(strategy="per-proposition"))),
+        ("autores-por-deputado", lambda s: contar(s.sync_proposition_authors(strategy="by-deputy"))),
+    ]
+
+
+async def medir_escala(engine, escala: float, args) -> list:
+    import httpx
+    from sqlalchemy.orm import sessionmaker
+    from app.infra.camara_api import camara_api_client
+    from app.infra.db.models import entidades as models
+    from app.infra.db.models.referencias import Base
+    import app.infra.db.models.sync  # noqa: F401 (tabelas de controle usadas pela sincronização)
+    from scripts.camara_standin import StandinConfig, create_app
+    from src.services.data_sync_service import DataSyncService
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    standin = create_app(StandinConfig(
+        scale=escala, seed=args.seed, start_year=args.year,
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+    ))
+    await camara_api_client.aclose()
+    camara_api_client.base_url = BASE_URL
+    camara_api_client.transport = httpx.ASGITransport(app=standin)
+    camara_api_client.cache = None
+
+    timer = DBTimer(engine)
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    resultados = []
+    try:
+        service = DataSyncService(session, concurrency_limit=args.concurrency, batch_size=args.batch_size)
+        for nome, executar in etapas(models, args.year):
+            requisicoes, banco = camara_api_client.requests_total, timer.seconds
+            inicio = time.perf_counter()
+            with PicoRSS() as memoria:
+                registros = await executar(service)
+            segundos = time.perf_counter() - inicio
+            feitas = camara_api_client.requests_total - requisicoes
+            resultados.append({
+                "scale": escala,
+                "stage": nome,
+                "records": registros,
+                "seconds": round(segundos, 3),
+                "records_per_sec": round(registros / segundos, 1) if segundos else None,
+                "requests": feitas,
+                "requests_per_sec": round(feitas / segundos, 1) if segundos else None,
+                "db_seconds": round(timer.seconds - banco, 3),
+                "stage_peak_rss_mb": memoria.mb(),
+                "process_peak_rss_mb": pico_rss_processo_mb(),
+            })
+    finally:
+        session.close()
+        await camara_api_client.aclose()
+    return resultados
+
+
+def comparar(resultados: list, baseline: dict, limite: float) -> list:
+    """Etapas cuja vazão (registros/s) caiu mais que `limite` em relação à execução de referência."""
+    anteriores = {(r["scale"], r["stage"]): r for r in baseline.get("results", [])}
+    regressoes = []
+    for atual in resultados:
+        anterior = anteriores.get((atual["scale"], atual["stage"]))
+        if not anterior or not anterior.get("records_per_sec") or atual["records_per_sec"] is None:
+            continue
+        variacao = atual["records_per_sec"] / anterior["records_per_sec"] - 1
+        atual["change_vs_baseline"] = round(variacao, 3)
+        if variacao < -limite:
+            regressoes.append(atual)
+    return regressoes
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão da sincronização")
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.1, 0.5], help='Fatores de escala do substituto')
+    parser.add_argument('--database-url', help='Banco descartável a usar (padrão: SQLite temporário)')
+    parser.add_argument('--year', type=int, default=2023)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latência injetada pelo substituto')
+    parser.add_argument('--latency-sigma', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=10, help='concurrency_limit do DataSyncService')
+    parser.add_argument('--batch-size', type=int, default=50, help='batch_size do DataSyncService')
+    parser.add_argument('--rate-limit', type=float, default=1000.0,
+                        help='Taxa do limitador do cliente (req/s); alta para medir a sincronização, não o limitador')
+    parser.add_argument('--output', help='Arquivo JSON com os resultados')
+    parser.add_argument('--baseline', help='Resultados JSON de referência para detectar regressões')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Queda máxima tolerada de registros/s (fração)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'benchmark.sqlite3')}"
+        # As configurações são lidas na importação do app: definidas antes dela
+        os.environ.setdefault("DATABASE_URL", url)
+        os.environ["CAMARA_API_CACHE_ENABLED"] = "false"
+        os.environ["CAMARA_API_RATE_LIMIT"] = str(args.rate_limit)
+        os.environ["CAMARA_API_MAX_RATE_LIMIT"] = str(args.rate_limit)
+        logging.disable(logging.WARNING)
+
+        from sqlalchemy import create_engine
+        engine = create_engine(url)
+
+        resultados = []
+        for escala in args.scales:
+            print(f"--- Escala {escala} ---")
+            resultados += asyncio.run(medir_escala(engine, escala, args))
+        engine.dispose()
+
+    print(f"\nBanco: {engine.dialect.name} | latência injetada: {args.latency_ms} ms")
+    print(f"{'escala':>7} {'etapa':<24}{'registros':>10}{'reg/s':>10}{'req/s':>9}{'banco (s)':>11}{'RSS etapa (MB)':>16}")
+    for r in resultados:
+        print(f"{r['scale']:>7} {r['stage']:<24}{r['records']:>10}{r['records_per_sec'] or 0:>10,.0f}"
+              f"{r['requests_per_sec'] or 0:>9,.0f}{r['db_seconds']:>11.2f}"
+              f"{'-' if r['stage_peak_rss_mb'] is None else format(r['stage_peak_rss_mb'], '.1f'):>16}")
+
+    regressoes = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.threshold)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "commit": commit_atual(),
+                "database": engine.dialect.name,
+                "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "database_url")},
+                "results": resultados,
+            }, arquivo, indent=2)
+        print(f"Resultados gravados em {args.output}")
+
+    if regressoes:
+        print(f"\nRegressões acima de {args.threshold:.0%}:")
+        for r in regressoes:
+            print(f"  escala {r['scale']} {r['stage']}: {r['change_vs_baseline']:+.1%} de registros/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import logging
+
+# camara_insights/scripts/benchmark_upsert.py
+# Compara a vazão (linhas/s) das estratégias de gravação na tabela de proposições:
+# o upsert antigo linha a linha (SELECT + setattr), o upsert nativo por dialeto
+# de src.data.upsert e o carregador em massa de src.data.copy_loader (COPY no
+# PostgreSQL), na carga inicial e em re-sincronizações.
+#
+# Uso: python scripts/benchmark_upsert.py --rows 20000 [--database-url postgresql://...]
+# Sem --database-url, usa um SQLite temporário. As tabelas são recriadas a cada estratégia.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.infra.db.models.entidades import Base, Proposicao
+from src.data.upsert import bulk_upsert
+from src.data.copy_loader import bulk_load
+
+BATCH_SIZE = 500
+
+
+def gerar_linhas(n: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    inicio = datetime(2023, 1, 1)
+    return [
+        {
+            "id": i,
+            "uri": f"https://dadosabertos.camara.leg.br/api/v2/proposicoes/{i}",
+            "siglaTipo": rng.choice(["PL", "PEC", "REQ", "PLP"]),
+            "numero": rng.randint(1, 5000),
+            "ano": 2023,
+            "ementa": f"Ementa da proposição {i} " * rng.randint(1, 8),
+            "dataApresentacao": inicio + timedelta(minutes=i),
+            "statusProposicao_sequencia": rng.randint(1, 50),
+            "statusProposicao_descricaoSituacao": "Aguardando Parecer",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def alterar(linhas: list[dict], fracao: float, seed: int = 7) -> list[dict]:
+    """Cópia das linhas com `fracao` delas alteradas (nova sequência de tramitação)."""
+    rng = random.Random(seed)
+    copia = [dict(linha) for linha in linhas]
+    for linha in rng.sample(copia, int(len(copia) * fracao)):
+        linha["statusProposicao_sequencia"] += 1
+    return copia
+
+
+def orm_linha_a_linha(session, linhas):
+    for inicio in range(0, len(linhas), BATCH_SIZE):
+        for linha in linhas[inicio:inicio + BATCH_SIZE]:
+            obj = session.get(Proposicao, linha["id"])
+            if obj:
+                for chave, valor in linha.items():
+                    setattr(obj, chave, valor)
+            else:
+                session.add(Proposicao(**linha))
+        session.commit()
+
+
+def upsert_nativo(only_changed):
+    def gravar(session, linhas):
+        for inicio in range(0, len(linhas), BATCH_SIZE):
+            bulk_upsert(session, Proposicao, [dict(l) for l in linhas[inicio:inicio + BATCH_SIZE]],
+                        only_changed=only_changed)
+            session.commit()
+    return gravar
+
+
+def carga_em_massa(session, linhas):
+    # Lotes grandes, como os das tabelas filhas
+    for inicio in range(0, len(linhas), BATCH_SIZE * 10):
+        bulk_load(session, Proposicao, [dict(l) for l in linhas[inicio:inicio + BATCH_SIZE * 10]])
+        session.commit()
+
+
+ESTRATEGIAS = {
+    "orm-linha-a-linha": orm_linha_a_linha,
+    "on-conflict": upsert_nativo(only_changed=False),
+    "on-conflict-hash": upsert_nativo(only_changed=True),
+    "bulk-load": carga_em_massa,
+}
+
+
+def medir(engine, gravar, linhas, cenarios) -> dict:
+    Base.metadata.drop_all(bind=engine, tables=[Proposicao.__table__])
+    Base.metadata.create_all(bind=engine, tables=[Proposicao.__table__])
+    Session = sessionmaker(bind=engine)
+    resultados = {}
+    for nome, dados in cenarios:
+        session = Session()
+        try:
+            inicio = time.perf_counter()
+            gravar(session, dados)
+            resultados[nome] = len(dados) / (time.perf_counter() - inicio)
+        finally:
+            session.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das estratégias de upsert")
+    parser.add_argument('--rows', type=int, default=20000, help='Número de proposições sintéticas')
+    parser.add_argument('--database-url', help='Banco a usar (padrão: SQLite temporário)')
+    parser.add_argument('--only', choices=sorted(ESTRATEGIAS), action='append', help='Estratégias a executar')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'benchmark.sqlite3')}"
+        engine = create_engine(url)
+        linhas = gerar_linhas(args.rows)
+        cenarios = [
+            ("carga inicial", linhas),
+            ("sem mudanças", linhas),
+            ("10% alterado", alterar(linhas, 0.10)),
+        ]
+
+        print(f"Banco: {engine.dialect.name} | {args.rows} linhas | lotes de {BATCH_SIZE}")
+        print(f"{'estratégia':<20}" + "".join(f"{nome:>16}" for nome, _ in cenarios))
+        for nome in args.only or ESTRATEGIAS:
+            resultados = medir(engine, ESTRATEGIAS[nome], linhas, cenarios)
+            print(f"{nome:<20}" + "".join(f"{resultados[c]:>12,.0f} l/s" for c, _ in cenarios))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
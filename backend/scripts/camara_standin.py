@@ -0,0 +1,747 @@
+import logging
+
+# camara_insights/scripts/camara_standin.py
+# Substituto local da API de Dados Abertos da Câmara, para exercitar a
+# sincronização (DataSyncService, sync_all, endpoints /details), benchmarks e
+# testes de carga de forma reprodutível, sem acessar dadosabertos.camara.leg.br.
+#
+# - Dados sintéticos determinísticos (semente + fator de escala) para
+#   /deputados, /proposicoes, /votacoes, /eventos, /partidos, /orgaos, os
+#   endpoints filhos (autores, tramitações, votos, despesas, discursos...) e
+#   /referencias/*, com paginação (`pagina`, `itens`, `ordem`, `ordenarPor`) e
+#   links self/next/first/last como na API real.
+# - Gravação/reprodução: com `--fixtures DIR`, respostas gravadas em DIR são
+#   servidas no lugar das sintéticas; com `--record`, o que não estiver gravado
+#   é buscado na API real e salvo em DIR.
+# - Injeção de falhas: latência lognormal (mediana + dispersão), 429 com
+#   Retry-After e erros 5xx com probabilidades configuráveis, e um teto de
+#   requisições por segundo acima do qual o substituto responde 429.
+#
+# Uso:
+#   python scripts/camara_standin.py --port 8001 --scale 0.5 --latency-ms 80 --latency-sigma 0.5 --rate-429 0.02
+#   CAMARA_API_BASE_URL=http://127.0.0.1:8001/api/v2 CAMARA_API_CACHE_ENABLED=false python scripts/main.py sync-all
+#
+# O cache local de respostas é indexado só pelo endpoint, então desligue-o (ou
+# use outro CAMARA_API_CACHE_PATH) ao alternar entre a API real e o substituto.
+# Contadores do substituto: GET /_standin/stats.
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+API_PREFIX = "/api/v2"
+PUBLIC_BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+DEFAULT_ITEMS = 15
+MAX_ITEMS = 100
+
+# (status, corpo JSON)
+Resposta = Tuple[int, Any]
+
+
+@dataclass
+class StandinConfig:
+    """Parâmetros do substituto: volume dos dados sintéticos, falhas e gravação."""
+    scale: float = 1.0  # 1.0 = 513 deputados, 2.000 proposições, 200 votações e 300 eventos por ano
+    seed: int = 42
+    start_year: int = 2023
+    years: int = 1
+    latency_ms: float = 0.0  # mediana da latência por requisição
+    latency_sigma: float = 0.0  # dispersão da lognormal; 0 = latência fixa
+    rate_429: float = 0.0  # probabilidade de responder 429
+    retry_after: float = 1.0  # segundos no cabeçalho Retry-After
+    rate_5xx: float = 0.0  # probabilidade de responder 500/502/503/504
+    max_rps: Optional[float] = None  # acima disso, 429 (como o limite da API real)
+    fixtures_dir: Optional[str] = None
+    record: bool = False
+    upstream: str = PUBLIC_BASE_URL
+    synthetic: bool = True  # sem isso, o que não estiver gravado responde 404
+
+
+# Tabelas de referência do substituto (códigos próprios, consistentes entre si)
+TIPOS_PROPOSICAO = [
+    (139, "PL", "Projeto de Lei"),
+    (136, "PEC", "Proposta de Emenda à Constituição"),
+    (141, "PLP", "Projeto de Lei Complementar"),
+    (291, "REQ", "Requerimento"),
+    (390, "PDL", "Projeto de Decreto Legislativo"),
+]
+SITUACOES_PROPOSICAO = [
+    (924, "Aguardando Parecer"),
+    (1140, "Pronta para Pauta"),
+    (1285, "Aguardando Designação de Relator"),
+    (923, "Arquivada"),
+    (1150, "Transformado em Norma Jurídica"),
+]
+TEMAS = [(40, "Economia"), (46, "Educação"), (56, "Saúde"), (57, "Segurança Pública"), (48, "Meio Ambiente")]
+ORGAOS = [
+    (180, "PLEN", "Plenário", 26),
+    (2003, "CCJC", "Comissão de Constituição e Justiça e de Cidadania", 2),
+    (2004, "CFT", "Comissão de Finanças e Tributação", 2),
+    (2008, "CSAUDE", "Comissão de Saúde", 2),
+    (2009, "CE", "Comissão de Educação", 2),
+]
+PARTIDOS = ["PL", "PT", "UNIÃO", "PP", "MDB", "PSD", "REPUBLICANOS", "PDT", "PSB", "PSDB", "PSOL", "PODE"]
+UFS = ["AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA", "PB", "PE",
+       "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO"]
+TIPOS_EVENTO = [(110, "Sessão Deliberativa"), (112, "Reunião Deliberativa"), (120, "Audiência Pública")]
+TIPOS_DESPESA = ["COMBUSTÍVEIS E LUBRIFICANTES.", "PASSAGEM AÉREA - SIGEPA", "DIVULGAÇÃO DA ATIVIDADE PARLAMENTAR.",
+                 "MANUTENÇÃO DE ESCRITÓRIO DE APOIO À ATIVIDADE PARLAMENTAR"]
+VOTOS = ["Sim", "Não", "Abstenção", "Obstrução"]
+
+REFERENCIAS: Dict[str, List[Dict[str, Any]]] = {
+    "tiposProposicao": [{"cod": cod, "sigla": sigla, "nome": nome, "descricao": nome} for cod, sigla, nome in TIPOS_PROPOSICAO],
+    "proposicoes/codTema": [{"cod": cod, "sigla": "", "nome": nome, "descricao": ""} for cod, nome in TEMAS],
+    "situacoesProposicao": [{"cod": cod, "sigla": "", "nome": nome, "descricao": ""} for cod, nome in SITUACOES_PROPOSICAO],
+    "tiposEvento": [{"cod": cod, "sigla": "", "nome": nome, "descricao": ""} for cod, nome in TIPOS_EVENTO],
+    "tiposOrgao": [{"cod": 2, "sigla": "", "nome": "Comissão Permanente", "descricao": ""},
+                   {"cod": 26, "sigla": "", "nome": "Plenário Virtual", "descricao": ""}],
+    "uf": [{"cod": indice, "sigla": uf, "nome": uf, "descricao": ""} for indice, uf in enumerate(UFS, start=1)],
+}
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M")
+
+
+class SyntheticDataset:
+    """
+    Dados sintéticos gerados a partir de uma semente. As entidades principais
+    ficam em memória; as listas filhas (tramitações, votos, despesas...) são
+    geradas a cada requisição a partir da semente e do ID do pai, então não
+    ocupam memória e respondem sempre igual.
+    """
+
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self.inicio = datetime(config.start_year, 1, 1)
+        self.fim = datetime(config.start_year + config.years, 1, 1)
+        self.legislatura = 57 + (config.start_year - 2023) // 4
+
+        self.deputados = [self._deputado(rng, i) for i in range(max(10, round(513 * min(config.scale, 1.0))))]
+        self.deputados_por_id = {d["id"]: d for d in self.deputados}
+        self.partidos = [self._partido(i, sigla) for i, sigla in enumerate(PARTIDOS)]
+        self.orgaos = [self._orgao(*orgao) for orgao in ORGAOS]
+
+        por_ano = config.scale * config.years
+        self.proposicoes = [self._proposicao(rng, i) for i in range(max(1, round(2000 * por_ano)))]
+        self.proposicoes_por_id = {p["id"]: p for p in self.proposicoes}
+        self.autores = {p["id"]: self._autores(rng) for p in self.proposicoes}
+        self.por_autor: Dict[int, List[int]] = {}
+        for proposicao_id, autores in self.autores.items():
+            for autor in autores:
+                if autor.get("_deputado_id"):
+                    self.por_autor.setdefault(autor["_deputado_id"], []).append(proposicao_id)
+
+        self.votacoes = [self._votacao(rng, i) for i in range(round(200 * por_ano))]
+        self.votacoes_por_id = {v["id"]: v for v in self.votacoes}
+        self.eventos = [self._evento(rng, i) for i in range(round(300 * por_ano))]
+        self.eventos_por_id = {e["id"]: e for e in self.eventos}
+
+        self.rotas: List[Tuple[re.Pattern, Callable[..., Optional[Resposta]]]] = [
+            (re.compile(pattern), handler) for pattern, handler in (
+                (r"^/deputados$", self.listar_deputados),
+                (r"^/deputados/(\d+)$", self.detalhe(self.deputados_por_id, int)),
+                (r"^/deputados/(\d+)/despesas$", self.despesas),
+                (r"^/deputados/(\d+)/discursos$", self.discursos),
+                (r"^/proposicoes$", self.listar_proposicoes),
+                (r"^/proposicoes/(\d+)$", self.detalhe(self.proposicoes_por_id, int)),
+                (r"^/proposicoes/(\d+)/autores$", self.autores_da_proposicao),
+                (r"^/proposicoes/(\d+)/tramitacoes$", self.tramitacoes),
+                (r"^/proposicoes/(\d+)/votacoes$", self.votacoes_da_proposicao),
+                (r"^/proposicoes/(\d+)/temas$", self.temas),
+                (r"^/proposicoes/(\d+)/relacionadas$", self.relacionadas),
+                (r"^/votacoes$", self.listar_votacoes),
+                (r"^/votacoes/([\w-]+)$", self.detalhe(self.votacoes_por_id, str)),
+                (r"^/votacoes/([\w-]+)/votos$", self.votos),
+                (r"^/eventos$", self.listar_eventos),
+                (r"^/eventos/(\d+)$", self.detalhe(self.eventos_por_id, int)),
+                (r"^/partidos$", self.listar(self.partidos, ("id", "sigla", "nome", "uri"), "sigla")),
+                (r"^/partidos/(\d+)$", self.detalhe({p["id"]: p for p in self.partidos}, int)),
+                (r"^/orgaos$", self.listar(self.orgaos, ("id", "uri", "sigla", "nome", "apelido", "codTipoOrgao", "tipoOrgao"), "id")),
+                (r"^/orgaos/(\d+)$", self.detalhe({o["id"]: o for o in self.orgaos}, int)),
+                (r"^/referencias/(.+)$", self.referencias),
+            )
+        ]
+
+    # --- Geração das entidades -------------------------------------------------
+
+    def _data(self, rng: random.Random) -> datetime:
+        segundos = int((self.fim - self.inicio).total_seconds())
+        return self.inicio + timedelta(seconds=rng.randrange(segundos))
+
+    def _deputado(self, rng: random.Random, i: int) -> Dict[str, Any]:
+        deputado_id = 204500 + i
+        partido, uf = rng.choice(PARTIDOS), rng.choice(UFS)
+        nome = f"Deputado Sintético {i:03d}"
+        return {
+            "id": deputado_id,
+            "uri": f"{PUBLIC_BASE_URL}/deputados/{deputado_id}",
+            "nomeCivil": nome,
+            "cpf": f"{rng.randrange(10 ** 11):011d}",
+            "sexo": rng.choice("MF"),
+            "urlWebsite": None,
+            "redeSocial": [],
+            "dataNascimento": date(1950 + rng.randrange(45), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+            "dataFalecimento": None,
+            "ufNascimento": uf,
+            "municipioNascimento": "Município Sintético",
+            "escolaridade": rng.choice(["Superior", "Pós-Graduação", "Ensino Médio"]),
+            "ultimoStatus": {
+                "id": deputado_id,
+                "uri": f"{PUBLIC_BASE_URL}/deputados/{deputado_id}",
+                "nome": nome,
+                "siglaPartido": partido,
+                "uriPartido": f"{PUBLIC_BASE_URL}/partidos/{36000 + PARTIDOS.index(partido)}",
+                "siglaUf": uf,
+                "idLegislatura": self.legislatura,
+                "urlFoto": f"https://www.camara.leg.br/internet/deputado/bandep/{deputado_id}.jpg",
+                "email": f"dep.sintetico{i:03d}@camara.leg.br",
+                "data": self.inicio.date().isoformat(),
+                "nomeEleitoral": nome,
+                "gabinete": {"nome": str(100 + i), "predio": "4", "sala": str(100 + i), "andar": "1",
+                             "telefone": "3215-5000", "email": f"dep.sintetico{i:03d}@camara.leg.br"},
+                "situacao": "Exercício",
+                "condicaoEleitoral": "Titular",
+                "descricaoStatus": None,
+            },
+        }
+
+    @staticmethod
+    def _resumo_deputado(deputado: Dict[str, Any]) -> Dict[str, Any]:
+        status = deputado["ultimoStatus"]
+        return {
+            "id": deputado["id"], "uri": deputado["uri"], "nome": status["nome"],
+            "siglaPartido": status["siglaPartido"], "uriPartido": status["uriPartido"],
+            "siglaUf": status["siglaUf"], "idLegislatura": status["idLegislatura"],
+            "urlFoto": status["urlFoto"], "email": status["email"],
+        }
+
+    @staticmethod
+    def _partido(i: int, sigla: str) -> Dict[str, Any]:
+        partido_id = 36000 + i
+        return {
+            "id": partido_id, "sigla": sigla, "nome": f"Partido {sigla}",
+            "uri": f"{PUBLIC_BASE_URL}/partidos/{partido_id}",
+            "status": {"data": None, "idLegislatura": "57", "situacao": "Ativo", "totalPosse": "0",
+                       "totalMembros": "0", "uriMembros": f"{PUBLIC_BASE_URL}/deputados?siglaPartido={sigla}",
+                       "lider": {"uri": None, "nome": None, "siglaPartido": sigla, "uriPartido": None,
+                                 "uf": None, "idLegislatura": 57, "urlFoto": None}},
+            "numeroEleitoral": None, "urlLogo": None, "urlWebSite": None, "urlFacebook": None,
+        }
+
+    @staticmethod
+    def _orgao(orgao_id: int, sigla: str, nome: str, cod_tipo: int) -> Dict[str, Any]:
+        return {
+            "id": orgao_id, "uri": f"{PUBLIC_BASE_URL}/orgaos/{orgao_id}", "sigla": sigla, "nome": nome,
+            "apelido": nome, "codTipoOrgao": cod_tipo,
+            "tipoOrgao": "Plenário Virtual" if cod_tipo == 26 else "Comissão Permanente",
+            "nomePublicacao": nome, "nomeResumido": sigla, "dataInicio": None, "dataInstalacao": None,
+            "dataFim": None, "dataFimOriginal": None, "casa": "", "sala": None, "urlWebsite": None,
+        }
+
+    def _proposicao(self, rng: random.Random, i: int) -> Dict[str, Any]:
+        proposicao_id = 2300000 + i
+        cod_tipo, sigla, descricao = rng.choice(TIPOS_PROPOSICAO)
+        apresentacao = self._data(rng)
+        cod_situacao, situacao = rng.choice(SITUACOES_PROPOSICAO)
+        orgao_id, sigla_orgao = rng.choice(ORGAOS)[:2]
+        sequencia = rng.randint(1, 20)
+        status_em = min(self.fim - timedelta(minutes=1), apresentacao + timedelta(days=rng.randint(0, 120)))
+        return {
+            "id": proposicao_id,
+            "uri": f"{PUBLIC_BASE_URL}/proposicoes/{proposicao_id}",
+            "siglaTipo": sigla,
+            "codTipo": cod_tipo,
+            "numero": i + 1,
+            "ano": apresentacao.year,
+            "ementa": f"Dispõe sobre o tema sintético {i} e dá outras providências.",
+            "dataApresentacao": _iso(apresentacao),
+            "uriOrgaoNumerador": f"{PUBLIC_BASE_URL}/orgaos/180",
+            "uriAutores": f"{PUBLIC_BASE_URL}/proposicoes/{proposicao_id}/autores",
+            "descricaoTipo": descricao,
+            "ementaDetalhada": None,
+            "keywords": rng.choice(["saúde", "educação", "tributação", "segurança", "meio ambiente"]),
+            "uriPropPrincipal": None,
+            "uriPropAnterior": None,
+            "uriPropPosterior": None,
+            "urlInteiroTeor": f"https://www.camara.leg.br/proposicoesWeb/prop_mostrarintegra?codteor={proposicao_id}",
+            "urnFinal": None,
+            "texto": None,
+            "justificativa": None,
+            "statusProposicao": {
+                "dataHora": _iso(status_em),
+                "sequencia": sequencia,
+                "siglaOrgao": sigla_orgao,
+                "uriOrgao": f"{PUBLIC_BASE_URL}/orgaos/{orgao_id}",
+                "uriUltimoRelator": None,
+                "regime": "Ordinário (Art. 151, III, RICD)",
+                "descricaoTramitacao": "Recebimento",
+                "codTipoTramitacao": "500",
+                "descricaoSituacao": situacao,
+                "codSituacao": cod_situacao,
+                "despacho": "Às Comissões.",
+                "url": None,
+                "ambito": "Regimental",
+                "apreciacao": "Sujeita à Apreciação do Plenário",
+            },
+        }
+
+    def _autores(self, rng: random.Random) -> List[Dict[str, Any]]:
+        # ~20% das proposições não têm deputado entre os autores (Executivo, Senado, comissões)
+        if rng.random() < 0.2:
+            return [{"uri": f"{PUBLIC_BASE_URL}/orgaos/78", "nome": "Poder Executivo", "codTipo": 1,
+                     "tipo": "Órgão do Poder Executivo", "ordemAssinatura": 1, "proponente": 1}]
+        autores = rng.sample(self.deputados, k=min(len(self.deputados), rng.choice([1, 1, 1, 2, 3])))
+        return [
+            {"uri": d["uri"], "nome": d["ultimoStatus"]["nome"], "codTipo": 10000, "tipo": "Deputado(a)",
+             "ordemAssinatura": ordem, "proponente": 1, "_deputado_id": d["id"]}
+            for ordem, d in enumerate(autores, start=1)
+        ]
+
+    def _votacao(self, rng: random.Random, i: int) -> Dict[str, Any]:
+        proposicao = rng.choice(self.proposicoes)
+        registro = self._data(rng)
+        votacao_id = f"{proposicao['id']}-{i + 1}"
+        orgao_id, sigla_orgao = rng.choice(ORGAOS)[:2]
+        return {
+            "id": votacao_id,
+            "uri": f"{PUBLIC_BASE_URL}/votacoes/{votacao_id}",
+            "data": registro.date().isoformat(),
+            "dataHoraRegistro": registro.strftime("%Y-%m-%dT%H:%M:%S"),
+            "siglaOrgao": sigla_orgao,
+            "uriOrgao": f"{PUBLIC_BASE_URL}/orgaos/{orgao_id}",
+            "uriEvento": None,
+            "descricao": f"Aprovada a proposição {proposicao['siglaTipo']} {proposicao['numero']}/{proposicao['ano']}.",
+            "aprovacao": rng.choice([0, 1]),
+            "proposicaoObjeto": None,
+            "uriProposicaoObjeto": proposicao["uri"],
+            "_proposicao_id": proposicao["id"],
+        }
+
+    def _evento(self, rng: random.Random, i: int) -> Dict[str, Any]:
+        evento_id = 70000 + i
+        inicio = self._data(rng)
+        orgao = rng.choice(ORGAOS)
+        return {
+            "id": evento_id,
+            "uri": f"{PUBLIC_BASE_URL}/eventos/{evento_id}",
+            "dataHoraInicio": _iso(inicio),
+            "dataHoraFim": _iso(inicio + timedelta(hours=rng.randint(1, 5))),
+            "situacao": "Encerrada",
+            "descricaoTipo": rng.choice(TIPOS_EVENTO)[1],
+            "descricao": f"Evento sintético {i}",
+            "localExterno": None,
+            "localCamara": {"nome": "Plenário Ulysses Guimarães", "predio": None, "sala": None, "andar": None},
+            "orgaos": [{"id": orgao[0], "uri": f"{PUBLIC_BASE_URL}/orgaos/{orgao[0]}", "sigla": orgao[1],
+                        "nome": orgao[2], "apelido": orgao[2], "codTipoOrgao": orgao[3]}],
+            "urlRegistro": None,
+        }
+
+    def _rng(self, *chave: Any) -> random.Random:
+        return random.Random(f"{self.config.seed}:{':'.join(map(str, chave))}")
+
+    # --- Paginação -------------------------------------------------------------
+
+    @staticmethod
+    def _publico(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in item.items() if not k.startswith("_")}
+
+    def paginar(self, endpoint: str, itens: List[Dict[str, Any]], params: Dict[str, str],
+                ordenar_por: str) -> Resposta:
+        chave = params.get("ordenarPor") or ordenar_por
+        reverso = params.get("ordem", "ASC").upper() == "DESC"
+        itens = sorted(itens, key=lambda item: (item.get(chave) is None, item.get(chave) or 0), reverse=reverso)
+        try:
+            por_pagina = min(MAX_ITEMS, max(1, int(params.get("itens", DEFAULT_ITEMS))))
+            pagina = max(1, int(params.get("pagina", 1)))
+        except ValueError:
+            return 400, {"status": 400, "title": "Parâmetro inválido", "detail": "itens/pagina devem ser inteiros"}
+        ultima = max(1, math.ceil(len(itens) / por_pagina))
+
+        def href(numero: int) -> str:
+            return f"{PUBLIC_BASE_URL}{endpoint}?{urlencode({**params, 'pagina': numero, 'itens': por_pagina})}"
+
+        links = [{"rel": "self", "href": href(pagina)}]
+        if pagina < ultima:
+            links.append({"rel": "next", "href": href(pagina + 1)})
+        links += [{"rel": "first", "href": href(1)}, {"rel": "last", "href": href(ultima)}]
+        inicio = (pagina - 1) * por_pagina
+        return 200, {"dados": [self._publico(item) for item in itens[inicio:inicio + por_pagina]], "links": links}
+
+    @classmethod
+    def lista(cls, endpoint: str, itens: List[Dict[str, Any]]) -> Resposta:
+        return 200, {"dados": [cls._publico(item) for item in itens],
+                     "links": [{"rel": "self", "href": f"{PUBLIC_BASE_URL}{endpoint}"}]}
+
+    @staticmethod
+    def _entre(valor: str, params: Dict[str, str], inicio: str, fim: str) -> bool:
+        dia = (valor or "")[:10]
+        return (not params.get(inicio) or dia >= params[inicio][:10]) and (not params.get(fim) or dia <= params[fim][:10])
+
+    @staticmethod
+    def _valores(params: Dict[str, str], nome: str) -> Optional[List[str]]:
+        return params[nome].split(",") if params.get(nome) else None
+
+    # --- Rotas -------------------------------------------------------------------
+
+    def responder(self, endpoint: str, params: Dict[str, str]) -> Optional[Resposta]:
+        for padrao, handler in self.rotas:
+            match = padrao.match(endpoint)
+            if match:
+                return handler(endpoint, params, *match.groups())
+        return None
+
+    @staticmethod
+    def nao_encontrado(endpoint: str) -> Resposta:
+        return 404, {"status": 404, "title": "Recurso não encontrado", "detail": endpoint}
+
+    def detalhe(self, indice: Dict[Any, Dict[str, Any]], tipo: Callable[[str], Any]):
+        def handler(endpoint: str, params: Dict[str, str], chave: str) -> Resposta:
+            item = indice.get(tipo(chave))
+            if item is None:
+                return self.nao_encontrado(endpoint)
+            return 200, {"dados": self._publico(item), "links": [{"rel": "self", "href": f"{PUBLIC_BASE_URL}{endpoint}"}]}
+        return handler
+
+    def listar(self, itens: List[Dict[str, Any]], campos: Tuple[str, ...], ordenar_por: str):
+        resumos = [{campo: item.get(campo) for campo in campos} for item in itens]
+
+        def handler(endpoint: str, params: Dict[str, str]) -> Resposta:
+            return self.paginar(endpoint, resumos, params, ordenar_por)
+        return handler
+
+    def listar_deputados(self, endpoint: str, params: Dict[str, str]) -> Resposta:
+        ufs, partidos = self._valores(params, "siglaUf"), self._valores(params, "siglaPartido")
+        legislaturas = self._valores(params, "idLegislatura")
+        itens = [
+            self._resumo_deputado(d) for d in self.deputados
+            if (not ufs or d["ultimoStatus"]["siglaUf"] in ufs)
+            and (not partidos or d["ultimoStatus"]["siglaPartido"] in partidos)
+            and (not legislaturas or str(self.legislatura) in legislaturas)
+        ]
+        return self.paginar(endpoint, itens, params, "nome")
+
+    def listar_proposicoes(self, endpoint: str, params: Dict[str, str]) -> Resposta:
+        ids, tipos, anos = self._valores(params, "id"), self._valores(params, "siglaTipo"), self._valores(params, "ano")
+        candidatas = self.proposicoes
+        if params.get("idDeputadoAutor"):
+            autorais = set()
+            for autor in params["idDeputadoAutor"].split(","):
+                autorais.update(self.por_autor.get(int(autor), []))
+            candidatas = [self.proposicoes_por_id[pid] for pid in sorted(autorais)]
+        itens = [
+            {campo: p[campo] for campo in ("id", "uri", "siglaTipo", "codTipo", "numero", "ano", "ementa")}
+            | {"dataApresentacao": p["dataApresentacao"]}
+            for p in candidatas
+            if (not ids or str(p["id"]) in ids)
+            and (not tipos or p["siglaTipo"] in tipos)
+            and (not anos or str(p["ano"]) in anos)
+            and self._entre(p["dataApresentacao"], params, "dataApresentacaoInicio", "dataApresentacaoFim")
+            # dataInicio/dataFim filtram pela data da última tramitação, como na API real
+            and self._entre(p["statusProposicao"]["dataHora"], params, "dataInicio", "dataFim")
+        ]
+        return self.paginar(endpoint, itens, params, "id")
+
+    def listar_votacoes(self, endpoint: str, params: Dict[str, str]) -> Resposta:
+        proposicoes = self._valores(params, "idProposicao")
+        itens = [
+            {campo: v[campo] for campo in ("id", "uri", "data", "dataHoraRegistro", "siglaOrgao", "uriOrgao",
+                                           "uriEvento", "descricao", "aprovacao")}
+            for v in self.votacoes
+            if (not proposicoes or str(v["_proposicao_id"]) in proposicoes)
+            and self._entre(v["data"], params, "dataInicio", "dataFim")
+        ]
+        return self.paginar(endpoint, itens, params, "dataHoraRegistro")
+
+    def listar_eventos(self, endpoint: str, params: Dict[str, str]) -> Resposta:
+        itens = [
+            {campo: e[campo] for campo in ("id", "uri", "dataHoraInicio", "dataHoraFim", "situacao",
+                                           "descricaoTipo", "descricao", "localExterno", "localCamara", "orgaos")}
+            for e in self.eventos
+            if self._entre(e["dataHoraInicio"], params, "dataInicio", "dataFim")
+        ]
+        return self.paginar(endpoint, itens, params, "dataHoraInicio")
+
+    def autores_da_proposicao(self, endpoint: str, params: Dict[str, str], proposicao_id: str) -> Resposta:
+        autores = self.autores.get(int(proposicao_id))
+        return self.nao_encontrado(endpoint) if autores is None else self.lista(endpoint, autores)
+
+    def tramitacoes(self, endpoint: str, params: Dict[str, str], proposicao_id: str) -> Resposta:
+        proposicao = self.proposicoes_por_id.get(int(proposicao_id))
+        if proposicao is None:
+            return self.nao_encontrado(endpoint)
+        # A última tramitação coincide com o statusProposicao, como na API real
+        status = proposicao["statusProposicao"]
+        inicio = datetime.fromisoformat(proposicao["dataApresentacao"])
+        fim = datetime.fromisoformat(status["dataHora"])
+        total = status["sequencia"]
+        itens = []
+        for sequencia in range(1, total + 1):
+            momento = inicio + (fim - inicio) * (sequencia / total)
+            itens.append({
+                "dataHora": _iso(momento), "sequencia": sequencia,
+                "siglaOrgao": status["siglaOrgao"] if sequencia == total else "PLEN",
+                "uriOrgao": status["uriOrgao"], "uriUltimoRelator": None, "regime": status["regime"],
+                "descricaoTramitacao": status["descricaoTramitacao"] if sequencia == total else "Apresentação",
+                "codTipoTramitacao": status["codTipoTramitacao"],
+                "descricaoSituacao": status["descricaoSituacao"] if sequencia == total else None,
+                "codSituacao": status["codSituacao"] if sequencia == total else None,
+                "despacho": status["despacho"] if sequencia == total else f"Tramitação sintética {sequencia}.",
+                "url": None, "ambito": status["ambito"], "apreciacao": status["apreciacao"],
+            })
+        return self.lista(endpoint, itens)
+
+    def votacoes_da_proposicao(self, endpoint: str, params: Dict[str, str], proposicao_id: str) -> Resposta:
+        return self.lista(endpoint, [
+            {campo: v[campo] for campo in ("id", "uri", "data", "dataHoraRegistro", "siglaOrgao", "uriOrgao",
+                                           "uriEvento", "descricao", "aprovacao")}
+            for v in self.votacoes if v["_proposicao_id"] == int(proposicao_id)
+        ])
+
+    def temas(self, endpoint: str, params: Dict[str, str], proposicao_id: str) -> Resposta:
+        cod, nome = self._rng("temas", proposicao_id).choice(TEMAS)
+        return self.lista(endpoint, [{"codTema": cod, "tema": nome, "relevancia": 0}])
+
+    def relacionadas(self, endpoint: str, params: Dict[str, str], proposicao_id: str) -> Resposta:
+        return self.lista(endpoint, [])
+
+    def votos(self, endpoint: str, params: Dict[str, str], votacao_id: str) -> Resposta:
+        votacao = self.votacoes_por_id.get(votacao_id)
+        if votacao is None:
+            return self.nao_encontrado(endpoint)
+        rng = self._rng("votos", votacao_id)
+        itens = [
+            {"tipoVoto": rng.choice(VOTOS), "dataRegistroVoto": votacao["dataHoraRegistro"],
+             "deputado_": self._resumo_deputado(d)}
+            for d in self.deputados if rng.random() < 0.85
+        ]
+        return self.lista(endpoint, itens)
+
+    def despesas(self, endpoint: str, params: Dict[str, str], deputado_id: str) -> Resposta:
+        if int(deputado_id) not in self.deputados_por_id:
+            return self.nao_encontrado(endpoint)
+        anos = self._valores(params, "ano") or [str(ano) for ano in range(self.inicio.year, self.fim.year)]
+        meses = self._valores(params, "mes")
+        itens = []
+        for ano in anos:
+            rng = self._rng("despesas", deputado_id, ano)
+            for documento in range(max(1, round(24 * self.config.scale))):
+                mes = rng.randint(1, 12)
+                valor = round(rng.uniform(50, 5000), 2)
+                itens.append({
+                    "ano": int(ano), "mes": mes, "tipoDespesa": rng.choice(TIPOS_DESPESA),
+                    "codDocumento": int(deputado_id) * 1000 + documento, "tipoDocumento": "Nota Fiscal",
+                    "codTipoDocumento": 0, "dataDocumento": f"{ano}-{mes:02d}-{rng.randint(1, 28):02d}T00:00:00",
+                    "numDocumento": str(documento), "valorDocumento": valor, "urlDocumento": None,
+                    "nomeFornecedor": f"Fornecedor Sintético {rng.randrange(200)}",
+                    "cnpjCpfFornecedor": f"{rng.randrange(10 ** 14):014d}", "valorLiquido": valor,
+                    "valorGlosa": 0.0, "numRessarcimento": "", "codLote": documento, "parcela": 0,
+                })
+        itens = [item for item in itens if not meses or str(item["mes"]) in meses]
+        return self.paginar(endpoint, itens, params, "ano")
+
+    def discursos(self, endpoint: str, params: Dict[str, str], deputado_id: str) -> Resposta:
+        if int(deputado_id) not in self.deputados_por_id:
+            return self.nao_encontrado(endpoint)
+        rng = self._rng("discursos", deputado_id)
+        itens = []
+        for _ in range(max(1, round(5 * self.config.scale * self.config.years))):
+            inicio = self._data(rng)
+            itens.append({
+                "dataHoraInicio": _iso(inicio), "dataHoraFim": _iso(inicio + timedelta(minutes=5)),
+                "uriEvento": None, "faseEvento": {"titulo": "Pequeno Expediente", "dataHoraInicio": None, "dataHoraFim": None},
+                "tipoDiscurso": "BREVES COMUNICAÇÕES", "urlTexto": None, "urlAudio": None, "urlVideo": None,
+                "keywords": "SAÚDE, EDUCAÇÃO", "sumario": "Discurso sintético.", "transcricao": "Texto sintético.",
+            })
+        itens = [item for item in itens if self._entre(item["dataHoraInicio"], params, "dataInicio", "dataFim")]
+        return self.paginar(endpoint, itens, params, "dataHoraInicio")
+
+    def referencias(self, endpoint: str, params: Dict[str, str], nome: str) -> Resposta:
+        itens = REFERENCIAS.get(nome)
+        if itens is None:
+            itens = [{"cod": cod, "sigla": "", "nome": f"{nome} {cod}", "descricao": ""} for cod in range(1, 4)]
+        return self.lista(endpoint, itens)
+
+
+class FixtureStore:
+    """Respostas gravadas em disco, uma por endpoint + parâmetros."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def caminho(self, endpoint: str, params: Dict[str, str]) -> str:
+        nome = endpoint.strip("/") or "index"
+        consulta = urlencode(sorted(params.items()))
+        if consulta:
+            nome += "__" + hashlib.sha1(consulta.encode()).hexdigest()[:16]
+        return os.path.join(self.root, nome + ".json")
+
+    def carregar(self, endpoint: str, params: Dict[str, str]) -> Optional[Resposta]:
+        caminho = self.caminho(endpoint, params)
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, encoding="utf-8") as arquivo:
+            gravado = json.load(arquivo)
+        return gravado["status"], gravado["body"]
+
+    def salvar(self, endpoint: str, params: Dict[str, str], status: int, body: Any) -> None:
+        caminho = self.caminho(endpoint, params)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump({"endpoint": endpoint, "params": params, "status": status, "body": body},
+                      arquivo, ensure_ascii=False, indent=1)
+
+
+class FaultInjector:
+    """Latência, 429 e 5xx sorteados a partir da semente, para execuções reprodutíveis."""
+
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        self.rng = random.Random(config.seed + 1)
+        self.janela: deque = deque()
+
+    def latencia(self) -> float:
+        mediana = self.config.latency_ms / 1000
+        if mediana <= 0:
+            return 0.0
+        if self.config.latency_sigma <= 0:
+            return mediana
+        return mediana * math.exp(self.config.latency_sigma * self.rng.gauss(0, 1))
+
+    def falha(self) -> Optional[Response]:
+        agora = time.monotonic()
+        if self.config.max_rps:
+            while self.janela and agora - self.janela[0] >= 1.0:
+                self.janela.popleft()
+            if len(self.janela) >= self.config.max_rps:
+                espera = max(1, math.ceil(1.0 - (agora - self.janela[0])))
+                return self._erro(429, {"Retry-After": str(espera)})
+            self.janela.append(agora)
+        sorteio = self.rng.random()
+        if sorteio < self.config.rate_429:
+            return self._erro(429, {"Retry-After": f"{self.config.retry_after:g}"})
+        if sorteio < self.config.rate_429 + self.config.rate_5xx:
+            return self._erro(self.rng.choice([500, 502, 503, 504]))
+        return None
+
+    @staticmethod
+    def _erro(status: int, headers: Optional[Dict[str, str]] = None) -> Response:
+        corpo = json.dumps({"status": status, "title": "Falha injetada pelo substituto"})
+        return Response(corpo, status_code=status, media_type="application/json", headers=headers)
+
+
+def create_app(config: Optional[StandinConfig] = None) -> FastAPI:
+    """Aplicação FastAPI do substituto; sirva com uvicorn ou use via httpx.ASGITransport."""
+    config = config or StandinConfig()
+    dataset = SyntheticDataset(config) if config.synthetic else None
+    store = FixtureStore(config.fixtures_dir) if config.fixtures_dir else None
+    falhas = FaultInjector(config)
+    stats: Counter = Counter()
+    app = FastAPI(title="Substituto local da API da Câmara")
+    app.state.config = config
+    app.state.dataset = dataset
+    app.state.stats = stats
+
+    async def gravar(endpoint: str, params: Dict[str, str]) -> Optional[Resposta]:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(f"{config.upstream}{endpoint}", params=params)
+        try:
+            body = json.loads(response.text.replace(config.upstream, PUBLIC_BASE_URL))
+        except ValueError:
+            return None
+        store.salvar(endpoint, params, response.status_code, body)
+        stats["gravadas"] += 1
+        return response.status_code, body
+
+    @app.get("/_standin/stats")
+    async def estatisticas():
+        return dict(stats)
+
+    @app.get(API_PREFIX + "/{path:path}")
+    async def api(path: str, request: Request):
+        stats["requisicoes"] += 1
+        espera = falhas.latencia()
+        if espera:
+            await asyncio.sleep(espera)
+        falha = falhas.falha()
+        if falha is not None:
+            stats[f"falhas_{falha.status_code}"] += 1
+            return falha
+
+        endpoint = "/" + path.strip("/")
+        params = dict(request.query_params)
+        resposta = store.carregar(endpoint, params) if store else None
+        if resposta is not None:
+            stats["reproduzidas"] += 1
+        elif store and config.record:
+            resposta = await gravar(endpoint, params)
+        if resposta is None and dataset is not None:
+            resposta = dataset.responder(endpoint, params)
+            stats["sinteticas"] += 1
+        if resposta is None:
+            resposta = SyntheticDataset.nao_encontrado(endpoint)
+
+        status, body = resposta
+        base = str(request.base_url).rstrip("/") + API_PREFIX
+        texto = json.dumps(body, ensure_ascii=False).replace(PUBLIC_BASE_URL, base)
+        return Response(texto, status_code=status, media_type="application/json")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Substituto local da API de Dados Abertos da Câmara")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--scale", type=float, default=1.0, help="Fator de escala dos dados sintéticos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-year", type=int, default=2023)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mediana da latência injetada")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="Dispersão lognormal da latência")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probabilidade de 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After dos 429 sorteados (s)")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Probabilidade de 5xx")
+    parser.add_argument("--max-rps", type=float, help="Requisições por segundo acima das quais responde 429")
+    parser.add_argument("--fixtures", help="Diretório de respostas gravadas")
+    parser.add_argument("--record", action="store_true", help="Grava em --fixtures o que ainda não estiver lá")
+    parser.add_argument("--upstream", default=PUBLIC_BASE_URL, help="API real usada na gravação")
+    parser.add_argument("--no-synthetic", action="store_true", help="Só serve respostas gravadas")
+    args = parser.parse_args()
+
+    if args.record and not args.fixtures:
+        parser.error("--record exige --fixtures")
+
+    config = StandinConfig(
+        scale=args.scale, seed=args.seed, start_year=args.start_year, years=args.years,
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        rate_429=args.rate_429, retry_after=args.retry_after, rate_5xx=args.rate_5xx, max_rps=args.max_rps,
+        fixtures_dir=args.fixtures, record=args.record, upstream=args.upstream.rstrip("/"),
+        synthetic=not args.no_synthetic,
+    )
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("O substituto precisa do uvicorn (pip install uvicorn).")
+    logging.basicConfig(level=logging.INFO)
+    logging.info(f"Substituto da API em http://{args.host}:{args.port}{API_PREFIX} (escala {args.scale})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
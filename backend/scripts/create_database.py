@@ -10,6 +10,7 @@ from app.infra.db.session import engine
 from app.infra.db.models.referencias import Base as ReferenciasBase
 from app.infra.db.models.entidades import Base as EntidadesBase
 from app.infra.db.models.ai_data import Base as AIDataBase # Adicione esta linha
+from app.infra.db.models.sync import Base as SyncBase
 
 def create_database():
     logging.info("Criando tabelas de referência...")
@@ -24,5 +25,9 @@ def create_database():
     AIDataBase.metadata.create_all(bind=engine) # Adicione esta linha
     logging.info("Tabelas de IA criadas com sucesso!")
 
+    logging.info("Criando tabelas de controle da sincronização...")
+    SyncBase.metadata.create_all(bind=engine)
+    logging.info("Tabelas de sincronização criadas.")
+
 if __name__ == "__main__":
     create_database()
\ No newline at end of file
@@ -13,7 +13,7 @@ import os
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.tasks.sync_all import sync_all_data
+from scripts.tasks.sync_all import sync_all_data, plan_sync_all
 from scripts.tasks.sync_authors_only import sync_proposition_authors
 from scripts.tasks.sync_referencias import sync_references
 from scripts.tasks.check_ai_data import check_ai_data
@@ -21,6 +21,24 @@ from scripts.tasks.score_propositions import process_backlog, process_specific_p
 from scripts.tasks.orchestrate import main as orchestrate_main
 from scripts.tasks.daily_priority_sync import daily_priority_sync
 from scripts.tasks.weekly_event_sync import weekly_event_sync
+from scripts.tasks.poll_propositions import poll_propositions
+from scripts.tasks.retry_failed import retry_failed
+from scripts.tasks.backfill import backfill
+from scripts.tasks.reprocess import reprocess
+from scripts.tasks.ingest_files import ingest_files
+from src.services.bulk_ingest import DATASETS as BULK_DATASETS
+from src.services.backfill import PLANS as BACKFILL_PLANS
+from app.infra.camara_api import camara_api_client
+
+
+def _run(coro):
+    """Runs a task coroutine and releases the shared Câmara API client afterwards."""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await camara_api_client.aclose()
+    return asyncio.run(runner())
 
 
 def main():
@@ -31,9 +49,40 @@ def main():
     # Sync all data
     sync_all_parser = subparsers.add_parser('sync-all', help='Sync all data from Câmara API')
     sync_all_parser.add_argument('--year', type=int, default=2023, help='Year to sync from')
+    sync_all_parser.add_argument('--resume', action='store_true', help='Resume an interrupted sync from its last checkpoint')
+    sync_all_parser.add_argument('--plan', action='store_true',
+                                 help='Only estimate the requests and duration of each stage (dry run)')
+    
+    # Multi-process historical backfill
+    backfill_parser = subparsers.add_parser('backfill', help='Backfill past years with several worker processes')
+    backfill_parser.add_argument('--from-year', type=int, help='First year to queue (omit to only join the existing queue)')
+    backfill_parser.add_argument('--to-year', type=int, help='Last year to queue (defaults to --from-year)')
+    backfill_parser.add_argument('--workers', type=int, default=4, help='Worker processes on this machine')
+    backfill_parser.add_argument('--entities', nargs='+', choices=list(BACKFILL_PLANS), help='Entities to queue (default: all)')
+    backfill_parser.add_argument('--lease-seconds', type=int, default=900, help='Lease duration of a claimed partition')
+    
+    # Offline re-transformation from the raw payload archive
+    reprocess_parser = subparsers.add_parser('reprocess', help='Rebuild tables from archived raw payloads, without the API')
+    reprocess_parser.add_argument('--entities', nargs='+', help='Tables to rebuild (default: every archived table)')
+    reprocess_parser.add_argument('--workers', type=int, help='Decoding processes (default: one per core)')
+    reprocess_parser.add_argument('--chunk-size', type=int, default=500, help='Payloads per decoding task')
+    reprocess_parser.add_argument('--force', action='store_true', help='Rewrite every row, even if its content hash matches')
+    
+    # Bulk data files
+    ingest_parser = subparsers.add_parser('ingest-files', help='Load Câmara bulk data files (JSON/CSV, optionally zipped)')
+    ingest_parser.add_argument('paths', nargs='+', help='Bulk files, e.g. proposicoes-2023.json votacoesVotos-2023.csv Ano-2023.csv.zip')
+    ingest_parser.add_argument('--dataset', choices=list(BULK_DATASETS), help='Dataset of every file (default: detected from the file name)')
+    ingest_parser.add_argument('--batch-size', type=int, default=5000, help='Records per bulk load')
+    ingest_parser.add_argument('--encoding', default='utf-8-sig', help='Text encoding of the files')
+    
+    # Retry failed fetches
+    retry_parser = subparsers.add_parser('retry-failed', help='Retry detail and child fetches that failed in earlier syncs')
+    retry_parser.add_argument('--limit', type=int, help='Maximum number of failed items to retry')
     
     # Sync authors only
     sync_authors_parser = subparsers.add_parser('sync-authors', help='Sync only proposition authors')
+    sync_authors_parser.add_argument('--strategy', choices=['auto', 'per-proposition', 'by-deputy'], default='auto',
+                                     help='How to fetch authors (auto picks the plan with fewer API requests)')
     
     # Sync references
     sync_refs_parser = subparsers.add_parser('sync-refs', help='Sync reference tables')
@@ -62,6 +111,11 @@ def main():
     weekly_sync_parser.add_argument('--include-past-days', type=int, default=7, help='Past days to include')
     weekly_sync_parser.add_argument('--event-types', nargs='+', help='Specific event types to sync')
     
+    # Continuous polling for new propositions
+    poll_parser = subparsers.add_parser('poll', help='Watch for new propositions and sync them as they are filed')
+    poll_parser.add_argument('--max-polls', type=int, help='Stop after this many polls')
+    poll_parser.add_argument('--no-score', action='store_true', help='Do not queue new propositions for AI scoring')
+    
     # Orchestrate
     orchestrate_parser = subparsers.add_parser('orchestrate', help='Run complete ETL orchestration')
     
@@ -73,34 +127,48 @@ def main():
     
     # Run the appropriate command
     if args.command == 'sync-all':
-        asyncio.run(sync_all_data(args.year))
+        if args.plan:
+            _run(plan_sync_all(args.year, resume=args.resume))
+        else:
+            _run(sync_all_data(args.year, resume=args.resume))
+    elif args.command == 'backfill':
+        backfill(args.from_year, args.to_year, workers=args.workers,
+                 entities=args.entities, lease_seconds=args.lease_seconds)
+    elif args.command == 'reprocess':
+        reprocess(args.entities, workers=args.workers, chunk_size=args.chunk_size, force=args.force)
+    elif args.command == 'ingest-files':
+        ingest_files(args.paths, dataset=args.dataset, batch_size=args.batch_size, encoding=args.encoding)
+    elif args.command == 'retry-failed':
+        _run(retry_failed(args.limit))
     elif args.command == 'sync-authors':
-        asyncio.run(sync_proposition_authors())
+        _run(sync_proposition_authors(args.strategy))
     elif args.command == 'sync-refs':
-        asyncio.run(sync_references())
+        _run(sync_references())
     elif args.command == 'check-ai':
         result = check_ai_data(args.limit, args.format)
         logging.info(result)
     elif args.command == 'score':
         if args.ids:
-            asyncio.run(process_specific_propositions(args.ids))
+            _run(process_specific_propositions(args.ids))
         else:
-            asyncio.run(process_backlog(args.batch_size, args.rate_limit))
+            _run(process_backlog(args.batch_size, args.rate_limit))
     elif args.command == 'daily-sync':
-        asyncio.run(daily_priority_sync(
+        _run(daily_priority_sync(
             days_back=args.days_back,
             max_propositions=args.max_propositions,
             include_authors=not args.no_authors,
             include_status=not args.no_status
         ))
     elif args.command == 'weekly-sync':
-        asyncio.run(weekly_event_sync(
+        _run(weekly_event_sync(
             weeks_ahead=args.weeks_ahead,
             include_past_days=args.include_past_days,
             event_types=args.event_types
         ))
+    elif args.command == 'poll':
+        _run(poll_propositions(max_polls=args.max_polls, score=not args.no_score))
     elif args.command == 'orchestrate':
-        asyncio.run(orchestrate_main())
+        _run(orchestrate_main())
 
 
 if __name__ == "__main__":
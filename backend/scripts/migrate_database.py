@@ -0,0 +1,125 @@
+import logging
+
+# camara_insights/scripts/migrate_database.py
+# Atualiza um banco criado por uma versão anterior dos modelos:
+#   1. adiciona as colunas novas (content_hash, despesas.codDocumento/parcela);
+#   2. completa a chave natural das despesas antigas (ver KEY_FILLS);
+#   3. remove linhas duplicadas pela chave natural, mantendo a mais recente;
+#   4. cria as restrições de unicidade que faltam (uq_despesas_documento, ...).
+# Tudo roda numa única transação e pode ser repetido sem efeito. Tabelas novas
+# continuam sendo criadas por create_database.py.
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import UniqueConstraint, bindparam, delete, func, inspect, or_, select, text, update
+
+from app.infra.db.session import engine
+from app.infra.db.models.referencias import Base
+import app.infra.db.models.entidades  # noqa: F401 (registra as tabelas no metadata)
+import app.infra.db.models.ai_data  # noqa: F401
+import app.infra.db.models.sync  # noqa: F401
+from src.data.repository import ChildRepository, KEY_FILLS
+
+LOTE = 1000
+
+
+def _tabelas_existentes(conn):
+    inspector = inspect(conn)
+    return inspector, [table for table in Base.metadata.sorted_tables if inspector.has_table(table.name)]
+
+
+def adicionar_colunas(conn) -> int:
+    """ALTER TABLE ... ADD COLUMN para cada coluna do modelo que falta no banco."""
+    quote = conn.dialect.identifier_preparer.quote
+    inspector, tabelas = _tabelas_existentes(conn)
+    adicionadas = 0
+    for table in tabelas:
+        existentes = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existentes:
+                continue
+            if not column.nullable and column.server_default is None:
+                logging.warning(f"{table.name}.{column.name} é NOT NULL sem valor padrão; adicione-a manualmente.")
+                continue
+            tipo = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {tipo}"))
+            logging.info(f"Coluna {table.name}.{column.name} ({tipo}) adicionada.")
+            adicionadas += 1
+    return adicionadas
+
+
+def completar_chaves(conn) -> int:
+    """Preenche, em lotes, as partes da chave natural que as linhas antigas deixaram vazias."""
+    total = 0
+    for nome, preenchimentos in KEY_FILLS.items():
+        completadas = 0
+        table = Base.metadata.tables[nome]
+        pendentes = select(table).where(or_(*[table.c[coluna].is_(None) for coluna in preenchimentos])).limit(LOTE)
+        gravar = (
+            update(table).where(table.c.id == bindparam('_id'))
+            .values({coluna: bindparam(f'_{coluna}') for coluna in preenchimentos})
+        )
+        while True:
+            linhas = [ChildRepository.complete_key(nome, dict(row)) for row in conn.execute(pendentes).mappings()]
+            if not linhas:
+                break
+            conn.execute(gravar, [
+                {'_id': row['id'], **{f'_{coluna}': row[coluna] for coluna in preenchimentos}} for row in linhas
+            ])
+            completadas += len(linhas)
+        if completadas:
+            logging.info(f"{completadas} linhas de {nome} com a chave natural completada.")
+        total += completadas
+    return total
+
+
+def _restricoes_existentes(inspector, tabela: str) -> set:
+    nomes = {constraint['name'] for constraint in inspector.get_unique_constraints(tabela)}
+    nomes.update(index['name'] for index in inspector.get_indexes(tabela) if index.get('unique'))
+    return nomes
+
+
+def criar_restricoes(conn) -> int:
+    """Remove duplicatas e cria cada UniqueConstraint nomeada que ainda não existe."""
+    quote = conn.dialect.identifier_preparer.quote
+    inspector, tabelas = _tabelas_existentes(conn)
+    criadas = 0
+    for table in tabelas:
+        existentes = _restricoes_existentes(inspector, table.name)
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint) or not constraint.name or constraint.name in existentes:
+                continue
+            colunas = list(constraint.columns)
+            completas = [column.isnot(None) for column in colunas]
+            pk = list(table.primary_key.columns)[0]
+            # Linhas com a chave incompleta não conflitam; entre as duplicadas fica a de maior id
+            mantidas = select(func.max(pk)).where(*completas).group_by(*colunas)
+            removidas = conn.execute(delete(table).where(*completas, pk.notin_(mantidas))).rowcount
+            if removidas:
+                logging.info(f"{removidas} linhas duplicadas removidas de {table.name}.")
+
+            lista = ", ".join(quote(column.name) for column in colunas)
+            if conn.dialect.name == "sqlite":
+                # O SQLite não tem ADD CONSTRAINT; um índice único tem o mesmo efeito no ON CONFLICT
+                conn.execute(text(f"CREATE UNIQUE INDEX {quote(constraint.name)} ON {quote(table.name)} ({lista})"))
+            else:
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD CONSTRAINT {quote(constraint.name)} "
+                                  f"UNIQUE ({lista})"))
+            logging.info(f"Restrição {constraint.name} criada em {table.name}.")
+            criadas += 1
+    return criadas
+
+
+def migrate_database():
+    with engine.begin() as conn:
+        colunas = adicionar_colunas(conn)
+        chaves = completar_chaves(conn)
+        restricoes = criar_restricoes(conn)
+    logging.info(f"Migração concluída: {colunas} colunas, {chaves} chaves completadas, {restricoes} restrições.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_database()
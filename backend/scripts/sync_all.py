@@ -5,8 +5,6 @@ import os
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Type, Tuple
-from dateutil.parser import parse
-from collections.abc import MutableMapping
 
 # --- Configuração do Logging ---
 logging.basicConfig(
@@ -21,68 +19,41 @@ logging.basicConfig(
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy.orm import Session
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import Date, DateTime
+from sqlalchemy.orm import Session, sessionmaker
 from app.infra.db.session import SessionLocal
 from app.infra.db.models.entidades import Base
 from app.infra.camara_api import camara_api_client
 from app.infra.db.models import entidades as models
+from src.data.writer import BackgroundWriter
+from src.data.upsert import bulk_upsert
+from src.data.repository import ChildRepository, ChildKeyTracker
+from src.data.codecs import get_codec
+from src.services.data_sync_service import DataSyncService
 
 # --- Constantes de Otimização ---
 CONCURRENCY_LIMIT = 10
 BATCH_SIZE = 50
 
-# --- Função Utilitária ---
-
-def flatten_dict(d: MutableMapping, parent_key: str = '', sep: str = '_') -> Dict[str, Any]:
-    """
-    Achata um dicionário aninhado.
-    """
-    items = []
-    for k, v in d.items():
-        new_key = parent_key + sep + k if parent_key else k
-        if isinstance(v, MutableMapping):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
 # --- Funções de Sincronização Principais ---
 
-async def fetch_and_process_paginated_data(endpoint: str, params: Dict[str, Any] = {}) -> List[Dict[str, Any]]:
+async def fetch_and_process_paginated_data(endpoint: str, params: Dict[str, Any] = {}, strict: bool = False) -> List[Dict[str, Any]]:
     """
     Busca todos os dados de um endpoint paginado da API da Câmara.
+    Com `strict=True`, retorna None se alguma página falhar, em vez de uma lista parcial.
     """
     all_data: List[Dict[str, Any]] = []
-    page = 1
     
     param_str = '&'.join([f"{k}={v}" for k, v in params.items() if k != 'pagina'])
     logging.info(f"Buscando: {endpoint}?{param_str}...")
 
-    while True:
-        current_params = params.copy()
-        current_params['pagina'] = page
-        
-        logging.debug(f" - Página: {page}")
-        try:
-            api_response = await camara_api_client.get(endpoint=endpoint, params=current_params)
-            
-            if api_response and 'dados' in api_response and api_response['dados']:
-                all_data.extend(api_response['dados'])
-                
-                next_link = next((link for link in api_response.get('links', []) if link['rel'] == 'next'), None)
-                if not next_link:
-                    logging.info(f"Fim da paginação para {endpoint}.")
-                    break
-                
-                page += 1
-            else:
-                logging.warning(f"Não foram encontrados mais dados ou houve erro para o endpoint {endpoint} na página {page}.")
-                break
-        except Exception as e:
-            logging.error(f"Erro ao buscar o endpoint {endpoint} na página {page}: {e}")
-            break
+    try:
+        async for item in camara_api_client.paginate(endpoint, params, strict=strict):
+            all_data.append(item)
+        logging.info(f"Fim da paginação para {endpoint}.")
+    except Exception as e:
+        logging.error(f"Erro ao buscar o endpoint {endpoint}: {e}")
+        if strict:
+            return None
             
     return all_data
 
@@ -110,7 +81,7 @@ async def sync_entidade_com_detalhes(db: Session, model: Type[Base], endpoint: s
 
     logging.info(f"{len(summary_data)} itens descobertos. Buscando detalhes...")
     
-    model_columns = {c.name: c.type for c in model.__table__.columns}
+    codec = get_codec(model)
     pk_name = model.__mapper__.primary_key[0].name
     
     semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
@@ -120,6 +91,19 @@ async def sync_entidade_com_detalhes(db: Session, model: Type[Base], endpoint: s
             detail_endpoint = item['uri'].replace(camara_api_client.base_url, "")
             all_tasks.append(fetch_with_semaphore(semaphore, detail_endpoint))
 
+    def upsert(session: Session, rows: List[Dict[str, Any]]):
+        try:
+            # Linhas com o mesmo hash de conteúdo não são reescritas
+            result = bulk_upsert(session, model, rows, index_elements=[pk_name])
+            session.commit()
+            logging.info(f"{model.__tablename__}: {result.written} de {len(rows)} registros alterados.")
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Erro durante o upsert para {model.__tablename__}: {e}")
+
+    # O upsert de um lote roda numa thread própria enquanto o próximo lote é baixado
+    db.commit()
+    writer = BackgroundWriter(sessionmaker(bind=db.get_bind()))
     for i in range(0, len(all_tasks), BATCH_SIZE):
         batch_tasks = all_tasks[i:i + BATCH_SIZE]
         responses = await asyncio.gather(*batch_tasks)
@@ -129,49 +113,25 @@ async def sync_entidade_com_detalhes(db: Session, model: Type[Base], endpoint: s
             if not (response and 'dados' in response):
                 continue
 
-            flattened_data = flatten_dict(response['dados'])
-            filtered_data = {k: v for k, v in flattened_data.items() if k in model_columns}
-
-            for key, value in filtered_data.items():
-                if value is None: continue
-                column_type = model_columns.get(key)
-                if isinstance(column_type, (Date, DateTime)) and isinstance(value, str):
-                    try:
-                        parsed_datetime = parse(value)
-                        filtered_data[key] = parsed_datetime.date() if isinstance(column_type, Date) else parsed_datetime
-                    except (ValueError, TypeError) as e:
-                        logging.warning(f"Erro ao converter data '{value}' para o campo '{key}': {e}")
-                        filtered_data[key] = None
-            
-            if model == models.Votacao and flattened_data.get('proposicao_id'):
-                filtered_data['proposicao_id'] = flattened_data['proposicao_id']
-
-            all_data_to_upsert.append(filtered_data)
+            # Achata, filtra as colunas do modelo e converte datas (ver src.data.codecs)
+            all_data_to_upsert.append(codec.decode(response['dados']))
         
         if all_data_to_upsert:
-            try:
-                stmt = insert(model).values(all_data_to_upsert)
-                update_columns = {
-                    c.name: getattr(stmt.excluded, c.name) for c in model.__table__.columns if c.name != pk_name
-                }
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=[pk_name],
-                    set_=update_columns
-                )
-                db.execute(stmt)
-                db.commit()
-            except Exception as e:
-                db.rollback()
-                logging.error(f"Erro durante o upsert para {model.__tablename__}: {e}")
+            await writer.submit(lambda session, rows=all_data_to_upsert: upsert(session, rows))
             
         logging.info(f"Lote de detalhes {i//BATCH_SIZE + 1}/{len(all_tasks)//BATCH_SIZE + 1} para {model.__tablename__} processado.")
             
+    await writer.close()
     logging.info(f"Sincronização com detalhes para {model.__tablename__} concluída.")
 
 
 async def sync_child_entidade(db: Session, parent_model: Type[Base], child_model: Type[Base], endpoint_template: str, child_fk_name: str, params: Dict[str, Any] = {}, paginated: bool = True):
     """
     Sincroniza uma entidade 'filha' de forma otimizada.
+    As linhas são comparadas pela chave natural da tabela: insere as novas,
+    atualiza as alteradas e remove as que sumiram da API, apenas para os pais
+    cujos filhos foram baixados por completo e só dentro da janela dos filtros
+    (`params`), para não apagar, por exemplo, as despesas de outros anos.
     """
     param_str = ', '.join([f"{k}: {v}" for k, v in params.items()])
     logging.info(f"\n--- Sincronizando entidade filha: {child_model.__tablename__} com filtros: [{param_str}] ---")
@@ -181,91 +141,64 @@ async def sync_child_entidade(db: Session, parent_model: Type[Base], child_model
     async def fetch_child_data(parent_id):
         endpoint = endpoint_template.format(id=parent_id)
         if paginated:
-            return await fetch_and_process_paginated_data(endpoint, params)
+            return await fetch_and_process_paginated_data(endpoint, params, strict=True)
         else:
             response = await fetch_with_semaphore(semaphore, endpoint)
-            return response.get('dados', []) if response else []
+            return response.get('dados', []) if response else None
+
+    child_codec = get_codec(child_model)
+    natural_key = ChildRepository.find_natural_key(child_model.__table__, child_fk_name)
+    tracker = ChildKeyTracker(natural_key, child_fk_name, child_model.__tablename__)
+
+    def sync_lote(session: Session, rows: List[Dict[str, Any]], completed_keys):
+        logging.info(f"Sincronizando {len(rows)} registros para {child_model.__tablename__}...")
+        try:
+            repository = ChildRepository(session, child_model, child_fk_name)
+            repository.sync(rows, completed_keys, params)
+            logging.info(f"{repository.inserted_or_updated} inseridos/atualizados, {repository.deleted} removidos.")
+            if repository.skipped:
+                logging.warning(f"{repository.skipped} registros ignorados por chave natural incompleta ({', '.join(natural_key)}).")
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Erro durante a sincronização em massa para {child_model.__tablename__}: {e}")
 
-    all_child_data_to_insert = []
+    # Cada lote de pais é gravado numa thread própria enquanto o próximo é baixado
+    db.commit()
+    writer = BackgroundWriter(sessionmaker(bind=db.get_bind()))
     for i in range(0, len(parent_ids), BATCH_SIZE):
         parent_batch = parent_ids[i:i + BATCH_SIZE]
         tasks = [fetch_child_data(pid) for (pid,) in parent_batch]
         results = await asyncio.gather(*tasks)
         
+        child_data_to_insert = []
+        fetched_parent_ids = []
         for idx, child_data_list in enumerate(results):
-            if not child_data_list: continue
+            if child_data_list is None: continue # Falha na busca: os filhos atuais são mantidos
             current_parent_id = parent_batch[idx][0]
+            fetched_parent_ids.append(current_parent_id)
             for child_data in child_data_list:
                 child_data[child_fk_name] = current_parent_id
                 child_data.pop('id', None)
-                all_child_data_to_insert.append(child_data)
+                child_data_to_insert.append(child_codec.decode(child_data))
+        tracker.add(child_data_to_insert)
+        completed_keys = tracker.pop(fetched_parent_ids)
+        if completed_keys:
+            await writer.submit(lambda session, rows=child_data_to_insert, keys=completed_keys: sync_lote(session, rows, keys))
         logging.info(f"Lote de pais {i//BATCH_SIZE + 1}/{len(parent_ids)//BATCH_SIZE+1 if parent_ids else 1} para {child_model.__tablename__} processado.")
 
-    if all_child_data_to_insert:
-        logging.info(f"Iniciando inserção em massa de {len(all_child_data_to_insert)} registros para {child_model.__tablename__}...")
-        try:
-            db.bulk_insert_mappings(child_model, all_child_data_to_insert)
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            logging.error(f"Erro durante a inserção em massa para {child_model.__tablename__}: {e}")
+    await writer.close()
     logging.info(f"Sincronização de {child_model.__tablename__} concluída.")
 
 async def sync_proposicao_autores(db: Session):
     """
     Sincroniza a tabela de associação (M2M) entre proposições e seus autores.
+    O DataSyncService escolhe o plano com menos requisições: uma chamada por
+    proposição ou a varredura das proposições de cada deputado em exercício.
     """
     logging.info("\n--- Iniciando sincronização de autores de proposições (M2M) ---")
-
-    proposicoes_uris: List[Tuple[int, str]] = db.query(
-        models.Proposicao.id,
-        models.Proposicao.uriAutores
-    ).filter(models.Proposicao.uriAutores.isnot(None)).all()
-
-    if not proposicoes_uris:
-        logging.info("Nenhuma proposição com autores para sincronizar.")
-        return
-
-    logging.info(f"{len(proposicoes_uris)} proposições com URIs de autores encontradas.")
-    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-    all_autores_to_insert = []
-
-    async def fetch_autores(proposicao_id: int, uri: str):
-        endpoint = uri.replace(camara_api_client.base_url, "")
-        response = await fetch_with_semaphore(semaphore, endpoint)
-        return proposicao_id, response.get('dados', []) if response else []
-
-    for i in range(0, len(proposicoes_uris), BATCH_SIZE):
-        batch_uris = proposicoes_uris[i:i + BATCH_SIZE]
-        tasks = [fetch_autores(pid, uri) for pid, uri in batch_uris]
-        results = await asyncio.gather(*tasks)
-
-        for proposicao_id, autores_data in results:
-            for autor_data in autores_data:
-                autor_uri = autor_data.get("uri", "")
-                if "/deputados/" in autor_uri:
-                    try:
-                        deputado_id = int(autor_uri.split("/")[-1])
-                        all_autores_to_insert.append({
-                            "proposicao_id": proposicao_id,
-                            "deputado_id": deputado_id
-                        })
-                    except (ValueError, IndexError) as e:
-                        logging.warning(f"Não foi possível extrair o ID do deputado da URI '{autor_uri}': {e}")
-                        pass
-        logging.info(f"Lote {i//BATCH_SIZE + 1}/{len(proposicoes_uris)//BATCH_SIZE+1 if proposicoes_uris else 1} de autores de proposições processado.")
-
-    if all_autores_to_insert:
-        logging.info(f"Inserindo {len(all_autores_to_insert)} links autor-proposição...")
-        try:
-            stmt = insert(models.proposicao_autores).values(all_autores_to_insert)
-            stmt = stmt.on_conflict_do_nothing(index_elements=['proposicao_id', 'deputado_id'])
-            db.execute(stmt)
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            logging.error(f"Erro ao inserir links autor-proposição: {e}")
-    logging.info("Sincronização de autores de proposições concluída.")
+    service = DataSyncService(db, concurrency_limit=CONCURRENCY_LIMIT, batch_size=BATCH_SIZE)
+    total = await service.sync_proposition_authors()
+    logging.info(f"Sincronização de autores de proposições concluída. {total} links processados.")
 
 
 async def main():
@@ -294,31 +227,18 @@ async def main():
             data = await fetch_and_process_paginated_data(endpoint, base_params)
             if data:
                 try:
-                    pk_name = model.__mapper__.primary_key[0].name
-                    stmt = insert(model).values(data)
-                    update_cols = {c.name: getattr(stmt.excluded, c.name) for c in model.__table__.columns if c.name != pk_name}
-                    stmt = stmt.on_conflict_do_update(index_elements=[pk_name], set_=update_cols)
-                    db.execute(stmt)
+                    model_columns = {c.name for c in model.__table__.columns}
+                    rows = [{k: v for k, v in item.items() if k in model_columns} for item in data]
+                    bulk_upsert(db, model, rows)
                 except Exception as e:
                     db.rollback()
                     logging.error(f"Erro ao sincronizar {model.__tablename__}: {e}")
         db.commit()
         logging.info("Frentes, Blocos e Grupos sincronizados.")
 
-        logging.info("\n--- ETAPA 3: LIMPANDO DADOS DE RELACIONAMENTOS ---")
-        try:
-            db.execute(models.proposicao_autores.delete())
-            db.execute(models.Despesa.__table__.delete())
-            db.execute(models.Discurso.__table__.delete())
-            db.execute(models.Tramitacao.__table__.delete())
-            db.execute(models.Voto.__table__.delete())
-            db.commit()
-            logging.info("Limpeza concluída.")
-        except Exception as e:
-            db.rollback()
-            logging.error(f"Erro ao limpar dados de relacionamentos: {e}")
-
-        logging.info("\n--- ETAPA 4: SINCRONIZANDO RELACIONAMENTOS E ENTIDADES FILHAS ---")
+        # As tabelas filhas não são mais esvaziadas antes da carga: cada pai é
+        # comparado pela chave natural, então a API nunca as vê vazias.
+        logging.info("\n--- ETAPA 3: SINCRONIZANDO RELACIONAMENTOS E ENTIDADES FILHAS ---")
         despesa_params = {**base_params, 'ano': current_year}
         discurso_params = {**base_params, 'dataInicio': start_date}
         
@@ -331,8 +251,7 @@ async def main():
     except Exception as e:
         logging.critical(f"Ocorreu um erro fatal na sincronização principal: {e}", exc_info=True)
     finally:
-        # A linha abaixo foi removida para corrigir o erro 'AttributeError'
-        # await camara_api_client.close()
+        await camara_api_client.aclose()
         db.close()
 
 if __name__ == "__main__":
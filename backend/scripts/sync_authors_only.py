@@ -10,10 +10,10 @@ from typing import List, Dict, Any, Tuple
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from sqlalchemy.dialects.postgresql import insert
 from app.infra.db.session import SessionLocal
 from app.infra.camara_api import camara_api_client
 from app.infra.db.models import entidades as models
+from src.data.upsert import bulk_upsert
 
 # --- Constantes de Otimização ---
 # Limita o número de requisições simultâneas à API.
@@ -92,9 +92,7 @@ async def sync_proposicao_autores(db: Session):
         # Verifica se o lote atingiu o tamanho definido para inserção
         if len(autores_para_inserir) >= DB_INSERT_BATCH_SIZE:
             logging.info(f"Atingido o limite de {DB_INSERT_BATCH_SIZE}. Inserindo {len(autores_para_inserir)} registros no banco de dados...")
-            stmt = insert(models.proposicao_autores).values(autores_para_inserir)
-            stmt = stmt.on_conflict_do_nothing(index_elements=['proposicao_id', 'deputado_id'])
-            db.execute(stmt)
+            bulk_upsert(db, models.proposicao_autores, autores_para_inserir, update=False)
             db.commit()
             autores_para_inserir = [] # Limpa a lista para o próximo lote
 
@@ -103,9 +101,7 @@ async def sync_proposicao_autores(db: Session):
     # 4. Insere quaisquer registros restantes que não formaram um lote completo
     if autores_para_inserir:
         logging.info(f"Inserindo lote final de {len(autores_para_inserir)} autores restantes...")
-        stmt = insert(models.proposicao_autores).values(autores_para_inserir)
-        stmt = stmt.on_conflict_do_nothing(index_elements=['proposicao_id', 'deputado_id'])
-        db.execute(stmt)
+        bulk_upsert(db, models.proposicao_autores, autores_para_inserir, update=False)
         db.commit()
     logging.info("Sincronização de autores de proposições concluída!")
 
@@ -0,0 +1,41 @@
+"""
+Multi-process historical backfill.
+Partitions the requested years into per-entity, per-month jobs in the
+`backfill_jobs` table and drains them with several worker processes. Running
+the same command on other machines (without years) adds more workers to the
+same queue.
+"""
+
+import asyncio
+import sys
+import os
+from typing import Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.infra.db.session import SessionLocal
+from src.services.backfill import enqueue_backfill, run_workers
+
+
+def backfill(from_year: Optional[int] = None, to_year: Optional[int] = None, workers: int = 4,
+             entities: Optional[List[str]] = None, lease_seconds: int = 900) -> Dict[str, int]:
+    """Queue the partitions of `from_year`..`to_year` (if given) and work the queue."""
+    if from_year is not None:
+        session = SessionLocal()
+        try:
+            enqueue_backfill(session, from_year, to_year or from_year, entities)
+        finally:
+            session.close()
+    
+    print(f"--- Starting {workers} backfill workers ---")
+    return run_workers(workers, lease_seconds=lease_seconds)
+
+
+def main():
+    """Main entry point for backfill."""
+    backfill(2019, 2023)
+
+
+if __name__ == "__main__":
+    main()
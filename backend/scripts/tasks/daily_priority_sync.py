@@ -18,6 +18,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from src.services.data_sync_service import DataSyncService
 from app.infra.db.session import SessionLocal
+from app.infra.camara_api import camara_api_client
 
 
 async def daily_priority_sync(
@@ -79,7 +80,7 @@ async def daily_priority_sync(
             authors_synced = await sync_service.sync_proposition_authors(proposition_ids=propositions_synced_ids)
             results["authors"] = authors_synced
         
-        # Sync status updates (tramitações) if requested, for the synced propositions
+        # Sync status updates (tramitações) if requested, for the synced propositions whose status moved
         if include_status and propositions_synced_ids:
             status_synced = await sync_service.sync_tramitacoes(proposition_ids=propositions_synced_ids)
             results["status_updates"] = status_synced
@@ -98,6 +99,9 @@ async def daily_priority_sync(
         error_msg = f"Error during daily sync: {str(e)}"
         logging.error(error_msg)
         results["errors"].append(error_msg)
+    finally:
+        db.close()
+        await camara_api_client.aclose()
     
     return results
 
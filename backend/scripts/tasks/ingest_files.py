@@ -0,0 +1,36 @@
+"""
+Ingestion of Câmara bulk data files.
+Loads the yearly bulk files downloaded from dadosabertos.camara.leg.br/arquivos
+(proposicoes-YYYY, votacoes-YYYY, votacoesVotos-YYYY) and the CEAP expense
+files (Ano-YYYY.csv.zip) straight into the database, without API calls.
+"""
+
+import sys
+import os
+from typing import List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.infra.db.session import SessionLocal
+from src.services.bulk_ingest import BulkIngestor, IngestStats
+
+
+def ingest_files(paths: List[str], dataset: Optional[str] = None, batch_size: int = 5000,
+                 encoding: str = "utf-8-sig") -> List[IngestStats]:
+    """Stream the given bulk files into the database; the dataset is detected from each file name."""
+    session = SessionLocal()
+    try:
+        print(f"--- Ingesting {len(paths)} bulk files ---")
+        return BulkIngestor(session, batch_size=batch_size, encoding=encoding).ingest(paths, dataset)
+    finally:
+        session.close()
+
+
+def main():
+    """Main entry point for ingest_files."""
+    ingest_files(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
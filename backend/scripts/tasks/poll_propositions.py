@@ -0,0 +1,41 @@
+"""
+Continuous polling for new propositions.
+New filings get their details and authors synced within a poll interval
+(about a minute during session hours) and are queued for AI scoring.
+"""
+
+import asyncio
+import sys
+import os
+from typing import Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.automation_service import run_proposition_poller
+from app.infra.camara_api import camara_api_client
+
+
+async def poll_propositions(max_polls: Optional[int] = None, score: bool = True) -> None:
+    """Watch /proposicoes for new entries until interrupted (or `max_polls` polls)."""
+    try:
+        await run_proposition_poller(max_polls=max_polls, score=score)
+    finally:
+        await camara_api_client.aclose()
+
+
+def main():
+    """Main entry point for the proposition poller."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Poll the Câmara API for new propositions")
+    parser.add_argument("--max-polls", type=int, help="Stop after this many polls")
+    parser.add_argument("--no-score", action='store_true', help="Do not queue new propositions for AI scoring")
+    
+    args = parser.parse_args()
+    
+    asyncio.run(poll_propositions(max_polls=args.max_polls, score=not args.no_score))
+
+
+if __name__ == "__main__":
+    main()
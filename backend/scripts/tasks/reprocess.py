@@ -0,0 +1,38 @@
+"""
+Offline reprocessing of the raw payload archive.
+Re-runs the transformation of archived API payloads into the database after a
+schema change or a transformation fix, in parallel across cores and without
+any request to the API.
+"""
+
+import sys
+import os
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.infra.db.session import SessionLocal
+from src.data.repository import RawPayloadRepository
+from src.services.reprocess import Reprocessor
+
+
+def reprocess(entities: Optional[List[str]] = None, workers: Optional[int] = None,
+              chunk_size: int = 500, force: bool = False) -> List[Dict[str, Any]]:
+    """Rebuild `entities` (default: every archived table) from their latest archived payloads."""
+    session = SessionLocal()
+    try:
+        for entity, (versions, size) in sorted(RawPayloadRepository(session).stats().items()):
+            print(f"Archive: {entity}: {versions} payload versions, {size / 1024 / 1024:.1f} MB compressed")
+        return Reprocessor(session, workers=workers, chunk_size=chunk_size, force=force).run(entities)
+    finally:
+        session.close()
+
+
+def main():
+    """Main entry point for reprocess."""
+    reprocess()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Deferred retry of failed fetches.
+Detail URIs and child-table parents that failed during a sync are kept in the
+dead-letter table; this pass retries the ones whose backoff expired.
+"""
+
+import asyncio
+import sys
+import os
+from typing import Dict, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.infra.db.session import SessionLocal
+from app.infra.camara_api import camara_api_client
+from src.services.data_sync_service import DataSyncService
+
+
+async def retry_failed(limit: Optional[int] = None) -> Dict[str, int]:
+    """Retry failed items that are due, up to `limit`."""
+    session = SessionLocal()
+    try:
+        service = DataSyncService(session, concurrency_limit=10, batch_size=50)
+        
+        print("--- Retrying failed fetches ---")
+        return await service.retry_failed(limit)
+        
+    finally:
+        session.close()
+        await camara_api_client.aclose()
+
+
+async def main():
+    """Main entry point for retry_failed."""
+    await retry_failed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
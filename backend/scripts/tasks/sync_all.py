@@ -8,51 +8,68 @@ import sys
 import os
 from datetime import datetime
 
+from sqlalchemy import func
+
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.infra.db.session import SessionLocal
+from app.infra.camara_api import camara_api_client
 from src.services.data_sync_service import DataSyncService
+from src.services.sync_planner import SyncPlanner
 from app.infra.db.models import entidades as models
 
 
-async def sync_all_data(year: int = 2023) -> None:
-    """Sync all data from Câmara API."""
+async def sync_all_data(year: int = 2023, resume: bool = False) -> None:
+    """
+    Sync all data from Câmara API.
+    Every stage is checkpointed; with `resume`, an interrupted run continues
+    from its last completed batch and finished stages are skipped.
+    """
     session = SessionLocal()
     try:
         service = DataSyncService(session, concurrency_limit=10, batch_size=50)
         
-        print(f"--- Starting general synchronization since {year} ---")
+        def checkpoint(table: str) -> dict:
+            return {"checkpoint_key": f"sync-all:{year}:{table}", "resume": resume}
+        
+        print(f"--- {'Resuming' if resume else 'Starting'} general synchronization since {year} ---")
         
         # Sync main entities
         await service.sync_entity_with_details(
             models.Deputado, 
             "/deputados",
-            params={"itens": 100, "ordem": "ASC", "ordenarPor": "nome"}
+            params={"itens": 100, "ordem": "ASC", "ordenarPor": "nome"},
+            **checkpoint("deputados")
         )
         
         await service.sync_entity_with_details(
             models.Partido, 
             "/partidos",
-            params={"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"}
+            params={"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"},
+            **checkpoint("partidos")
         )
         
         await service.sync_entity_with_details(
             models.Orgao, 
             "/orgaos",
-            params={"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"}
+            params={"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"},
+            **checkpoint("orgaos")
         )
         
-        await service.sync_entity_with_details(
+        # Propositions and events only fetch what changed since the last run
+        await service.sync_incremental(
             models.Proposicao, 
             "/proposicoes",
-            params={"ano": year, "itens": 100, "ordem": "ASC", "ordenarPor": "id"}
+            params={"ano": year, "itens": 100, "ordem": "ASC", "ordenarPor": "id"},
+            **checkpoint("proposicoes")
         )
         
-        await service.sync_entity_with_details(
+        await service.sync_incremental(
             models.Evento, 
             "/eventos",
-            params={"dataInicio": f"{year}-01-01", "itens": 100, "ordem": "ASC", "ordenarPor": "dataHoraInicio"}
+            params={"dataInicio": f"{year}-01-01", "itens": 100, "ordem": "ASC", "ordenarPor": "dataHoraInicio"},
+            **checkpoint("eventos")
         )
         
         # Sync child entities
@@ -61,30 +78,69 @@ async def sync_all_data(year: int = 2023) -> None:
             models.Discurso, 
             "/deputados/{id}/discursos", 
             "deputado_id",
-            params={"dataInicio": f"{year}-01-01", "itens": 100}
+            params={"dataInicio": f"{year}-01-01", "itens": 100},
+            **checkpoint("discursos")
         )
         
-        await service.sync_child_entities(
-            models.Proposicao, 
-            models.Tramitacao, 
-            "/proposicoes/{id}/tramitacoes", 
-            "proposicao_id",
-            paginated=False
-        )
+        # Only propositions whose status moved since their tramitações were last synced
+        await service.sync_tramitacoes(**checkpoint("tramitacoes"))
         
         await service.sync_child_entities(
             models.Votacao, 
             models.Voto, 
             "/votacoes/{id}/votos", 
             "votacao_id",
-            paginated=False
+            paginated=False,
+            **checkpoint("votos")
         )
         
         print("\n--- General synchronization completed ---")
         
     finally:
         session.close()
-        await camara_api_client.close()
+        await camara_api_client.aclose()
+
+
+async def plan_sync_all(year: int = 2023, resume: bool = False) -> dict:
+    """
+    Dry run of sync_all_data: estimate the requests of each stage and the
+    expected duration, making only the discovery calls (first and last page
+    of each list). Nothing is written to the database.
+    """
+    session = SessionLocal()
+    try:
+        planner = SyncPlanner(session)
+        
+        def checkpoint(table: str) -> dict:
+            return {"checkpoint_key": f"sync-all:{year}:{table}", "resume": resume}
+        
+        print(f"--- Planning general synchronization since {year} ---")
+        
+        deputados = await planner.plan_details(
+            "deputados", "/deputados", {"itens": 100, "ordem": "ASC", "ordenarPor": "nome"}, **checkpoint("deputados"))
+        await planner.plan_details(
+            "partidos", "/partidos", {"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"}, **checkpoint("partidos"))
+        await planner.plan_details(
+            "orgaos", "/orgaos", {"itens": 100, "ordem": "ASC", "ordenarPor": "sigla"}, **checkpoint("orgaos"))
+        proposicoes = await planner.plan_details(
+            "proposicoes", "/proposicoes", {"ano": year, "itens": 100, "ordem": "ASC", "ordenarPor": "id"},
+            incremental=True, **checkpoint("proposicoes"))
+        await planner.plan_details(
+            "eventos", "/eventos", {"dataInicio": f"{year}-01-01", "itens": 100, "ordem": "ASC", "ordenarPor": "dataHoraInicio"},
+            incremental=True, **checkpoint("eventos"))
+        
+        await planner.plan_children(
+            "discursos", models.Deputado, parent_count=deputados.detail_calls + deputados.saved, **checkpoint("discursos"))
+        stored = session.query(func.count(models.Proposicao.id)).filter(models.Proposicao.ano == year).scalar() or 0
+        planner.plan_tramitacoes(
+            "tramitacoes", new_propositions=max(0, proposicoes.detail_calls - stored), **checkpoint("tramitacoes"))
+        await planner.plan_children("votos", models.Votacao, paginated=False, **checkpoint("votos"))
+        
+        return planner.report()
+        
+    finally:
+        session.close()
+        await camara_api_client.aclose()
 
 
 async def main():
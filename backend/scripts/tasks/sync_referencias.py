@@ -12,6 +12,7 @@ from typing import Dict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.infra.db.session import SessionLocal
+from app.infra.camara_api import camara_api_client
 from src.services.data_sync_service import DataSyncService
 from app.infra.db.models import entidades as models
 
@@ -55,6 +56,7 @@ async def sync_references() -> Dict[str, int]:
         
     finally:
         session.close()
+        await camara_api_client.aclose()
 
 
 async def main():
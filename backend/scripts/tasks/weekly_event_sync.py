@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from src.services.data_sync_service import DataSyncService
 from app.infra.db.session import SessionLocal
+from app.infra.camara_api import camara_api_client
 
 
 async def weekly_event_sync(
@@ -83,6 +84,7 @@ async def weekly_event_sync(
         # Ensure the database session is always closed
         print("Closing database session.")
         db.close()
+        await camara_api_client.aclose()
 
     return results
 
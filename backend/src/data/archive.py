@@ -0,0 +1,73 @@
+"""
+Compressed archive of raw API payloads.
+Transformation keeps only the fields a model maps, so every fetched `dados`
+payload is also archived as-is (see RawPayload), letting `reprocess` rebuild
+the tables locally after a schema change or a flattening fix. Payloads are
+compressed with zstd when the optional `zstandard` package is installed and
+with zlib otherwise; the codec is stored with each payload.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Any, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback; payloads already archived with zstd need the package to be read
+    zstandard = None
+
+from app.core.settings import settings
+
+# (uri, parent_fk, parent_id, payload hash, encoded JSON)
+ArchiveEntry = Tuple[str, Optional[str], Optional[str], str, bytes]
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(data: bytes, codec: Optional[str] = None, level: Optional[int] = None) -> Tuple[str, bytes]:
+    codec = codec or default_codec()
+    level = settings.RAW_ARCHIVE_COMPRESSION_LEVEL if level is None else level
+    if codec == "zstd":
+        return codec, zstandard.ZstdCompressor(level=level).compress(data)
+    return codec, zlib.compress(data, level)
+
+
+def decompress(codec: str, blob: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Payload archived with zstd; install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if codec == "zlib":
+        return zlib.decompress(blob)
+    raise ValueError(f"Unknown archive codec '{codec}'")
+
+
+def load_payload(codec: str, blob: bytes) -> Any:
+    return json.loads(decompress(codec, blob))
+
+
+class PayloadArchiver:
+    """
+    Collects the raw payloads of one sync run until the next write.
+    Payloads are encoded when added, since transformation mutates them in
+    place; compression is left to the writer thread (RawPayloadRepository).
+    """
+
+    def __init__(self, entity: str, parent_fk: Optional[str] = None):
+        self.entity = entity
+        self.parent_fk = parent_fk
+        self.pending: List[ArchiveEntry] = []
+
+    def add(self, uri: str, payload: Any, parent_id: Any = None) -> None:
+        encoded = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.pending.append((
+            uri, self.parent_fk, None if parent_id is None else str(parent_id),
+            hashlib.sha256(encoded).hexdigest(), encoded,
+        ))
+
+    def drain(self) -> List[ArchiveEntry]:
+        entries, self.pending = self.pending, []
+        return entries
@@ -0,0 +1,142 @@
+"""
+Streaming readers for the Câmara bulk data files.
+The yearly files published at dadosabertos.camara.leg.br/arquivos (and the
+CEAP expense files) run to hundreds of megabytes, so records are read one at
+a time: JSON arrays are decoded incrementally with `JSONDecoder.raw_decode`
+over a sliding buffer and CSVs through `csv.DictReader`. Plain, `.gz` and
+`.zip` files are accepted.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import re
+import zipfile
+from collections.abc import Mapping
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+READ_SIZE = 1 << 16
+_SKIP = re.compile(r'[\s,]*')
+
+
+def file_format(path: str) -> Tuple[str, str]:
+    """(format, compression) from the file name, e.g. 'Ano-2023.csv.zip' -> ('csv', 'zip')."""
+    name = os.path.basename(path).lower()
+    compression = ""
+    for suffix in (".zip", ".gz"):
+        if name.endswith(suffix):
+            name, compression = name[:-len(suffix)], suffix[1:]
+    for fmt in ("json", "csv"):
+        if name.endswith(f".{fmt}"):
+            return fmt, compression
+    raise ValueError(f"Unsupported bulk file '{path}' (expected .json or .csv, optionally .zip or .gz)")
+
+
+@contextmanager
+def open_bulk_file(path: str, encoding: str = "utf-8-sig") -> Iterator[TextIO]:
+    """Text stream of a bulk file; a zip archive yields its first .json or .csv member."""
+    fmt, compression = file_format(path)
+    if compression == "gz":
+        with gzip.open(path, "rt", encoding=encoding, newline="") as stream:
+            yield stream
+    elif compression == "zip":
+        with zipfile.ZipFile(path) as archive:
+            members = [name for name in archive.namelist() if name.lower().endswith(f".{fmt}")]
+            if not members:
+                raise ValueError(f"No .{fmt} file inside '{path}'")
+            with archive.open(members[0]) as raw:
+                yield io.TextIOWrapper(raw, encoding=encoding, newline="")
+    else:
+        with open(path, encoding=encoding, newline="") as stream:
+            yield stream
+
+
+def iter_json_array(stream: TextIO, key: str = "dados", read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Items of the array at the top level of `stream`, or under its top-level
+    `key` (the API's {"dados": [...]} envelope), decoded one at a time.
+    """
+    decoder = json.JSONDecoder()
+    array_start = re.compile(r'\s*\[|\s*\{.*?"%s"\s*:\s*\[' % re.escape(key), re.S)
+    buffer, eof = "", False
+
+    def refill() -> bool:
+        nonlocal buffer, eof
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    match = None
+    while match is None:
+        if not refill():
+            match = array_start.match(buffer)
+            if match is None:
+                raise ValueError(f"No JSON array (or '{key}' array) found")
+            break
+        match = array_start.match(buffer)
+    pos = match.end()
+
+    while True:
+        pos = _SKIP.match(buffer, pos).end()
+        if pos >= len(buffer):
+            if not refill():
+                raise ValueError("Unterminated JSON array")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely an item cut at the end of the buffer: read on and retry
+            buffer = buffer[pos:]
+            pos = 0
+            if not refill():
+                raise
+            continue
+        yield item
+        pos = end
+        if pos > read_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iter_csv(stream: TextIO) -> Iterator[Dict[str, str]]:
+    """Rows of a CSV as dicts; the Câmara files use ';', others ',' (picked from the header)."""
+    header = stream.readline()
+    if not header:
+        return
+    delimiter = ";" if header.count(";") >= header.count(",") else ","
+    yield from csv.DictReader(chain([header], stream), delimiter=delimiter)
+
+
+def iter_records(path: str, encoding: str = "utf-8-sig") -> Iterator[Dict[str, Any]]:
+    """Records of a bulk JSON or CSV file, streamed."""
+    fmt, _ = file_format(path)
+    with open_bulk_file(path, encoding) as stream:
+        yield from iter_json_array(stream) if fmt == "json" else iter_csv(stream)
+
+
+def flatten(record: Mapping, prefix: str = "", sep: str = "_") -> Dict[str, Any]:
+    """Nested objects become prefixed keys, as in the CSV version of the same file."""
+    flat: Dict[str, Any] = {}
+    for key, value in record.items():
+        flat_key = f"{prefix}{sep}{key}" if prefix else key
+        if isinstance(value, Mapping):
+            flat.update(flatten(value, flat_key, sep))
+        else:
+            flat[flat_key] = value
+    return flat
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
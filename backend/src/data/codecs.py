@@ -0,0 +1,114 @@
+"""
+Per-model codecs that turn Câmara API payloads into rows for the database.
+Everything that depends only on the model (column set, which nested keys lead
+to a column, which columns hold dates) is computed once and cached, so each
+record costs a single pass over its keys.
+"""
+
+from collections.abc import Mapping
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Set, Type
+
+from dateutil.parser import parse as dateutil_parse
+from sqlalchemy import Date, DateTime
+
+# Flattened API keys that feed a column with a different name, per table
+ALIASES: Dict[str, Dict[str, str]] = {
+    # /votacoes/{id}/votos nests the deputy under 'deputado_' and names the vote 'tipoVoto'
+    "votos": {"deputado__id": "deputado_id", "tipoVoto": "voto"},
+}
+
+SEP = "_"
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """ISO-8601 fast path (`datetime.fromisoformat`), dateutil only for anything else."""
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return dateutil_parse(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    parsed = parse_datetime(value)
+    return parsed.date() if isinstance(parsed, datetime) else parsed
+
+
+class ModelCodec:
+    """Compiled transformation of API payloads into rows of one table."""
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.table = getattr(model, '__table__', model)
+        self.columns: Set[str] = {c.name for c in self.table.columns}
+
+        # Flattened key -> column, including aliases
+        self.key_map: Dict[str, str] = {name: name for name in self.columns}
+        self.key_map.update(ALIASES.get(self.table.name, {}))
+        self.aliases = set(ALIASES.get(self.table.name, {}))
+
+        # Nested prefixes worth descending into, e.g. 'ultimoStatus', 'ultimoStatus_gabinete'
+        self.prefixes: Set[str] = set()
+        for key in self.key_map:
+            parts = key.split(SEP)
+            for i in range(1, len(parts)):
+                self.prefixes.add(SEP.join(parts[:i]))
+
+        self.converters: Dict[str, Callable[[Any], Any]] = {}
+        for column in self.table.columns:
+            if isinstance(column.type, DateTime):
+                self.converters[column.name] = parse_datetime
+            elif isinstance(column.type, Date):
+                self.converters[column.name] = parse_date
+
+    def _collect(self, data: Mapping, prefix: str, row: Dict[str, Any], aliased: Dict[str, Any]) -> None:
+        for key, value in data.items():
+            flat_key = f"{prefix}{SEP}{key}" if prefix else key
+            if isinstance(value, Mapping):
+                if flat_key in self.prefixes:
+                    self._collect(value, flat_key, row, aliased)
+                continue
+            column = self.key_map.get(flat_key)
+            if column is None:
+                continue
+            if flat_key in self.aliases:
+                aliased[column] = value
+            else:
+                row[column] = value
+
+    def decode(self, data: Mapping) -> Dict[str, Any]:
+        """Flatten `data`, keep the model's columns and convert dates."""
+        row: Dict[str, Any] = {}
+        aliased: Dict[str, Any] = {}
+        self._collect(data, "", row, aliased)
+        # Aliased keys win over a same-named direct key
+        row.update(aliased)
+        for column, convert in self.converters.items():
+            value = row.get(column)
+            if value is not None:
+                row[column] = convert(value)
+        return row
+
+
+@lru_cache(maxsize=None)
+def get_codec(model: Type) -> ModelCodec:
+    """The codec for `model` (mapped class or Table), built on first use."""
+    return ModelCodec(model)
@@ -0,0 +1,159 @@
+"""
+Bulk loader for the large child tables (votos, despesas, discursos, tramitações).
+On PostgreSQL, rows are streamed with `COPY ... FROM STDIN` into a temporary
+staging table and merged into the target with a single
+`INSERT ... SELECT ... ON CONFLICT`, which avoids building huge multi-row
+VALUES statements. Other databases use batched executemany.
+"""
+
+import io
+import json
+import uuid
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Column, MetaData, Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.data.hashing import add_content_hashes
+from src.data.upsert import UpsertResult, bulk_upsert, group_by_columns, on_conflict, table_of
+
+# Below this many rows, creating a staging table costs more than it saves
+COPY_MIN_ROWS = 1000
+EXECUTEMANY_BATCH_SIZE = 5000
+
+
+def _encode(value: Any) -> str:
+    """One CSV field for COPY: unquoted empty means NULL, strings are always quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class _CopyStream(io.TextIOBase):
+    """File-like object that renders rows to CSV lazily, as COPY reads them."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], columns: Sequence[str]):
+        self._lines = (
+            ','.join(_encode(row.get(column)) for column in columns) + '\n'
+            for row in rows
+        )
+        self._buffer = ''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def _dedupe(rows: List[Dict[str, Any]], key: Sequence[str]) -> List[Dict[str, Any]]:
+    """A merge cannot touch the same target row twice; keep the last copy of each key."""
+    return list({tuple(row.get(name) for name in key): row for row in rows}.values())
+
+
+def _columns_of(rows: List[Dict[str, Any]]) -> List[str]:
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+
+def bulk_load(
+    session: Session,
+    target: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: Optional[Sequence[str]] = None,
+    update: bool = True,
+    only_changed: bool = True,
+    min_rows: int = COPY_MIN_ROWS,
+) -> UpsertResult:
+    """
+    Upsert a large batch of rows into `target` (mapped class or Table), keyed by
+    `index_elements` (the primary key by default).
+
+    PostgreSQL batches of at least `min_rows` go through COPY and a staging table,
+    one per set of columns (see `group_by_columns`), so a column missing from a
+    row is left untouched rather than overwritten with NULL; smaller groups use
+    `bulk_upsert`. SQLite uses batched executemany; anything else uses `bulk_upsert`.
+    Does not commit; the caller owns the transaction.
+    """
+    table = table_of(target)
+    key = list(index_elements or [c.name for c in table.primary_key.columns])
+    rows = _dedupe(rows, key)
+    dialect_name = session.get_bind().dialect.name
+
+    if dialect_name == 'postgresql' and len(rows) >= min_rows:
+        result = UpsertResult(rows=len(rows))
+        for group in group_by_columns(rows).values():
+            if len(group) >= min_rows:
+                outcome = _copy_merge(session, table, group, key, update, only_changed)
+            else:
+                outcome = bulk_upsert(session, table, group, index_elements=key, update=update,
+                                      only_changed=only_changed)
+            result.written += outcome.written
+            result.statements += outcome.statements
+        return result
+    if dialect_name == 'sqlite':
+        return _executemany(session, table, rows, key, update, only_changed)
+    return bulk_upsert(session, table, rows, index_elements=key, update=update, only_changed=only_changed)
+
+
+def _copy_merge(session, table, rows, key, update, only_changed) -> UpsertResult:
+    add_content_hashes(table, rows)
+    columns = _columns_of(rows)
+    staging = Table(
+        f"staging_{table.name}_{uuid.uuid4().hex[:8]}", MetaData(),
+        *[Column(name, table.columns[name].type) for name in columns],
+        prefixes=['TEMPORARY'], postgresql_on_commit='DROP',
+    )
+    connection = session.connection()
+    staging.create(connection)
+
+    quoted = ', '.join(f'"{name}"' for name in columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{staging.name}" ({quoted}) FROM STDIN WITH (FORMAT csv)',
+            _CopyStream(rows, columns),
+        )
+    finally:
+        cursor.close()
+
+    stmt = postgresql.insert(table).from_select(columns, select(*[staging.c[name] for name in columns]))
+    stmt = on_conflict(stmt, table, key, columns, update, only_changed)
+    written = connection.execute(stmt).rowcount
+    staging.drop(connection)
+    return UpsertResult(rows=len(rows), written=written, statements=1)
+
+
+def _executemany(session, table, rows, key, update, only_changed) -> UpsertResult:
+    add_content_hashes(table, rows)
+    result = UpsertResult(rows=len(rows))
+    # executemany needs the same keys in every parameter set
+    for columns, group in group_by_columns(rows).items():
+        stmt = on_conflict(sqlite.insert(table), table, key, columns, update, only_changed)
+        for start in range(0, len(group), EXECUTEMANY_BATCH_SIZE):
+            batch = group[start:start + EXECUTEMANY_BATCH_SIZE]
+            rowcount = session.execute(stmt, batch).rowcount
+            result.written += rowcount if rowcount >= 0 else len(batch)
+            result.statements += 1
+    return result
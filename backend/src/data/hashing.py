@@ -0,0 +1,33 @@
+"""
+Content hashing for synced rows.
+Each row carries a stable hash of its transformed payload, so upserts can skip
+rows whose content did not change instead of rewriting every column. The main
+entity tables (deputados, proposições, partidos, órgãos, eventos, votações)
+have a `content_hash` column; `add_content_hashes` fills it just before a
+write and `changed_clause` (src.data.upsert) compares it on conflict.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Type
+
+HASH_COLUMN = "content_hash"
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Stable SHA-256 of a transformed row, independent of key order."""
+    payload = {k: v for k, v in row.items() if k != HASH_COLUMN}
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def has_content_hash(model: Type) -> bool:
+    return HASH_COLUMN in getattr(model, '__table__', model).columns
+
+
+def add_content_hashes(model: Type, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Set the hash column on every row, if the model has one."""
+    if has_content_hash(model):
+        for row in rows:
+            row[HASH_COLUMN] = content_hash(row)
+    return rows
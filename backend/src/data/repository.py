@@ -3,12 +3,25 @@ Repository layer implementing the Repository pattern for data access.
 This provides an abstraction over the database operations, following SOLID principles.
 """
 
-from typing import List, Dict, Any, Type, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import select, delete
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import DateTime, Date, desc, asc, func, text
+from typing import List, Dict, Any, Type, Optional, Tuple, Iterable, Set, Iterator
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import select, delete, update, tuple_, UniqueConstraint, PrimaryKeyConstraint
+from sqlalchemy import DateTime, Date, String, desc, asc, func, text, or_, and_, cast
+import hashlib
+import json
 import logging
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: claims rely on the conditional update alone
+    fcntl = None
+
+from src.data.upsert import bulk_upsert
+from src.data.copy_loader import bulk_load
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +33,9 @@ class BaseRepository:
         self.session = session
         self.model = model
         self.pk_name = model.__mapper__.primary_key[0].name
+        # Rows actually written vs. skipped because their content hash matched
+        self.changed = 0
+        self.unchanged = 0
     
     def get_by_id(self, id: Any) -> Optional[Any]:
         """Get a single record by ID."""
@@ -33,23 +49,17 @@ class BaseRepository:
         return self.session.execute(query).scalars().all()
     
     def bulk_upsert(self, data_list: List[Dict[str, Any]]) -> int:
-        """Bulk upsert records using PostgreSQL's ON CONFLICT."""
+        """
+        Bulk upsert records with the database's native ON CONFLICT (see src.data.upsert).
+        Rows whose content did not change are left untouched; see `changed` and `unchanged`.
+        """
         if not data_list:
             return 0
             
-        stmt = insert(self.model).values(data_list)
-        update_columns = {
-            c.name: getattr(stmt.excluded, c.name) 
-            for c in self.model.__table__.columns 
-            if c.name != self.pk_name
-        }
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[self.pk_name],
-            set_=update_columns
-        )
-        
-        result = self.session.execute(stmt)
+        result = bulk_upsert(self.session, self.model, data_list, index_elements=[self.pk_name])
         self.session.commit()
+        self.changed += result.written
+        self.unchanged += result.unchanged
         return len(data_list)
     
     def bulk_insert(self, data_list: List[Dict[str, Any]], ignore_conflicts: bool = True) -> int:
@@ -57,13 +67,13 @@ class BaseRepository:
         if not data_list:
             return 0
             
-        stmt = insert(self.model).values(data_list)
         if ignore_conflicts:
-            stmt = stmt.on_conflict_do_nothing()
-        
-        result = self.session.execute(stmt)
+            written = bulk_upsert(self.session, self.model, data_list, update=False).written
+        else:
+            self.session.execute(self.model.__table__.insert(), data_list)
+            written = len(data_list)
         self.session.commit()
-        return result.rowcount
+        return written
     
     def delete_all(self) -> int:
         """Delete all records from the table."""
@@ -88,6 +98,35 @@ class ProposicaoRepository(BaseRepository):
         )
         return self.session.execute(query).scalars().all()
     
+    def get_with_stale_tramitacoes(self, ids: Optional[List[int]] = None, chunk_size: int = 5000) -> List[int]:
+        """
+        Propositions whose stored status sequence moved past their latest stored
+        tramitação, or that have no tramitações yet. `statusProposicao_sequencia`
+        is the sequence of the latest tramitação, so the others are up to date.
+        """
+        from app.infra.db.models.entidades import Tramitacao
+        
+        def stale(chunk):
+            latest = select(Tramitacao.proposicao_id, func.max(Tramitacao.sequencia).label('sequencia'))
+            if chunk is not None:
+                latest = latest.where(Tramitacao.proposicao_id.in_(chunk))
+            latest = latest.group_by(Tramitacao.proposicao_id).subquery()
+            query = (
+                select(self.model.id)
+                .outerjoin(latest, latest.c.proposicao_id == self.model.id)
+                .where(or_(latest.c.sequencia.is_(None), self.model.statusProposicao_sequencia > latest.c.sequencia))
+            )
+            if chunk is not None:
+                query = query.where(self.model.id.in_(chunk))
+            return self.session.execute(query).scalars().all()
+        
+        if ids is None:
+            return list(stale(None))
+        result = []
+        for start in range(0, len(ids), chunk_size):
+            result.extend(stale(ids[start:start + chunk_size]))
+        return result
+    
     def get_with_autor_uris(self) -> List[Tuple[int, str]]:
         """Get propositions with their author URIs."""
         query = (
@@ -127,4 +166,674 @@ class ReferenceRepository(BaseRepository):
             if item.get('cod') == '':
                 del item['cod']
         
-        return self.bulk_upsert(data_list)
\ No newline at end of file
+        return self.bulk_upsert(data_list)
+
+
+# Natural-key parts the API may leave empty, per child table: a default value,
+# or a tuple of columns hashed into a stand-in value (see ChildRepository.complete_key)
+KEY_FILLS: Dict[str, Dict[str, Any]] = {
+    'despesas': {
+        # Expenses paid in a single installment come with parcela 0 or none at all
+        'parcela': 0,
+        # Some CEAP document types have no codDocumento
+        'codDocumento': ('ano', 'mes', 'tipoDespesa', 'dataDocumento', 'cnpjCpfFornecedor',
+                         'valorDocumento', 'urlDocumento'),
+    },
+}
+
+# Child-list query parameters that page or sort without filtering rows
+UNFILTERED_PARAMS = {'pagina', 'itens', 'ordem', 'ordenarPor'}
+# Filters that match a column of the same name (e.g. despesas ?ano=2023&mes=5)
+VALUE_FILTERS = {'ano', 'mes'}
+# Column that dataInicio/dataFim filter on, per child table
+DATE_FILTER_COLUMNS = {
+    'discursos': 'dataHoraInicio',
+    'tramitacoes': 'dataHora',
+}
+
+
+class ChildRepository:
+    """
+    Diff-based sync for child tables keyed by a natural key, e.g.
+    (proposicao_id, sequencia) for tramitações or (votacao_id, deputado_id) for votos.
+    
+    New rows are inserted, rows whose non-key columns changed are updated and
+    rows that vanished from the API are deleted, one parent at a time, so the
+    table is never emptied while it is being rebuilt.
+    """
+    
+    def __init__(self, session: Session, model: Any, parent_fk: str):
+        self.session = session
+        self.model = model
+        self.table = getattr(model, '__table__', model)
+        self.parent_fk = parent_fk
+        self.natural_key = self.find_natural_key(self.table, parent_fk)
+        if self.natural_key is None:
+            raise ValueError(f"{self.table.name} has no natural key including '{parent_fk}'")
+        self.inserted_or_updated = 0
+        self.deleted = 0
+        self.skipped = 0
+    
+    @staticmethod
+    def find_natural_key(table: Any, parent_fk: str) -> Optional[List[str]]:
+        """The first unique (or composite primary) key that contains the parent FK."""
+        for constraint in table.constraints:
+            if isinstance(constraint, (UniqueConstraint, PrimaryKeyConstraint)):
+                names = [column.name for column in constraint.columns]
+                if parent_fk in names and len(names) > 1:
+                    return names
+        return None
+    
+    @staticmethod
+    def key_of(natural_key: List[str], row: Dict[str, Any]) -> Optional[Tuple]:
+        key = tuple(row.get(name) for name in natural_key)
+        return None if any(part is None for part in key) else key
+    
+    @staticmethod
+    def stand_in_code(row: Dict[str, Any], columns: Tuple[str, ...]) -> int:
+        """
+        Stable stand-in for a missing integer key part, derived from other columns.
+        Negative, so it never matches a real code, and within a 32-bit INTEGER.
+        """
+        payload = json.dumps([row.get(name) for name in columns], default=str)
+        digest = hashlib.sha1(payload.encode()).digest()
+        return -(int.from_bytes(digest[:4], 'big') & 0x7FFFFFFF) - 1
+    
+    @classmethod
+    def complete_key(cls, table_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill natural-key parts the API left empty (see KEY_FILLS), in place."""
+        for name, fill in KEY_FILLS.get(table_name, {}).items():
+            if row.get(name) is None:
+                row[name] = cls.stand_in_code(row, fill) if isinstance(fill, tuple) else fill
+        return row
+    
+    def upsert(self, rows: Iterable[Dict[str, Any]], only_changed: bool = True) -> int:
+        """
+        Insert new rows and update changed ones (every conflicting one without
+        `only_changed`). Empty key parts are filled first (see KEY_FILLS); rows
+        still without a full natural key are skipped and counted in `skipped`.
+        """
+        unique_rows = {}
+        for row in rows:
+            key = self.key_of(self.natural_key, self.complete_key(self.table.name, row))
+            if key is None:
+                self.skipped += 1
+                continue
+            unique_rows[key] = row
+        if not unique_rows:
+            return 0
+        
+        # Child tables are the largest ones; big batches go through COPY on PostgreSQL
+        result = bulk_load(self.session, self.table, list(unique_rows.values()), index_elements=self.natural_key,
+                           only_changed=only_changed)
+        self.inserted_or_updated += result.written
+        return result.written
+    
+    def delete_vanished(self, current_keys: Dict[Any, Set[Tuple]],
+                        scope: Optional[Dict[str, Iterable[Any]]] = None,
+                        where: Iterable[Any] = ()) -> int:
+        """
+        Delete rows of each parent whose natural key is not in `current_keys[parent]`.
+        Only pass parents whose children were fetched completely.
+        `scope` limits deletions to rows whose columns take one of the given values,
+        for syncs that only see part of each parent's children (e.g. authors by deputy);
+        `where` adds arbitrary clauses, such as the date window from `window_clauses`.
+        """
+        deleted = 0
+        fk_column = self.table.columns[self.parent_fk]
+        key_columns = [self.table.columns[name] for name in self.natural_key]
+        scope_clauses = [self.table.columns[name].in_(list(values)) for name, values in (scope or {}).items()]
+        scope_clauses.extend(where)
+        for parent_id, keys in current_keys.items():
+            stmt = delete(self.table).where(fk_column == parent_id, *scope_clauses)
+            if keys:
+                stmt = stmt.where(~tuple_(*key_columns).in_(list(keys)))
+            deleted += self.session.execute(stmt).rowcount
+        self.deleted += deleted
+        return deleted
+    
+    def window_clauses(self, params: Optional[Dict[str, Any]]) -> Optional[List[Any]]:
+        """
+        Clauses selecting the rows an API call with `params` can return, so
+        pruning never reaches children outside the fetched window (e.g. other
+        years' expenses). Returns None when a filter cannot be translated, in
+        which case nothing should be pruned.
+        """
+        clauses = []
+        for name, value in (params or {}).items():
+            if name in UNFILTERED_PARAMS:
+                continue
+            if name in VALUE_FILTERS and name in self.table.columns:
+                values = value if isinstance(value, (list, tuple, set)) else str(value).split(',')
+                clauses.append(self.table.columns[name].in_([int(v) if str(v).strip().isdigit() else v
+                                                              for v in values]))
+                continue
+            column_name = DATE_FILTER_COLUMNS.get(self.table.name)
+            if name not in ('dataInicio', 'dataFim') or column_name is None:
+                return None
+            column = self.table.columns[column_name]
+            bound = date.fromisoformat(str(value)[:10])
+            if name == 'dataInicio':
+                clauses.append(column >= bound)
+            else:
+                # dataFim includes the whole day
+                clauses.append(column < bound + timedelta(days=1))
+        return clauses
+    
+    def sync(self, rows: List[Dict[str, Any]], current_keys: Dict[Any, Set[Tuple]],
+             params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Apply one batch: upsert `rows`, then prune the completed parents, in one transaction.
+        `params` are the filters the children were fetched with; pruning is limited
+        to that window, and skipped when the window is unknown.
+        """
+        self.upsert(rows)
+        where = self.window_clauses(params)
+        if where is None:
+            logger.info("Not pruning %s: filters %s cannot be mapped to columns", self.table.name, params)
+        else:
+            self.delete_vanished(current_keys, where=where)
+        self.session.commit()
+
+
+class ChildKeyTracker:
+    """
+    Collects the natural keys seen for each parent while its children stream
+    through the sync pipeline, possibly split across several write batches.
+    """
+    
+    def __init__(self, natural_key: List[str], parent_fk: str, table_name: Optional[str] = None):
+        self.natural_key = natural_key
+        self.parent_fk = parent_fk
+        self.table_name = table_name
+        self._seen: Dict[Any, Set[Tuple]] = {}
+    
+    def add(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            if self.table_name:
+                ChildRepository.complete_key(self.table_name, row)
+            key = ChildRepository.key_of(self.natural_key, row)
+            if key is not None:
+                self._seen.setdefault(row[self.parent_fk], set()).add(key)
+    
+    def pop(self, parent_ids: Iterable[Any]) -> Dict[Any, Set[Tuple]]:
+        """Keys of parents whose children are complete; parents without children map to an empty set."""
+        return {parent_id: self._seen.pop(parent_id, set()) for parent_id in parent_ids}
+
+
+class SyncStateRepository:
+    """Repository for per-endpoint sync watermarks."""
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import SyncState
+        self.session = session
+        self.model = SyncState
+    
+    @staticmethod
+    def params_key(params: Dict[str, Any]) -> str:
+        """Canonical representation of a parameter set."""
+        return json.dumps(params or {}, sort_keys=True, default=str)
+    
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        query = select(self.model).where(
+            self.model.endpoint == endpoint,
+            self.model.params_key == self.params_key(params)
+        )
+        return self.session.execute(query).scalars().first()
+    
+    def get_watermark(self, endpoint: str, params: Dict[str, Any]) -> Optional[str]:
+        state = self.get(endpoint, params)
+        return state.watermark if state else None
+    
+    def set_watermark(self, endpoint: str, params: Dict[str, Any], watermark: str, records_synced: Optional[int] = None) -> None:
+        state = self.get(endpoint, params)
+        if state is None:
+            state = self.model(endpoint=endpoint, params_key=self.params_key(params))
+            self.session.add(state)
+        state.watermark = watermark
+        state.records_synced = records_synced
+        self.session.commit()
+
+
+class CheckpointRepository:
+    """Repository for durable sync checkpoints used to resume interrupted runs."""
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import SyncCheckpoint
+        self.session = session
+        self.model = SyncCheckpoint
+    
+    def get(self, job_key: str) -> Optional[Any]:
+        query = select(self.model).where(self.model.job_key == job_key)
+        return self.session.execute(query).scalars().first()
+    
+    def start(self, job_key: str, discovered: List[Any]) -> Any:
+        """Start a fresh checkpoint for `job_key`, discarding any previous progress."""
+        checkpoint = self.get(job_key)
+        if checkpoint is None:
+            checkpoint = self.model(job_key=job_key)
+            self.session.add(checkpoint)
+        checkpoint.status = "running"
+        checkpoint.discovered = list(discovered)
+        checkpoint.completed_ranges = []
+        checkpoint.failed = []
+        self.session.commit()
+        return checkpoint
+    
+    def set_discovered(self, job_key: str, discovered: List[Any]) -> None:
+        """Store the items discovered so far; only this column is written, so it never races `mark_completed`."""
+        self.session.execute(
+            update(self.model).where(self.model.job_key == job_key).values(discovered=list(discovered))
+        )
+        self.session.commit()
+    
+    @staticmethod
+    def merge_ranges(ranges: List[List[int]], offsets: List[int]) -> List[List[int]]:
+        """Merge completed offsets into a sorted list of [start, end) ranges."""
+        points = sorted([tuple(r) for r in ranges] + [(o, o + 1) for o in offsets])
+        merged: List[List[int]] = []
+        for start, end in points:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+    
+    @staticmethod
+    def is_completed(ranges: List[List[int]], offset: int) -> bool:
+        return any(start <= offset < end for start, end in ranges)
+    
+    def mark_completed(self, job_key: str, offsets: List[int]) -> None:
+        if not offsets:
+            return
+        checkpoint = self.get(job_key)
+        checkpoint.completed_ranges = self.merge_ranges(checkpoint.completed_ranges or [], offsets)
+        self.session.commit()
+    
+    def mark_failed(self, job_key: str, items: List[Any]) -> None:
+        if not items:
+            return
+        checkpoint = self.get(job_key)
+        checkpoint.failed = list(checkpoint.failed or []) + list(items)
+        self.session.commit()
+    
+    def finish(self, job_key: str) -> None:
+        checkpoint = self.get(job_key)
+        checkpoint.status = "done"
+        self.session.commit()
+
+
+class FreshnessRepository:
+    """Repository for per-record freshness used by the staleness-driven refresh scheduler."""
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import SyncFreshness
+        self.session = session
+        self.model = SyncFreshness
+    
+    def unregistered(self, entity: str, model: Type, columns: List[str], limit: int) -> List[Any]:
+        """Rows of `model` (only `columns`) that have no freshness entry yet."""
+        pk = model.__mapper__.primary_key[0]
+        registered = select(self.model.id).where(
+            self.model.entity == entity,
+            self.model.record_id == cast(pk, String),
+        )
+        query = (
+            select(pk.label('id'), *[model.__table__.columns[name] for name in columns])
+            .where(~registered.exists())
+            .limit(limit)
+        )
+        return self.session.execute(query).all()
+    
+    def register(self, entries: List[Dict[str, Any]]) -> int:
+        """Insert freshness entries, leaving existing ones untouched."""
+        if not entries:
+            return 0
+        written = bulk_upsert(self.session, self.model, entries, index_elements=['entity', 'record_id'],
+                              update=False).written
+        self.session.commit()
+        return written
+    
+    def _seconds_overdue(self, now: datetime) -> Any:
+        """SQL expression for the seconds elapsed between `next_due_at` and `now`."""
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return func.extract('epoch', cast(now, DateTime) - self.model.next_due_at)
+        if dialect == "sqlite":
+            return (func.julianday(now.isoformat(sep=' ')) - func.julianday(self.model.next_due_at)) * 86400
+        return None
+    
+    def due(self, now: Any, limit: int) -> List[Any]:
+        """
+        Entries whose next revisit is due, most overdue relative to their own
+        interval first: `(now - next_due_at) / interval_seconds`, computed in SQL
+        so the whole due set is ranked, not just its oldest entries. Dialects
+        without a known date arithmetic fall back to the oldest due first.
+        """
+        overdue = self._seconds_overdue(now)
+        if overdue is None:
+            order = asc(self.model.next_due_at)
+        else:
+            order = desc(overdue / func.coalesce(func.nullif(self.model.interval_seconds, 0), 1))
+        query = (
+            select(self.model)
+            .where(self.model.next_due_at <= now)
+            .order_by(order, asc(self.model.id))
+            .limit(limit)
+        )
+        return self.session.execute(query).scalars().all()
+    
+    def count_due(self, now: Any) -> int:
+        query = select(func.count(self.model.id)).where(self.model.next_due_at <= now)
+        return self.session.execute(query).scalar() or 0
+
+
+class DeadLetterRepository:
+    """Repository for failed work items awaiting a deferred retry."""
+    
+    # Retries back off from BASE_DELAY, doubling up to MAX_DELAY; after MAX_ATTEMPTS the item is abandoned
+    BASE_DELAY_SECONDS = 300
+    MAX_DELAY_SECONDS = 24 * 3600
+    MAX_ATTEMPTS = 8
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import SyncDeadLetter
+        self.session = session
+        self.model = SyncDeadLetter
+    
+    @classmethod
+    def backoff(cls, attempts: int) -> timedelta:
+        return timedelta(seconds=min(cls.MAX_DELAY_SECONDS, cls.BASE_DELAY_SECONDS * 2 ** max(0, attempts - 1)))
+    
+    @staticmethod
+    def is_permanent(error_class: Optional[str]) -> bool:
+        """Client errors other than timeouts and throttling will not go away by retrying."""
+        return bool(error_class) and error_class.startswith("HTTP 4") and error_class not in ("HTTP 408", "HTTP 429")
+    
+    def record(self, kind: str, entity: str, failures: List[Tuple[Any, Optional[str]]],
+               context: Optional[Dict[str, Any]] = None) -> int:
+        """Store (work item, error class) failures, bumping the attempt count of known ones."""
+        if not failures:
+            return 0
+        now = datetime.utcnow()
+        items = {str(item): error for item, error in failures}
+        existing = {
+            letter.work_item: letter
+            for start in range(0, len(items), 5000)
+            for letter in self.session.execute(select(self.model).where(
+                self.model.kind == kind, self.model.entity == entity,
+                self.model.work_item.in_(list(items)[start:start + 5000])
+            )).scalars()
+        }
+        for item, error in items.items():
+            letter = existing.get(item)
+            if letter is None:
+                letter = self.model(kind=kind, entity=entity, work_item=item, attempts=0, first_failed_at=now)
+                self.session.add(letter)
+            letter.attempts = (letter.attempts or 0) + 1
+            letter.context = context
+            letter.error_class = error
+            letter.last_failed_at = now
+            if self.is_permanent(error) or letter.attempts >= self.MAX_ATTEMPTS:
+                letter.status = "abandoned"
+                letter.next_attempt_at = None
+            else:
+                letter.status = "pending"
+                letter.next_attempt_at = now + self.backoff(letter.attempts)
+        self.session.commit()
+        return len(items)
+    
+    def due(self, limit: Optional[int] = None, now: Optional[datetime] = None) -> List[Any]:
+        """Pending items whose next attempt is due, the oldest first."""
+        query = (
+            select(self.model)
+            .where(self.model.status == "pending", self.model.next_attempt_at <= (now or datetime.utcnow()))
+            .order_by(asc(self.model.next_attempt_at))
+        )
+        if limit:
+            query = query.limit(limit)
+        return self.session.execute(query).scalars().all()
+    
+    def resolve(self, kind: str, entity: str, work_items: Iterable[Any],
+                failed_before: Optional[datetime] = None) -> int:
+        """
+        Mark items as resolved once they were fetched and written successfully.
+        With `failed_before`, items that failed again after that moment are left pending.
+        """
+        work_items = [str(item) for item in work_items]
+        resolved = 0
+        for start in range(0, len(work_items), 5000):
+            stmt = (
+                update(self.model)
+                .where(self.model.kind == kind, self.model.entity == entity,
+                       self.model.work_item.in_(work_items[start:start + 5000]),
+                       self.model.status == "pending")
+                .values(status="resolved", next_attempt_at=None)
+            )
+            if failed_before is not None:
+                stmt = stmt.where(self.model.last_failed_at < failed_before)
+            result = self.session.execute(stmt)
+            resolved += result.rowcount
+        self.session.commit()
+        return resolved
+    
+    def counts(self) -> Dict[str, int]:
+        query = select(self.model.status, func.count(self.model.id)).group_by(self.model.status)
+        return dict(self.session.execute(query).all())
+
+
+class BackfillJobRepository:
+    """
+    Repository for backfill partitions leased to worker processes.
+    
+    A claim picks the next pending partition (or one whose lease expired) and
+    takes it with a conditional update, so two workers never hold the same
+    partition. On Postgres the candidate row is read with
+    `FOR UPDATE SKIP LOCKED`, letting concurrent workers pick different rows
+    without waiting on each other; SQLite has no row locks, so claims from
+    processes on the same machine are serialized by a file lock next to the
+    database instead.
+    """
+    
+    # A partition that failed (or lost its worker) this many times is given up
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import BackfillJob
+        self.session = session
+        self.model = BackfillJob
+    
+    def enqueue(self, jobs: List[Dict[str, Any]]) -> int:
+        """Insert partitions, leaving existing ones (and their progress) untouched."""
+        if not jobs:
+            return 0
+        written = bulk_upsert(self.session, self.model, jobs, index_elements=['job_key'], update=False).written
+        self.session.commit()
+        return written
+    
+    @contextmanager
+    def _claim_lock(self) -> Iterator[None]:
+        bind = self.session.get_bind()
+        if bind.dialect.name != "sqlite" or fcntl is None:
+            yield
+            return
+        database = bind.url.database
+        if database and database != ":memory:":
+            path = f"{database}.backfill.lock"
+        else:
+            path = os.path.join(tempfile.gettempdir(), "camara_insights_backfill.lock")
+        with open(path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+    
+    def _claimable(self, now: datetime):
+        expired = and_(self.model.status == "running", self.model.lease_expires_at < now,
+                       self.model.attempts < self.MAX_ATTEMPTS)
+        return or_(self.model.status == "pending", expired)
+    
+    def _give_up_expired(self, now: datetime) -> None:
+        """Partitions whose lease expired too many times (e.g. they keep killing the worker) are failed."""
+        self.session.execute(
+            update(self.model)
+            .where(self.model.status == "running", self.model.lease_expires_at < now,
+                   self.model.attempts >= self.MAX_ATTEMPTS)
+            .values(status="failed", lease_owner=None, lease_expires_at=None, error="lease expired")
+        )
+    
+    def claim(self, owner: str, lease_seconds: int, now: Optional[datetime] = None) -> Optional[Any]:
+        """
+        Lease the next available partition to `owner`, lowest phase first.
+        A partition is only available once every partition of an earlier phase
+        is done or failed. Returns None when nothing can be claimed right now.
+        """
+        now = now or datetime.utcnow()
+        earlier = aliased(self.model)
+        earlier_unfinished = select(earlier.id).where(
+            earlier.phase < self.model.phase, earlier.status.in_(("pending", "running"))
+        )
+        query = (
+            select(self.model)
+            .where(self._claimable(now), ~earlier_unfinished.exists())
+            .order_by(asc(self.model.phase), asc(self.model.id))
+            .limit(1)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True, of=self.model)
+        
+        with self._claim_lock():
+            self._give_up_expired(now)
+            job = self.session.execute(query).scalars().first()
+            if job is None:
+                self.session.commit()
+                return None
+            result = self.session.execute(
+                update(self.model)
+                .where(self.model.id == job.id, self._claimable(now))
+                .values(status="running", lease_owner=owner,
+                        lease_expires_at=now + timedelta(seconds=lease_seconds),
+                        attempts=self.model.attempts + 1, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+        if result.rowcount != 1:
+            return None
+        self.session.refresh(job)
+        return job
+    
+    def _owned(self, job_id: int, owner: str):
+        return update(self.model).where(
+            self.model.id == job_id, self.model.lease_owner == owner, self.model.status == "running"
+        ).execution_options(synchronize_session=False)
+    
+    def renew(self, job_id: int, owner: str, lease_seconds: int) -> bool:
+        """Extend the lease; False means the lease expired and was taken by another worker."""
+        now = datetime.utcnow()
+        result = self.session.execute(
+            self._owned(job_id, owner).values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+    
+    def complete(self, job_id: int, owner: str, records_synced: int) -> bool:
+        result = self.session.execute(
+            self._owned(job_id, owner).values(status="done", records_synced=records_synced, error=None,
+                                              lease_owner=None, lease_expires_at=None)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+    
+    def fail(self, job_id: int, owner: str, error: str) -> Optional[str]:
+        """Release a failed partition for another attempt, or give it up after MAX_ATTEMPTS."""
+        job = self.session.get(self.model, job_id)
+        if job is None or job.lease_owner != owner or job.status != "running":
+            self.session.rollback()
+            return None
+        job.status = "failed" if job.attempts >= self.MAX_ATTEMPTS else "pending"
+        job.error = error[:500]
+        job.lease_owner = None
+        job.lease_expires_at = None
+        self.session.commit()
+        return job.status
+    
+    def counts(self) -> Dict[str, int]:
+        query = select(self.model.status, func.count(self.model.id)).group_by(self.model.status)
+        return dict(self.session.execute(query).all())
+
+
+class RawPayloadRepository:
+    """
+    Repository for the compressed archive of raw API payloads (see src.data.archive).
+    
+    One row is kept per distinct content of a URI: archiving a payload that is
+    already stored only moves its `fetched_at` forward, so the archive grows
+    with changes rather than with fetches.
+    """
+    
+    def __init__(self, session: Session):
+        from app.infra.db.models.sync import RawPayload
+        self.session = session
+        self.model = RawPayload
+    
+    def store(self, entity: str, entries: List[Tuple[str, Optional[str], Optional[str], str, bytes]]) -> int:
+        """Compress and archive (uri, parent_fk, parent_id, hash, encoded JSON) entries; returns new versions."""
+        from src.data.archive import compress
+        if not entries:
+            return 0
+        now = datetime.utcnow()
+        rows = {}
+        for uri, parent_fk, parent_id, payload_hash, encoded in entries:
+            codec, blob = compress(encoded)
+            rows[(uri, payload_hash)] = {
+                "entity": entity, "uri": uri, "parent_fk": parent_fk, "parent_id": parent_id,
+                "payload_hash": payload_hash, "codec": codec, "payload": blob,
+                "first_fetched_at": now, "fetched_at": now,
+            }
+        written = bulk_upsert(self.session, self.model, list(rows.values()),
+                              index_elements=['uri', 'payload_hash'], update=False).written
+        keys = list(rows)
+        for start in range(0, len(keys), 500):
+            self.session.execute(
+                update(self.model)
+                .where(tuple_(self.model.uri, self.model.payload_hash).in_(keys[start:start + 500]))
+                .values(fetched_at=now)
+            )
+        self.session.commit()
+        return written
+    
+    def entities(self) -> List[str]:
+        return [row[0] for row in self.session.execute(select(self.model.entity).distinct().order_by(self.model.entity))]
+    
+    def iter_latest(self, entity: str, page_size: int = 1000) -> Iterator[Any]:
+        """
+        The most recent version of every archived URI of `entity`, in URI order.
+        Pages are read by keyset on the URI, so no cursor stays open while the
+        caller writes.
+        """
+        last_uri = None
+        while True:
+            query = select(
+                self.model.uri, self.model.parent_fk, self.model.parent_id, self.model.codec, self.model.payload
+            ).where(self.model.entity == entity)
+            if last_uri is not None:
+                query = query.where(self.model.uri > last_uri)
+            rows = self.session.execute(
+                query.order_by(self.model.uri, desc(self.model.fetched_at), desc(self.model.id)).limit(page_size)
+            ).all()
+            self.session.commit()
+            if not rows:
+                return
+            for row in rows:
+                # Versions come newest first; older ones of a URI are skipped
+                if row.uri != last_uri:
+                    last_uri = row.uri
+                    yield row
+    
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """(versions, compressed bytes) per entity."""
+        query = select(
+            self.model.entity, func.count(self.model.id), func.sum(func.length(self.model.payload))
+        ).group_by(self.model.entity)
+        return {entity: (count, size or 0) for entity, count, size in self.session.execute(query)}
@@ -0,0 +1,157 @@
+"""
+Dialect-aware bulk upsert engine.
+Every write path (repositories, CRUD helpers, sync scripts) goes through
+`bulk_upsert`, which picks the native fast path of the database in use:
+`INSERT ... ON CONFLICT` on PostgreSQL and SQLite, and a per-row merge
+anywhere else. Statements are chunked to stay under the driver's limit of
+bind parameters.
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.data.hashing import HASH_COLUMN, add_content_hashes
+
+# Maximum bind parameters per statement, by dialect name.
+# SQLite raised SQLITE_MAX_VARIABLE_NUMBER from 999 to 32766 in 3.32.
+MAX_BIND_PARAMS = {
+    "postgresql": 32767,
+    "sqlite": 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999,
+}
+DEFAULT_MAX_BIND_PARAMS = 999
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of one `bulk_upsert` call."""
+    rows: int = 0
+    written: int = 0  # inserted or actually updated
+    statements: int = 0
+    returned: List[Any] = field(default_factory=list)
+
+    @property
+    def unchanged(self) -> int:
+        return self.rows - self.written
+
+
+def table_of(target: Any):
+    """Accepts a mapped class or a Table."""
+    return getattr(target, '__table__', target)
+
+
+def chunk_size(dialect_name: str, columns: int) -> int:
+    """Rows per statement that keep `rows * columns` under the bind-parameter limit."""
+    limit = MAX_BIND_PARAMS.get(dialect_name, DEFAULT_MAX_BIND_PARAMS)
+    return max(1, limit // max(1, columns))
+
+
+def group_by_columns(rows: Iterable[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+    """
+    Multi-row VALUES needs the same keys in every row. Grouping by key set
+    also keeps columns missing from a payload untouched on update.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def changed_clause(table, excluded, update_columns: Sequence[str]):
+    """
+    Only rewrite a conflicting row when something actually differs. Tables with
+    a `content_hash` column compare the hash alone (see src.data.hashing);
+    the others compare every updated column.
+    """
+    if HASH_COLUMN in update_columns:
+        return table.columns[HASH_COLUMN].is_distinct_from(excluded[HASH_COLUMN])
+    return or_(*[table.columns[name].is_distinct_from(excluded[name]) for name in update_columns])
+
+
+def on_conflict(stmt, table, conflict_columns: Sequence[str], columns: Sequence[str],
+                update: bool = True, only_changed: bool = True):
+    """Attach the ON CONFLICT clause shared by every upsert strategy to a dialect insert."""
+    update_columns = [
+        name for name in columns
+        if name not in conflict_columns and not table.columns[name].primary_key
+    ]
+    if update and update_columns:
+        return stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={name: stmt.excluded[name] for name in update_columns},
+            where=changed_clause(table, stmt.excluded, update_columns) if only_changed else None,
+        )
+    return stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+
+def bulk_upsert(
+    session: Session,
+    target: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: Optional[Sequence[str]] = None,
+    update: bool = True,
+    only_changed: bool = True,
+    returning: bool = False,
+) -> UpsertResult:
+    """
+    Insert `rows` into `target`, resolving conflicts on `index_elements`
+    (the primary key by default).
+
+    - `update=False` keeps existing rows as they are (ON CONFLICT DO NOTHING).
+    - `only_changed` skips updates that would not change the stored row, using
+      the content hash when the table has one.
+    - `returning` collects the primary keys of written rows where the dialect
+      supports RETURNING.
+
+    Does not commit; the caller owns the transaction.
+    """
+    result = UpsertResult(rows=len(rows))
+    if not rows:
+        return result
+
+    table = table_of(target)
+    add_content_hashes(table, rows)
+    dialect_name = session.get_bind().dialect.name
+    insert = _INSERTS.get(dialect_name)
+    if insert is None:
+        return _merge_rows(session, target, rows, result)
+
+    conflict_columns = list(index_elements or [c.name for c in table.primary_key.columns])
+    primary_key = list(table.primary_key.columns)
+    can_return = returning and session.get_bind().dialect.insert_returning
+
+    for columns, group in group_by_columns(rows).items():
+        size = chunk_size(dialect_name, len(columns))
+        for start in range(0, len(group), size):
+            stmt = insert(table).values(group[start:start + size])
+            stmt = on_conflict(stmt, table, conflict_columns, columns, update, only_changed)
+            if can_return:
+                stmt = stmt.returning(*primary_key)
+                returned = session.execute(stmt).all()
+                result.returned.extend(row[0] if len(primary_key) == 1 else tuple(row) for row in returned)
+                result.written += len(returned)
+            else:
+                rowcount = session.execute(stmt).rowcount
+                result.written += rowcount if rowcount >= 0 else len(group[start:start + size])
+            result.statements += 1
+    return result
+
+
+def _merge_rows(session: Session, target: Any, rows: List[Dict[str, Any]], result: UpsertResult) -> UpsertResult:
+    """Portable fallback for dialects without ON CONFLICT: one merge per row."""
+    if not hasattr(target, '__mapper__'):
+        raise NotImplementedError(f"No upsert strategy for dialect '{session.get_bind().dialect.name}'")
+    for row in rows:
+        session.merge(target(**row))
+        result.statements += 1
+    result.written = len(rows)
+    return result
@@ -0,0 +1,102 @@
+"""
+Background database writer.
+Runs write operations on a dedicated thread with its own session, so network
+fetching on the event loop and database writing overlap instead of alternating.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """
+    Applies write operations on a single background thread.
+
+    `submit` returns as soon as the operation is queued; once `max_pending`
+    operations are waiting, it blocks the caller (backpressure) until the
+    thread catches up. The first failure is re-raised on the next `submit`
+    or on `drain`.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_pending: int = 2):
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._session: Optional[Session] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: Set[asyncio.Future] = set()
+        self._error: Optional[BaseException] = None
+
+        self.operations = 0
+        self.db_seconds = 0.0
+
+    async def __aenter__(self) -> "BackgroundWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close(raise_errors=exc_type is None)
+
+    def _run(self, operation: Callable[[Session], Any]) -> Any:
+        """Executes one operation on the writer thread."""
+        if self._session is None:
+            self._session = self.session_factory()
+        started = time.monotonic()
+        try:
+            return operation(self._session)
+        except Exception:
+            self._session.rollback()
+            raise
+        finally:
+            self.db_seconds += time.monotonic() - started
+            self.operations += 1
+
+    def _on_done(self, future: asyncio.Future) -> None:
+        self._pending.discard(future)
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None and self._error is None:
+            self._error = future.exception()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def submit(self, operation: Callable[[Session], Any]) -> asyncio.Future:
+        """Queues `operation(session)` on the writer thread and returns its future."""
+        self._raise_if_failed()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, operation)
+        self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def drain(self) -> None:
+        """Waits for every queued operation and re-raises the first failure."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        self._raise_if_failed()
+
+    async def close(self, raise_errors: bool = True) -> None:
+        """Drains pending work, closes the writer session and stops the thread."""
+        try:
+            if raise_errors:
+                await self.drain()
+            elif self._pending:
+                await asyncio.gather(*list(self._pending), return_exceptions=True)
+        finally:
+            if self._session is not None:
+                session, self._session = self._session, None
+                await asyncio.get_running_loop().run_in_executor(self._executor, session.close)
+            self._executor.shutdown(wait=False)
+
+    def report(self) -> str:
+        return f"  - db writer: {self.operations} operations, {self.db_seconds:.1f}s in the database"
@@ -0,0 +1,320 @@
+"""
+Multi-process historical backfill.
+A backfill over several years is split into partitions (entity × year ×
+month) stored in `backfill_jobs`. Any number of worker processes, on one or
+several machines sharing the database, lease partitions one at a time and
+drain the table concurrently; a worker keeps its lease alive while it works,
+and if it dies the lease expires and another worker picks the partition up,
+resuming from the partition's checkpoint.
+
+Partitions run in phases: child tables (tramitações, votos, despesas,
+discursos) are only claimed once every parent partition is finished, since
+their parents are read from the database.
+"""
+
+import asyncio
+import calendar
+import multiprocessing
+import os
+import socket
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.infra.camara_api import camara_api_client
+from app.infra.db.models import entidades as models
+from app.infra.db.session import SessionLocal
+from src.data.repository import BackfillJobRepository
+from src.services.data_sync_service import DataSyncService
+
+# The 57th legislature started in 2023; each one lasts four years
+REFERENCE_LEGISLATURE = (57, 2023)
+
+
+def legislature_of(year: int) -> int:
+    number, start = REFERENCE_LEGISLATURE
+    return number + (year - start) // 4
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+@dataclass(frozen=True)
+class BackfillPlan:
+    """How one entity is partitioned and how a partition is synced."""
+    entity: str
+    phase: int
+    monthly: bool
+    # (service, year, month, checkpoint key) -> records synced
+    run: Callable[[DataSyncService, int, Optional[int], str], Any]
+    # Partition years for the requested years (e.g. one per legislature)
+    years: Callable[[Sequence[int]], List[int]] = list
+
+
+def _legislature_years(years: Sequence[int]) -> List[int]:
+    number, start = REFERENCE_LEGISLATURE
+    return sorted({start + (legislature_of(year) - number) * 4 for year in years})
+
+
+async def _deputados(service: DataSyncService, year: int, month: Optional[int], key: str) -> int:
+    ids = await service.sync_entity_with_details(
+        models.Deputado, "/deputados",
+        params={"idLegislatura": legislature_of(year), "itens": 100, "ordem": "ASC", "ordenarPor": "nome"},
+        checkpoint_key=key, resume=True,
+    )
+    return len(ids)
+
+
+def _monthly_details(model: Any, endpoint: str, start_param: str, end_param: str, order_by: str):
+    async def run(service: DataSyncService, year: int, month: Optional[int], key: str) -> int:
+        start, end = month_bounds(year, month)
+        ids = await service.sync_entity_with_details(
+            model, endpoint,
+            params={start_param: start.isoformat(), end_param: end.isoformat(),
+                     "itens": 100, "ordem": "ASC", "ordenarPor": order_by},
+            checkpoint_key=key, resume=True,
+        )
+        return len(ids)
+    return run
+
+
+def _monthly_children(parent_model: Any, date_column: str, child_model: Any, endpoint: str, fk: str):
+    """Children of the parents dated within the month, as stored by the phase-0 partitions."""
+    async def run(service: DataSyncService, year: int, month: Optional[int], key: str) -> int:
+        start, end = month_bounds(year, month)
+        column = getattr(parent_model, date_column)
+        pk = parent_model.__mapper__.primary_key[0]
+        parent_ids = [
+            row[0] for row in service.session.query(pk)
+            .filter(column >= start, column < date.fromordinal(end.toordinal() + 1))
+            .all()
+        ]
+        if not parent_ids:
+            return 0
+        return await service.sync_child_entities(
+            parent_model, child_model, endpoint, fk,
+            paginated=False, parent_ids_list=parent_ids,
+            checkpoint_key=key, resume=True,
+        )
+    return run
+
+
+def _yearly_deputy_children(child_model: Any, endpoint: str, params: Callable[[int], Dict[str, Any]]):
+    """
+    Children of every stored deputy for one year. Deputies are not filtered by
+    legislature: `ultimoStatus` only tells the latest one a deputy served in.
+    The year filter in `params` also scopes pruning (see ChildRepository.sync),
+    so partitions of different years never delete each other's rows.
+    """
+    async def run(service: DataSyncService, year: int, month: Optional[int], key: str) -> int:
+        return await service.sync_child_entities(
+            models.Deputado, child_model, endpoint, "deputado_id",
+            params=params(year), checkpoint_key=key, resume=True,
+        )
+    return run
+
+
+def _despesas_params(year: int) -> Dict[str, Any]:
+    return {"ano": year, "itens": 100}
+
+
+def _discursos_params(year: int) -> Dict[str, Any]:
+    return {"dataInicio": f"{year}-01-01", "dataFim": f"{year}-12-31", "itens": 100}
+
+
+PLANS = {
+    plan.entity: plan for plan in (
+        BackfillPlan("deputados", 0, False, _deputados, _legislature_years),
+        BackfillPlan("proposicoes", 0, True, _monthly_details(
+            models.Proposicao, "/proposicoes", "dataApresentacaoInicio", "dataApresentacaoFim", "id")),
+        BackfillPlan("eventos", 0, True, _monthly_details(
+            models.Evento, "/eventos", "dataInicio", "dataFim", "dataHoraInicio")),
+        BackfillPlan("votacoes", 0, True, _monthly_details(
+            models.Votacao, "/votacoes", "dataInicio", "dataFim", "dataHoraRegistro")),
+        BackfillPlan("tramitacoes", 1, True, _monthly_children(
+            models.Proposicao, "dataApresentacao", models.Tramitacao, "/proposicoes/{id}/tramitacoes", "proposicao_id")),
+        BackfillPlan("votos", 1, True, _monthly_children(
+            models.Votacao, "data", models.Voto, "/votacoes/{id}/votos", "votacao_id")),
+        BackfillPlan("despesas", 1, False, _yearly_deputy_children(
+            models.Despesa, "/deputados/{id}/despesas", _despesas_params)),
+        BackfillPlan("discursos", 1, False, _yearly_deputy_children(
+            models.Discurso, "/deputados/{id}/discursos", _discursos_params)),
+    )
+}
+
+
+def plan_backfill(from_year: int, to_year: int, entities: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Partitions (rows of `backfill_jobs`) for the given years and entities."""
+    years = list(range(from_year, to_year + 1))
+    jobs = []
+    for entity in entities or PLANS:
+        plan = PLANS[entity]
+        for year in plan.years(years):
+            months = range(1, 13) if plan.monthly else [None]
+            for month in months:
+                suffix = f"{year}-{month:02d}" if month else str(year)
+                jobs.append({
+                    "job_key": f"{entity}:{suffix}",
+                    "entity": entity,
+                    "year": year,
+                    "month": month,
+                    "phase": plan.phase,
+                    "status": "pending",
+                    "attempts": 0,
+                })
+    return jobs
+
+
+def enqueue_backfill(session: Session, from_year: int, to_year: int,
+                     entities: Optional[Sequence[str]] = None) -> int:
+    """Add the partitions of a backfill; partitions already queued keep their progress."""
+    jobs = plan_backfill(from_year, to_year, entities)
+    added = BackfillJobRepository(session).enqueue(jobs)
+    print(f"Backfill {from_year}-{to_year}: {len(jobs)} partitions planned, {added} new.")
+    return added
+
+
+class LeaseLost(Exception):
+    """The worker's lease on a partition expired and another worker may hold it now."""
+
+
+class BackfillWorker:
+    """Claims partitions one at a time and syncs them until the queue is drained."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        owner: Optional[str] = None,
+        lease_seconds: int = 900,
+        poll_seconds: float = 30.0,
+        concurrency_limit: int = 10,
+        batch_size: int = 50,
+    ):
+        self.session_factory = session_factory
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.concurrency_limit = concurrency_limit
+        self.batch_size = batch_size
+        self.completed = 0
+        self.failed = 0
+
+    async def _keep_lease(self, job_id: int, task: asyncio.Future) -> None:
+        """
+        Renew the lease every third of its duration; cancel the partition if it
+        was lost. A renewal that fails (e.g. the database is unreachable) counts
+        as lost too, since the lease can no longer be guaranteed.
+        """
+        session = self.session_factory()
+        repository = BackfillJobRepository(session)
+        try:
+            while not task.done():
+                await asyncio.sleep(self.lease_seconds / 3)
+                try:
+                    renewed = repository.renew(job_id, self.owner, self.lease_seconds)
+                except Exception as e:
+                    session.rollback()
+                    print(f"[{self.owner}] Could not renew the lease on job {job_id} ({type(e).__name__}: {e}); "
+                          f"aborting the partition.")
+                    task.cancel()
+                    raise LeaseLost() from e
+                if not renewed:
+                    task.cancel()
+                    raise LeaseLost()
+        finally:
+            session.close()
+
+    async def _sync_partition(self, session: Session, job: Any) -> int:
+        service = DataSyncService(session, concurrency_limit=self.concurrency_limit, batch_size=self.batch_size)
+        return await PLANS[job.entity].run(service, job.year, job.month, f"backfill:{job.job_key}")
+
+    async def run_job(self, repository: BackfillJobRepository, job: Any) -> None:
+        print(f"[{self.owner}] Backfilling {job.job_key} (attempt {job.attempts}).")
+        session = self.session_factory()
+        task = asyncio.ensure_future(self._sync_partition(session, job))
+        keeper = asyncio.ensure_future(self._keep_lease(job.id, task))
+        try:
+            records = await task
+            repository.complete(job.id, self.owner, records)
+            self.completed += 1
+            print(f"[{self.owner}] {job.job_key} done: {records} records.")
+        except asyncio.CancelledError:
+            if not (keeper.done() and not keeper.cancelled() and isinstance(keeper.exception(), LeaseLost)):
+                raise
+            session.rollback()
+            print(f"[{self.owner}] Lost the lease on {job.job_key}; leaving it to its new owner.")
+        except Exception as e:
+            session.rollback()
+            status = repository.fail(job.id, self.owner, f"{type(e).__name__}: {e}")
+            self.failed += 1
+            print(f"[{self.owner}] {job.job_key} failed ({e}); partition is now {status}.")
+        finally:
+            keeper.cancel()
+            session.close()
+
+    async def run(self) -> Dict[str, int]:
+        """Drain the queue; waits while other workers hold the remaining partitions."""
+        session = self.session_factory()
+        repository = BackfillJobRepository(session)
+        try:
+            while True:
+                job = repository.claim(self.owner, self.lease_seconds)
+                if job is not None:
+                    await self.run_job(repository, job)
+                    continue
+                counts = repository.counts()
+                if not counts.get("pending") and not counts.get("running"):
+                    break
+                await asyncio.sleep(self.poll_seconds)
+        finally:
+            session.close()
+        print(f"[{self.owner}] Worker finished: {self.completed} partitions done, {self.failed} failed attempts.")
+        return {"completed": self.completed, "failed": self.failed}
+
+
+def _share_rate_limit(workers: int) -> None:
+    """
+    Each process has its own rate limiter; the processes of one machine split
+    its request budget so that together they stay within the configured rate.
+    """
+    limiter = camara_api_client.rate_limiter
+    limiter.rate = max(limiter.min_rate, limiter.rate / workers)
+    limiter.max_rate = max(limiter.min_rate, limiter.max_rate / workers)
+
+
+def _worker_process(workers: int, lease_seconds: int, poll_seconds: float) -> None:
+    _share_rate_limit(workers)
+
+    async def main():
+        try:
+            await BackfillWorker(lease_seconds=lease_seconds, poll_seconds=poll_seconds).run()
+        finally:
+            await camara_api_client.aclose()
+
+    asyncio.run(main())
+
+
+def run_workers(workers: int = 4, lease_seconds: int = 900, poll_seconds: float = 30.0) -> Dict[str, int]:
+    """Drain the backfill queue with `workers` processes, each with its own connections and event loop."""
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(workers, lease_seconds, poll_seconds),
+                        name=f"backfill-worker-{index}")
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    session = SessionLocal()
+    try:
+        counts = BackfillJobRepository(session).counts()
+    finally:
+        session.close()
+    crashed = sum(1 for process in processes if process.exitcode != 0)
+    print(f"Backfill workers finished ({crashed} exited with an error). Partitions by status: {counts}")
+    return counts
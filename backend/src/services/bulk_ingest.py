@@ -0,0 +1,237 @@
+"""
+Ingestion of the Câmara bulk data files.
+The yearly files (proposicoes-2023.json, votacoes-2023.csv,
+votacoesVotos-2023.csv, the CEAP Ano-2023.csv.zip...) hold what a sync
+assembles from hundreds of thousands of API calls. Records are streamed from
+local files in batches, renamed to the keys the API uses, decoded by the same
+model codecs and bulk loaded (COPY on PostgreSQL for large batches), so an
+initial load or a historical backfill barely touches the API.
+
+Rows pointing at parents that are not stored (e.g. expenses of a deputy who
+was never synced) are dropped and counted; load deputados and the reference
+tables first, and parent files before their children.
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Float, Integer, Numeric, select
+from sqlalchemy.orm import Session
+
+from app.infra.db.models import entidades as models
+from src.data.bulk_files import batched, flatten, iter_records
+from src.data.codecs import get_codec
+from src.data.copy_loader import bulk_load
+from src.data.repository import ChildRepository
+
+# Bulk `ultimoStatus` fields whose API (statusProposicao) name differs
+_STATUS_RENAMES = {"uriRelator": "uriUltimoRelator", "idTipoTramitacao": "codTipoTramitacao",
+                   "idSituacao": "codSituacao"}
+
+# CEAP columns -> keys of /deputados/{id}/despesas
+_CEAP_RENAMES = {
+    "ideCadastro": "deputado_id",
+    "numAno": "ano",
+    "numMes": "mes",
+    "txtDescricao": "tipoDespesa",
+    "datEmissao": "dataDocumento",
+    "vlrDocumento": "valorDocumento",
+    "vlrLiquido": "valorLiquido",
+    "txtFornecedor": "nomeFornecedor",
+    "txtCNPJCPF": "cnpjCpfFornecedor",
+    "ideDocumento": "codDocumento",
+    "numParcela": "parcela",
+}
+
+
+def _proposicao_keys(record: Dict[str, Any]) -> Dict[str, Any]:
+    renamed = {}
+    for key, value in record.items():
+        if key.startswith("ultimoStatus_"):
+            name = key[len("ultimoStatus_"):]
+            key = f"statusProposicao_{_STATUS_RENAMES.get(name, name)}"
+        renamed[key] = value
+    return renamed
+
+
+def _renamer(renames: Dict[str, str]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    def rename(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {renames.get(key, key): value for key, value in record.items()}
+    return rename
+
+
+@dataclass(frozen=True)
+class BulkDataset:
+    """One kind of bulk file: which table it feeds and how its keys map to the API's."""
+    name: str
+    model: Any
+    file_pattern: str  # matched against the file name
+    parent_fk: Optional[str] = None  # set for child tables, upserted by natural key
+    prepare: Callable[[Dict[str, Any]], Dict[str, Any]] = lambda record: record
+    # Records that have no row in the table (e.g. CEAP expenses of party leaderships)
+    skip: Callable[[Dict[str, Any]], bool] = lambda record: False
+
+
+# In load order: parents before their children
+DATASETS = {
+    dataset.name: dataset for dataset in (
+        BulkDataset("proposicoes", models.Proposicao, r"^proposicoes-\d{4}\.", prepare=_proposicao_keys),
+        BulkDataset("votacoes", models.Votacao, r"^votacoes-\d{4}\."),
+        BulkDataset("votos", models.Voto, r"^votacoesVotos-\d{4}\.", parent_fk="votacao_id",
+                    prepare=_renamer({"idVotacao": "votacao_id"})),
+        BulkDataset("despesas", models.Despesa, r"^Ano-\d{4}\.", parent_fk="deputado_id",
+                    prepare=_renamer(_CEAP_RENAMES), skip=lambda record: not record.get("deputado_id")),
+    )
+}
+
+
+def detect_dataset(path: str) -> BulkDataset:
+    name = os.path.basename(path)
+    for dataset in DATASETS.values():
+        if re.match(dataset.file_pattern, name):
+            return dataset
+    raise ValueError(f"Cannot tell the dataset of '{name}'; pass it explicitly ({', '.join(DATASETS)})")
+
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value.replace(",", ".")))
+
+
+def _to_float(value: str) -> Optional[float]:
+    if "," in value:  # pt-BR notation, e.g. 1.234,56
+        value = value.replace(".", "").replace(",", ".")
+    return float(value)
+
+
+class RowCoercer:
+    """CSV cells are text: numeric columns are converted and empty cells become NULL, as in the API's JSON."""
+
+    def __init__(self, model: Any):
+        self.converters: Dict[str, Callable[[str], Any]] = {}
+        for column in model.__table__.columns:
+            if isinstance(column.type, Integer):
+                self.converters[column.name] = _to_int
+            elif isinstance(column.type, (Float, Numeric)):
+                self.converters[column.name] = _to_float
+
+    def __call__(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        for column, convert in self.converters.items():
+            value = row.get(column)
+            if isinstance(value, str):
+                value = value.strip()
+                row[column] = convert(value) if value else None
+        return row
+
+
+class ForeignKeyFilter:
+    """
+    Drops rows whose foreign keys point at rows that are not stored, which
+    PostgreSQL would reject. Stored keys are read once per referenced column
+    and extended with what this run loads.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.known: Dict[Tuple[str, str], Set[Any]] = {}
+
+    def _keys(self, column: Any) -> Set[Any]:
+        cache_key = (column.table.name, column.name)
+        if cache_key not in self.known:
+            self.known[cache_key] = {row[0] for row in self.session.execute(select(column))}
+        return self.known[cache_key]
+
+    def add(self, model: Any, rows: Iterable[Dict[str, Any]]) -> None:
+        for column in model.__table__.primary_key.columns:
+            keys = self.known.get((column.table.name, column.name))
+            if keys is not None:
+                keys.update(row[column.name] for row in rows if row.get(column.name) is not None)
+
+    def filter(self, model: Any, rows: List[Dict[str, Any]], dropped: Counter) -> List[Dict[str, Any]]:
+        checks = [(column.name, self._keys(fk.column))
+                  for column in model.__table__.columns for fk in column.foreign_keys]
+        kept = []
+        for row in rows:
+            missing = next((name for name, keys in checks
+                            if row.get(name) is not None and row[name] not in keys), None)
+            if missing is None:
+                kept.append(row)
+            else:
+                dropped[missing] += 1
+        return kept
+
+
+@dataclass
+class IngestStats:
+    path: str
+    dataset: str
+    records: int = 0
+    rows: int = 0
+    written: int = 0
+    skipped: int = 0  # records with no row in the table, or without a full natural key
+    dropped: Counter = field(default_factory=Counter)  # rows with a missing parent, per FK column
+    seconds: float = 0.0
+
+
+class BulkIngestor:
+    """Streams bulk files into the database in batches."""
+
+    def __init__(self, session: Session, batch_size: int = 5000, encoding: str = "utf-8-sig"):
+        self.session = session
+        self.batch_size = batch_size
+        self.encoding = encoding
+        self.foreign_keys = ForeignKeyFilter(session)
+
+    def _write(self, dataset: BulkDataset, rows: List[Dict[str, Any]], stats: IngestStats) -> None:
+        if dataset.parent_fk is None:
+            stats.written += bulk_load(self.session, dataset.model, rows).written
+        else:
+            repository = ChildRepository(self.session, dataset.model, dataset.parent_fk)
+            stats.written += repository.upsert(rows)
+            stats.skipped += repository.skipped
+        self.session.commit()
+        self.foreign_keys.add(dataset.model, rows)
+
+    def ingest_file(self, path: str, dataset: Optional[BulkDataset] = None) -> IngestStats:
+        dataset = dataset or detect_dataset(path)
+        codec = get_codec(dataset.model)
+        coerce = RowCoercer(dataset.model)
+        stats = IngestStats(path, dataset.name)
+        started = time.monotonic()
+        print(f"\n--- Ingesting {os.path.basename(path)} into {dataset.model.__tablename__} ---")
+
+        for batch in batched(iter_records(path, self.encoding), self.batch_size):
+            stats.records += len(batch)
+            rows = []
+            for record in batch:
+                record = dataset.prepare(flatten(record))
+                if dataset.skip(record):
+                    stats.skipped += 1
+                    continue
+                rows.append(coerce(codec.decode(record)))
+            rows = self.foreign_keys.filter(dataset.model, rows, stats.dropped)
+            stats.rows += len(rows)
+            if rows:
+                self._write(dataset, rows, stats)
+            print(f"{stats.records:,} records read, {stats.written:,} rows written...", end="\r")
+
+        stats.seconds = round(time.monotonic() - started, 2)
+        rate = stats.records / stats.seconds if stats.seconds else 0
+        print(f"{os.path.basename(path)}: {stats.records:,} records -> {stats.written:,} rows written "
+              f"({stats.skipped:,} skipped) in {stats.seconds}s ({rate:,.0f} records/s).")
+        for column, count in stats.dropped.items():
+            print(f"  {count:,} rows dropped: '{column}' not found in the database (load it first).")
+        return stats
+
+    def ingest(self, paths: Sequence[str], dataset: Optional[str] = None) -> List[IngestStats]:
+        """Ingest `paths`, parents first when the datasets are detected from the file names."""
+        files = [(path, DATASETS[dataset] if dataset else detect_dataset(path)) for path in paths]
+        order = list(DATASETS)
+        files.sort(key=lambda entry: order.index(entry[1].name))
+        return [self.ingest_file(path, file_dataset) for path, file_dataset in files]
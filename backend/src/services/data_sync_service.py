@@ -4,150 +4,364 @@ This service follows SOLID principles by separating concerns and using dependenc
 """
 
 import asyncio
-from typing import List, Dict, Any, Type, Optional, Tuple
-from datetime import datetime
-from collections.abc import MutableMapping
-from dateutil.parser import parse
-from sqlalchemy.orm import Session
-from sqlalchemy import Date, DateTime
+import json
+import math
+from typing import List, Dict, Any, Type, Optional, Tuple, AsyncIterator, Callable
+from datetime import datetime, date, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.infra.camara_api import camara_api_client
-from src.data.repository import BaseRepository, ProposicaoRepository
+from app.core.settings import settings
+from app.infra.camara_api import camara_api_client, IncompletePaginationError
+from app.infra.response_cache import ResponseCache
+from src.data.repository import (
+    BaseRepository, ProposicaoRepository, SyncStateRepository, CheckpointRepository,
+    ChildRepository, ChildKeyTracker, DeadLetterRepository, RawPayloadRepository
+)
+from src.data.writer import BackgroundWriter
+from src.data.archive import PayloadArchiver
+from src.data.codecs import get_codec
+from src.services.sync_pipeline import SyncPipeline
 from app.infra.db.models.entidades import Base, Proposicao, Tramitacao
 
 
+# Date filter used to request only what changed since the last successful run.
+# For propositions, `dataInicio` filters by the date of the latest tramitação,
+# which covers both newly presented and recently moved propositions.
+INCREMENTAL_FILTERS = {
+    "/proposicoes": "dataInicio",
+    "/eventos": "dataInicio",
+    "/votacoes": "dataInicio",
+}
+
+# Smallest number of discovered items appended to a checkpoint at once
+DISCOVERY_CHUNK = 200
+
+# Rough figures used to choose how proposition authors are synced (see plan_author_sync)
+SITTING_DEPUTIES = 513
+# Share of propositions without a sitting deputy among their authors
+# (Executivo, Senado, committees, former deputies), which need the per-proposition fallback
+NON_DEPUTY_AUTHOR_SHARE = 0.2
+# Deputies credited as authors of an average proposition
+AUTHORS_PER_PROPOSITION = 1.5
+# Share of deputy-authored propositions with more than one author, which the
+# by-deputy fan-out cannot see completely (co-authors may be former deputies)
+MULTI_AUTHOR_SHARE = 0.25
+AUTHOR_PAGE_SIZE = 100
+# IDs per IN (...) when loading target propositions
+AUTHOR_QUERY_CHUNK = 5000
+
+
 class DataSyncService:
     """Service responsible for synchronizing data from Câmara API to database."""
     
-    def __init__(self, session: Session, concurrency_limit: int = 10, batch_size: int = 50):
+    def __init__(self, session: Session, concurrency_limit: int = 10, batch_size: int = 50,
+                 child_row_batch_size: int = 5000, archive_payloads: Optional[bool] = None):
         self.session = session
         self.concurrency_limit = concurrency_limit
         self.batch_size = batch_size
+        # Child tables (votos, despesas, ...) are written in large batches for the bulk loader
+        self.child_row_batch_size = child_row_batch_size
+        # Raw payloads are archived for offline reprocessing (see src.data.archive)
+        self.archive_payloads = settings.RAW_ARCHIVE_ENABLED if archive_payloads is None else archive_payloads
+        # Background writes use their own sessions bound to the same engine
+        self.session_factory = sessionmaker(bind=session.get_bind(), autocommit=False, autoflush=False)
     
-    @staticmethod
-    def _flatten_dict(d: MutableMapping, parent_key: str = '', sep: str = '_') -> Dict[str, Any]:
-        """Flatten a nested dictionary."""
-        items = []
-        for k, v in d.items():
-            new_key = parent_key + sep + k if parent_key else k
-            if isinstance(v, MutableMapping):
-                items.extend(DataSyncService._flatten_dict(v, new_key, sep=sep).items())
-            else:
-                items.append((new_key, v))
-        return dict(items)
+    def _background_writer(self) -> BackgroundWriter:
+        """Create a writer thread for one sync run, after ending any open read transaction."""
+        self.session.commit()
+        return BackgroundWriter(self.session_factory)
+    
+    def _archiver(self, model: Type[Base], parent_fk: Optional[str] = None) -> Optional[PayloadArchiver]:
+        return PayloadArchiver(model.__tablename__, parent_fk) if self.archive_payloads else None
     
     @staticmethod
-    def _transform_data_for_model(data: Dict[str, Any], model: Type[Base]) -> Dict[str, Any]:
-        """Transform API data to match database model structure."""
-        flattened_data = DataSyncService._flatten_dict(data)
-        model_columns = {c.name: c.type for c in model.__table__.columns}
-        filtered_data = {k: v for k, v in flattened_data.items() if k in model_columns}
-        
-        # Handle date/datetime parsing
-        for key, value in filtered_data.items():
-            if value is None:
-                continue
-            column_type = model_columns.get(key)
-            if isinstance(column_type, (Date, DateTime)) and isinstance(value, str):
-                try:
-                    parsed_datetime = parse(value)
-                    filtered_data[key] = parsed_datetime.date() if isinstance(column_type, Date) else parsed_datetime
-                except (ValueError, TypeError):
-                    filtered_data[key] = None
+    def _archive(session: Session, archiver: Optional[PayloadArchiver], entries: List[Any]) -> None:
+        """Store archived payloads from a writer operation, before the rows themselves."""
+        if archiver is not None and entries:
+            RawPayloadRepository(session).store(archiver.entity, entries)
+    
+    async def _flush_archive(self, writer: BackgroundWriter, archiver: Optional[PayloadArchiver]) -> None:
+        """Payloads added after the last write (e.g. parents without children)."""
+        if archiver is not None and archiver.pending:
+            entries = archiver.drain()
+            await writer.submit(lambda session: self._archive(session, archiver, entries))
+    
+    async def _work_source(self, discover: Callable[[], AsyncIterator[Any]],
+                           checkpoint_key: Optional[str], resume: bool) -> Optional[AsyncIterator[Tuple[int, Any]]]:
+        """
+        Build the pipeline source as (offset, item) pairs.
         
-        # Handle special cases
-        if model.__name__ == 'Votacao' and flattened_data.get('proposicao_id'):
-            filtered_data['proposicao_id'] = flattened_data['proposicao_id']
+        Items are streamed from `discover`, so fetching overlaps with discovery.
+        With a checkpoint, discovered items are appended to it in chunks, each
+        before its items are handed out, so every offset marked completed refers
+        to a stored item. A resumed run first replays the stored items not yet
+        completed, then runs discovery again and only hands out items it has
+        not seen before (e.g. list pages the interrupted run never reached).
+        Returns None when resuming a checkpoint that has already finished.
+        """
+        if not checkpoint_key:
+            async def numbered():
+                offset = 0
+                async for item in discover():
+                    yield offset, item
+                    offset += 1
+            return numbered()
         
-        return filtered_data
-    
-    async def _fetch_paginated_data(self, endpoint: str, params: Dict[str, Any] = {}) -> List[Dict[str, Any]]:
-        """Fetch all paginated data from an API endpoint."""
-        all_data = []
-        page = 1
+        repository = CheckpointRepository(self.session)
+        checkpoint = repository.get(checkpoint_key) if resume else None
+        if checkpoint is not None and checkpoint.status == "done":
+            print(f"Checkpoint '{checkpoint_key}' already completed, skipping.")
+            return None
         
-        param_str = '&'.join([f"{k}={v}" for k, v in params.items() if k != 'pagina'])
-        print(f"Fetching: {endpoint}?{param_str}...")
+        if checkpoint is not None and checkpoint.discovered is not None:
+            known = list(checkpoint.discovered)
+            ranges = checkpoint.completed_ranges or []
+            pending = [(offset, item) for offset, item in enumerate(known)
+                       if not repository.is_completed(ranges, offset)]
+            # Previous failures are retried, so only this run's failures are kept
+            checkpoint.failed = []
+            self.session.commit()
+            print(f"Resuming '{checkpoint_key}': {len(known) - len(pending)} "
+                  f"of {len(known)} items already synced.")
+        else:
+            repository.start(checkpoint_key, [])
+            known, pending = [], []
         
-        while True:
-            current_params = params.copy()
-            current_params['pagina'] = page
+        async def stream():
+            for entry in pending:
+                yield entry
+            seen = set(known)
+            chunk = []
             
-            print(f"  - Page: {page}")
-            api_response = await camara_api_client.get(endpoint=endpoint, params=current_params)
+            def flush():
+                offset = len(known)
+                known.extend(chunk)
+                repository.set_discovered(checkpoint_key, known)
+                entries = list(enumerate(chunk, offset))
+                chunk.clear()
+                return entries
             
-            if api_response and 'dados' in api_response and api_response['dados']:
-                all_data.extend(api_response['dados'])
-                
-                next_link = next((link for link in api_response.get('links', []) if link['rel'] == 'next'), None)
-                if not next_link:
-                    print(f"End of pagination for {endpoint}.")
-                    break
-                
-                page += 1
-            else:
-                print(f"No more data found or error for endpoint {endpoint} on page {page}.")
-                break
-                
+            async for item in discover():
+                if item in seen:
+                    continue
+                seen.add(item)
+                chunk.append(item)
+                # Chunks grow with the list, so rewriting it stays linear overall
+                if len(chunk) >= max(DISCOVERY_CHUNK, len(known) // 4):
+                    for entry in flush():
+                        yield entry
+            if chunk:
+                for entry in flush():
+                    yield entry
+        return stream()
+    
+    def _finish_checkpoint(self, checkpoint_key: Optional[str], failed: List[Any]) -> None:
+        """Record failed items; the checkpoint only completes when nothing failed."""
+        if not checkpoint_key:
+            return
+        repository = CheckpointRepository(self.session)
+        repository.mark_failed(checkpoint_key, failed)
+        if failed:
+            print(f"{len(failed)} items failed; run again with resume to retry them.")
+        else:
+            repository.finish(checkpoint_key)
+    
+    def _dead_letter(self, kind: str, model: Type[Base], failed: List[Any],
+                     endpoint_of: Callable[[Any], str] = str, context: Optional[Dict[str, Any]] = None) -> None:
+        """Persist failed work items with their error class for `retry_failed`."""
+        if not failed:
+            return
+        failures = [(item, camara_api_client.failure_reason(endpoint_of(item))) for item in failed]
+        DeadLetterRepository(self.session).record(kind, model.__tablename__, failures, context)
+        print(f"{len(failed)} failed items saved for a later retry (retry-failed).")
+    
+    @staticmethod
+    def _model_for_table(table_name: str) -> Type[Base]:
+        for mapper in Base.registry.mappers:
+            if getattr(mapper.class_, '__tablename__', None) == table_name:
+                return mapper.class_
+        raise KeyError(f"No model mapped to table '{table_name}'")
+    
+    @staticmethod
+    def _transform_data_for_model(data: Dict[str, Any], model: Type[Base]) -> Dict[str, Any]:
+        """Transform API data to match database model structure (see src.data.codecs)."""
+        return get_codec(model).decode(data)
+    
+    async def _fetch_paginated_data(self, endpoint: str, params: Dict[str, Any] = {},
+                                    strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch all paginated data from an API endpoint, fanning out over its pages.
+        With `strict`, a failed page raises IncompletePaginationError instead of being skipped.
+        """
+        param_str = '&'.join([f"{k}={v}" for k, v in params.items() if k != 'pagina'])
+        print(f"Fetching: {endpoint}?{param_str}...")
+        
+        all_data = [item async for item in camara_api_client.paginate(endpoint, params, strict=strict)]
+        
+        print(f"End of pagination for {endpoint}: {len(all_data)} items.")
         return all_data
     
-    async def _fetch_with_semaphore(self, semaphore: asyncio.Semaphore, endpoint: str, params: Dict[str, Any] = {}) -> Dict[str, Any]:
-        """Wrapper for API calls with concurrency control."""
-        async with semaphore:
-            return await camara_api_client.get(endpoint=endpoint, params=params)
+    async def sync_entity_with_details(self, model: Type[Base], endpoint: str, params: Dict[str, Any] = {},
+                                       checkpoint_key: Optional[str] = None, resume: bool = False) -> List[int]:
+        """
+        Sync entities with detailed information and return their IDs.
+        With `checkpoint_key`, progress is checkpointed per batch and `resume`
+        continues an interrupted run.
+        """
+        processed_ids, _ = await self._sync_details(model, endpoint, params, checkpoint_key, resume)
+        return processed_ids
     
-    async def sync_entity_with_details(self, model: Type[Base], endpoint: str, params: Dict[str, Any] = {}) -> List[int]:
-        """Sync entities with detailed information and return their IDs."""
+    async def _sync_details(self, model: Type[Base], endpoint: str, params: Dict[str, Any],
+                            checkpoint_key: Optional[str], resume: bool,
+                            strict: bool = False) -> Tuple[List[int], bool]:
+        """
+        Body of `sync_entity_with_details`, returning (IDs, run complete).
+        With `strict`, discovery stops at the first list page that cannot be
+        fetched; the items found so far are still synced, but the run is
+        reported incomplete and its checkpoint is left open. A run whose
+        details partly failed is reported incomplete as well. Resuming a
+        checkpoint that an earlier run already finished is also reported
+        incomplete: this call discovered nothing.
+        """
         param_str = ', '.join([f"{k}: {v}" for k, v in params.items()])
         print(f"\n--- Starting sync for {model.__tablename__} with filters: [{param_str}] ---")
         
-        summary_data = await self._fetch_paginated_data(endpoint, params)
+        pk_name = model.__mapper__.primary_key[0].name
+        processed_ids = []
+        failed = []
+        changes = {"changed": 0, "unchanged": 0}
+        discovery_complete = True
         
-        if not summary_data:
-            print(f"No items found for {model.__tablename__} with applied filters.")
-            return []
+        async def discover():
+            nonlocal discovery_complete
+            try:
+                async for item in camara_api_client.paginate(endpoint, params, strict=strict):
+                    if 'uri' in item and item['uri']:
+                        yield item['uri'].replace(camara_api_client.base_url, "")
+            except IncompletePaginationError as e:
+                discovery_complete = False
+                print(f"Discovery of {endpoint} is incomplete: {e}")
         
-        print(f"{len(summary_data)} items discovered. Fetching details...")
+        source = await self._work_source(discover, checkpoint_key, resume)
+        if source is None:
+            return [], False
+        archiver = self._archiver(model)
         
-        repository = BaseRepository(self.session, model)
-        semaphore = asyncio.Semaphore(self.concurrency_limit)
-        all_tasks = []
-        processed_ids = []
-
-        pk_name = model.__mapper__.primary_key[0].name
+        async def fetch(work):
+            return await camara_api_client.get(work[1])
         
-        for item in summary_data:
-            if 'uri' in item and item['uri']:
-                detail_endpoint = item['uri'].replace(camara_api_client.base_url, "")
-                all_tasks.append(self._fetch_with_semaphore(semaphore, detail_endpoint))
+        def transform(work, response):
+            if response and 'dados' in response:
+                if archiver is not None:
+                    archiver.add(work[1], response['dados'])
+                yield self._transform_data_for_model(response['dados'], model)
         
-        for i in range(0, len(all_tasks), self.batch_size):
-            batch_tasks = all_tasks[i:i + self.batch_size]
-            responses = await asyncio.gather(*batch_tasks)
-            
-            all_data_to_upsert = []
-            for response in responses:
-                if not (response and 'dados' in response):
-                    continue
-                
-                transformed_data = self._transform_data_for_model(response['dados'], model)
-                all_data_to_upsert.append(transformed_data)
-                if pk_name in transformed_data:
-                    processed_ids.append(transformed_data[pk_name])
-
-            if all_data_to_upsert:
-                repository.bulk_upsert(all_data_to_upsert)
+        def upsert(session, rows, offsets, archived):
+            self._archive(session, archiver, archived)
+            repository = BaseRepository(session, model)
+            repository.bulk_upsert(rows)
+            changes["changed"] += repository.changed
+            changes["unchanged"] += repository.unchanged
+            processed_ids.extend(row[pk_name] for row in rows if pk_name in row)
+            if checkpoint_key:
+                CheckpointRepository(session).mark_completed(checkpoint_key, offsets)
+        
+        async with self._background_writer() as writer:
+            async def write(rows, items):
+                # The same record may show up in more than one page; keep the last copy
+                unique_rows = list({row.get(pk_name, id(row)): row for row in rows}.values())
+                offsets = [offset for offset, _ in items]
+                archived = archiver.drain() if archiver is not None else []
+                await writer.submit(lambda session: upsert(session, unique_rows, offsets, archived))
             
-            print(f"Batch {i//self.batch_size + 1}/{(len(all_tasks)//self.batch_size) + 1} for {model.__tablename__} processed.")
+            pipeline = SyncPipeline(
+                source, fetch, transform, write,
+                workers=self.concurrency_limit, batch_size=self.batch_size,
+                on_failure=lambda work: failed.append(work[1])
+            )
+            await pipeline.run()
+            await self._flush_archive(writer, archiver)
         
-        print(f"Sync with details for {model.__tablename__} completed. {len(processed_ids)} records processed.")
+        if discovery_complete:
+            self._finish_checkpoint(checkpoint_key, failed)
+        elif checkpoint_key:
+            CheckpointRepository(self.session).mark_failed(checkpoint_key, failed)
+        self._dead_letter("detail", model, failed)
+        
+        if not pipeline.stats["discovery"].items:
+            print(f"No items found for {model.__tablename__} with applied filters.")
+            return [], discovery_complete and not failed
+        
+        print(f"Sync with details for {model.__tablename__} completed. {len(processed_ids)} records processed "
+              f"({changes['changed']} changed, {changes['unchanged']} unchanged).")
+        print(pipeline.report())
+        print(writer.report())
+        return processed_ids, discovery_complete and not failed
+    
+    async def sync_incremental(self, model: Type[Base], endpoint: str, params: Dict[str, Any] = {},
+                               overlap_days: int = 1, checkpoint_key: Optional[str] = None,
+                               resume: bool = False, default_since: Optional[str] = None) -> List[int]:
+        """
+        Sync an entity starting from the watermark of the last successful run
+        with the same parameters. The first run uses `params` as given, starting
+        at `default_since` if set (it is not part of the watermark's key).
+        Discovery is strict, and the watermark only advances when every list
+        page and detail was fetched, so after a failure the next run asks for
+        the same window again. Skipping an already finished checkpoint does not
+        advance it either.
+        """
+        run_params, fixed_params, watermark = self.incremental_params(endpoint, params, overlap_days)
+        watermark_param = INCREMENTAL_FILTERS[endpoint]
+        if not watermark and default_since:
+            run_params[watermark_param] = max(default_since, str(params.get(watermark_param, '')))
+        if watermark:
+            print(f"Incremental sync of {endpoint} since {run_params[watermark_param]} (watermark: {watermark})")
+        
+        run_started = date.today()
+        processed_ids, complete = await self._sync_details(model, endpoint, run_params, checkpoint_key, resume,
+                                                           strict=True)
+        if complete:
+            SyncStateRepository(self.session).set_watermark(endpoint, fixed_params, run_started.isoformat(), len(processed_ids))
+        else:
+            print(f"Watermark of {endpoint} left at {watermark or 'none'}: the run did not complete.")
         return processed_ids
     
+    def incremental_params(self, endpoint: str, params: Dict[str, Any],
+                           overlap_days: int = 1) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]:
+        """
+        Parameters of an incremental run: (run params narrowed by the watermark,
+        the params the watermark is stored under, the watermark or None).
+        The watermark is keyed by the caller's params as given, including their
+        own lower bound (e.g. `dataInicio` of the requested year), so syncing
+        another year never inherits this one's watermark.
+        """
+        watermark_param = INCREMENTAL_FILTERS[endpoint]
+        fixed_params = dict(params)
+        watermark = SyncStateRepository(self.session).get_watermark(endpoint, fixed_params)
+        
+        run_params = dict(params)
+        if watermark:
+            since = (date.fromisoformat(watermark) - timedelta(days=overlap_days)).isoformat()
+            # Never go further back than an explicitly requested start date
+            run_params[watermark_param] = max(since, str(params.get(watermark_param, '')))
+        return run_params, fixed_params, watermark
+    
     async def sync_child_entities(self, parent_model: Type[Base], child_model: Type[Base], 
                                 endpoint_template: str, child_fk_name: str, 
                                 params: Dict[str, Any] = {}, paginated: bool = True,
-                                parent_ids_list: Optional[List[int]] = None) -> int:
-        """Sync child entities for a parent entity."""
+                                parent_ids_list: Optional[List[int]] = None,
+                                checkpoint_key: Optional[str] = None, resume: bool = False) -> int:
+        """
+        Sync child entities for a parent entity.
+        
+        Children with a natural key (see ChildRepository) are diffed per parent:
+        new rows are inserted, changed rows updated and vanished rows deleted,
+        only for parents whose children were fetched completely and only within
+        the window selected by `params` (e.g. one year of expenses).
+        With `checkpoint_key`, completed parents are checkpointed per batch and
+        `resume` continues an interrupted run.
+        """
         param_str = ', '.join([f"{k}: {v}" for k, v in params.items()])
         print(f"\n--- Syncing child entity: {child_model.__tablename__} with filters: [{param_str}] ---")
         
@@ -160,40 +374,172 @@ class DataSyncService:
             print(f"No parent IDs provided or found for {parent_model.__tablename__}.")
             return 0
 
-        semaphore = asyncio.Semaphore(self.concurrency_limit)
+        total_inserted = 0
+        total_deleted = 0
+        total_skipped = 0
+        failed = []
+        natural_key = ChildRepository.find_natural_key(child_model.__table__, child_fk_name)
+        tracker = ChildKeyTracker(natural_key, child_fk_name, child_model.__tablename__) if natural_key else None
         
-        async def fetch_child_data(parent_id):
-            endpoint = endpoint_template.format(id=parent_id)
+        async def discover():
+            for parent_id in parent_ids:
+                yield parent_id
+        
+        source = await self._work_source(discover, checkpoint_key, resume)
+        if source is None:
+            return 0
+        archiver = self._archiver(child_model, child_fk_name)
+        # Paginated lists are archived whole, keyed by the endpoint and its fixed filters
+        archive_params = {k: v for k, v in params.items() if k not in ('pagina', 'itens')}
+        
+        async def fetch_child_data(work):
+            endpoint = endpoint_template.format(id=work[1])
             if paginated:
-                return await self._fetch_paginated_data(endpoint, params)
+                try:
+                    return await self._fetch_paginated_data(endpoint, params, strict=True)
+                except IncompletePaginationError as e:
+                    print(f"Skipping parent {work[1]}: {e}")
+                    return None
+            response = await camara_api_client.get(endpoint=endpoint)
+            return response.get('dados', []) if response else None
+        
+        def transform(work, child_data_list):
+            parent_id = work[1]
+            if archiver is not None:
+                archiver.add(ResponseCache.make_key(endpoint_template.format(id=parent_id), archive_params),
+                             child_data_list, parent_id)
+            for child_data in child_data_list:
+                child_data[child_fk_name] = parent_id
+                child_data.pop('id', None)
+                yield self._transform_data_for_model(child_data, child_model)
+        
+        def insert(session, rows, completed_keys, offsets, archived):
+            nonlocal total_inserted, total_deleted, total_skipped
+            self._archive(session, archiver, archived)
+            if tracker is not None:
+                repository = ChildRepository(session, child_model, child_fk_name)
+                repository.sync(rows, completed_keys, params)
+                total_inserted += repository.inserted_or_updated
+                total_deleted += repository.deleted
+                total_skipped += repository.skipped
             else:
-                response = await self._fetch_with_semaphore(semaphore, endpoint)
-                return response.get('dados', []) if response else []
-        
-        all_child_data = []
-        for i in range(0, len(parent_ids), self.batch_size):
-            parent_batch = parent_ids[i:i + self.batch_size]
-            tasks = [fetch_child_data(pid) for pid in parent_batch]
-            results = await asyncio.gather(*tasks)
+                total_inserted += BaseRepository(session, child_model).bulk_insert(rows)
+            if checkpoint_key:
+                CheckpointRepository(session).mark_completed(checkpoint_key, offsets)
+        
+        async with self._background_writer() as writer:
+            async def write(rows, items):
+                offsets = [offset for offset, _ in items]
+                completed_keys = None
+                if tracker is not None:
+                    tracker.add(rows)
+                    completed_keys = tracker.pop(parent_id for _, parent_id in items)
+                archived = archiver.drain() if archiver is not None else []
+                await writer.submit(lambda session: insert(session, rows, completed_keys, offsets, archived))
             
-            for idx, child_data_list in enumerate(results):
-                if not child_data_list:
-                    continue
-                current_parent_id = parent_batch[idx]
-                for child_data in child_data_list:
-                    child_data[child_fk_name] = current_parent_id
-                    child_data.pop('id', None)
-                    all_child_data.append(child_data)
+            pipeline = SyncPipeline(
+                source, fetch_child_data, transform, write,
+                workers=self.concurrency_limit, batch_size=self.batch_size,
+                on_failure=lambda work: failed.append(work[1]),
+                row_batch_size=self.child_row_batch_size if tracker is not None else None
+            )
+            await pipeline.run()
+            await self._flush_archive(writer, archiver)
+        
+        self._finish_checkpoint(checkpoint_key, failed)
+        self._dead_letter(
+            "child", child_model, failed,
+            endpoint_of=lambda parent_id: endpoint_template.format(id=parent_id),
+            context={"parent": parent_model.__tablename__, "endpoint": endpoint_template,
+                     "fk": child_fk_name, "params": params, "paginated": paginated}
+        )
+        
+        print(f"Sync of {child_model.__tablename__} completed. "
+              f"{total_inserted} records inserted or updated, {total_deleted} deleted.")
+        if total_skipped:
+            print(f"{total_skipped} {child_model.__tablename__} records skipped: incomplete natural key "
+                  f"({', '.join(natural_key)}).")
+        print(pipeline.report())
+        print(writer.report())
+        return total_inserted
+    
+    async def _retry_details(self, model: Type[Base], uris: List[str]) -> None:
+        """Refetch detail URIs and upsert them; failures go back to the dead-letter table."""
+        failed = []
+        
+        archiver = self._archiver(model)
+        
+        async def discover():
+            for uri in uris:
+                yield uri
+        
+        def transform(uri, response):
+            if response and 'dados' in response:
+                if archiver is not None:
+                    archiver.add(uri, response['dados'])
+                yield self._transform_data_for_model(response['dados'], model)
+        
+        def upsert(session, rows, archived):
+            self._archive(session, archiver, archived)
+            BaseRepository(session, model).bulk_upsert(rows)
+        
+        async with self._background_writer() as writer:
+            async def write(rows, items):
+                archived = archiver.drain() if archiver is not None else []
+                await writer.submit(lambda session: upsert(session, rows, archived))
             
-            print(f"Parent batch {i//self.batch_size + 1}/{(len(parent_ids)//self.batch_size) + 1} for {child_model.__tablename__} processed.")
+            pipeline = SyncPipeline(
+                discover(), camara_api_client.get, transform, write,
+                workers=self.concurrency_limit, batch_size=self.batch_size,
+                on_failure=failed.append
+            )
+            await pipeline.run()
+            await self._flush_archive(writer, archiver)
+        self._dead_letter("detail", model, failed)
+    
+    async def retry_failed(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Drain pass over the dead-letter table: retry the items whose backoff expired,
+        grouped by target. Items that succeed are resolved; the others are rescheduled
+        with a longer backoff, or abandoned after too many attempts.
+        """
+        repository = DeadLetterRepository(self.session)
+        letters = repository.due(limit)
+        if not letters:
+            print("No failed items due for retry.")
+            return {"retried": 0, "resolved": 0}
         
-        if all_child_data:
-            repository = BaseRepository(self.session, child_model)
-            repository.bulk_insert(all_child_data)
-            print(f"Bulk insert of {len(all_child_data)} records for {child_model.__tablename__} completed.")
+        groups: Dict[Tuple[str, str, str], List[Any]] = {}
+        for letter in letters:
+            key = (letter.kind, letter.entity, json.dumps(letter.context, sort_keys=True))
+            groups.setdefault(key, []).append(letter)
         
-        print(f"Sync of {child_model.__tablename__} completed.")
-        return len(all_child_data)
+        resolved = 0
+        for (kind, entity, _), group in groups.items():
+            model = self._model_for_table(entity)
+            items = [letter.work_item for letter in group]
+            context = group[0].context or {}
+            print(f"\n--- Retrying {len(items)} failed {kind} items of {entity} ---")
+            started = datetime.utcnow()
+            
+            if kind == "detail":
+                await self._retry_details(model, items)
+            elif kind == "authors":
+                await self._sync_authors_per_proposition([int(item) for item in items])
+            else:
+                parent_model = self._model_for_table(context["parent"])
+                parent_type = parent_model.__mapper__.primary_key[0].type.python_type
+                await self.sync_child_entities(
+                    parent_model, model, context["endpoint"], context["fk"],
+                    params=context.get("params") or {}, paginated=context.get("paginated", True),
+                    parent_ids_list=[parent_type(item) for item in items]
+                )
+            # Whatever did not fail again during this pass went through
+            resolved += repository.resolve(kind, entity, items, failed_before=started)
+        
+        print(f"Retry pass completed: {len(letters)} items retried, {resolved} resolved. "
+              f"Dead letters by status: {repository.counts()}")
+        return {"retried": len(letters), "resolved": resolved}
     
     async def sync_references(self, endpoint_model_mapping: Dict[str, Type[Base]]) -> Dict[str, int]:
         """Sync all reference tables."""
@@ -240,80 +586,268 @@ class DataSyncService:
         """Sync propositions with given parameters and return their IDs."""
         return await self.sync_entity_with_details(Proposicao, "/proposicoes", params or {})
     
-    async def sync_proposition_authors(self, proposition_ids: Optional[List[int]] = None) -> int:
-        """Sync proposition authors, optionally for a specific list of propositions."""
-        from app.infra.db.models.entidades import proposicao_autores
+    def _author_targets(self, proposition_ids: Optional[List[int]] = None) -> Dict[int, Optional[datetime]]:
+        """Stored propositions to sync authors for, with their presentation dates."""
+        query = self.session.query(Proposicao.id, Proposicao.dataApresentacao)
+        if not proposition_ids:
+            return dict(query.all())
+        targets = {}
+        for start in range(0, len(proposition_ids), AUTHOR_QUERY_CHUNK):
+            chunk = proposition_ids[start:start + AUTHOR_QUERY_CHUNK]
+            targets.update(query.filter(Proposicao.id.in_(chunk)).all())
+        return targets
+    
+    def _plan_authors(self, targets: Dict[int, Optional[datetime]]) -> Dict[str, Any]:
+        dates = [presented for presented in targets.values() if presented is not None]
+        per_proposition = len(targets)
+        if not dates:
+            return {"strategy": "per-proposition", "window": None,
+                    "requests": {"per-proposition": per_proposition, "by-deputy": None}}
         
-        print("\n--- Syncing proposition authors ---")
+        window = (min(dates), max(dates))
+        # Each deputy query returns everything the deputy authored in the window,
+        # not only the targets, so size it by all stored propositions in the window
+        in_window = self.session.query(func.count(Proposicao.id)).filter(
+            Proposicao.dataApresentacao.between(*window)
+        ).scalar() or 0
+        authored = max(in_window, len(dates)) * (1 - NON_DEPUTY_AUTHOR_SHARE) * AUTHORS_PER_PROPOSITION
+        pages_per_deputy = max(1, math.ceil(authored / SITTING_DEPUTIES / AUTHOR_PAGE_SIZE))
+        fallback_share = NON_DEPUTY_AUTHOR_SHARE + (1 - NON_DEPUTY_AUTHOR_SHARE) * MULTI_AUTHOR_SHARE
+        fallback = math.ceil(len(dates) * fallback_share) + (len(targets) - len(dates))
+        by_deputy = math.ceil(SITTING_DEPUTIES / AUTHOR_PAGE_SIZE) + SITTING_DEPUTIES * pages_per_deputy + fallback
         
-        repository = ProposicaoRepository(self.session, Proposicao)
+        return {
+            "strategy": "by-deputy" if by_deputy < per_proposition else "per-proposition",
+            "window": window,
+            "requests": {"per-proposition": per_proposition, "by-deputy": by_deputy},
+        }
+    
+    def plan_author_sync(self, proposition_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Estimate the API requests of each author sync strategy and pick the cheaper one.
         
-        if proposition_ids:
-            propositions_query = self.session.query(Proposicao).filter(Proposicao.id.in_(proposition_ids))
-        else:
-            propositions_query = self.session.query(Proposicao)
-
-        propositions = propositions_query.all()
-
-        if not propositions:
+        - 'per-proposition' calls /proposicoes/{id}/autores once per proposition.
+        - 'by-deputy' pages /proposicoes?idDeputadoAutor= for each sitting deputy over
+          the presentation window of the targets, then falls back to per-proposition
+          calls for propositions without a single, complete sitting deputy author.
+        """
+        return self._plan_authors(self._author_targets(proposition_ids))
+    
+    async def sync_proposition_authors(self, proposition_ids: Optional[List[int]] = None,
+                                       strategy: str = "auto") -> int:
+        """
+        Sync proposition authors, optionally for a specific list of propositions.
+        `strategy` is 'per-proposition', 'by-deputy' or 'auto' (see plan_author_sync).
+        """
+        print("\n--- Syncing proposition authors ---")
+        
+        targets = self._author_targets(proposition_ids)
+        if not targets:
             print("No propositions to sync authors for.")
             return 0
         
+        if strategy == "auto":
+            plan = self._plan_authors(targets)
+            strategy = plan["strategy"]
+            estimates = ', '.join(f"{name}: {count}" for name, count in plan["requests"].items())
+            print(f"Author sync plan for {len(targets)} propositions: {strategy} "
+                  f"(estimated requests - {estimates})")
+        
+        if strategy == "by-deputy":
+            return await self._sync_authors_by_deputy(targets)
+        return await self._sync_authors_per_proposition(list(targets))
+    
+    async def _sync_authors_per_proposition(self, target_ids: List[int]) -> int:
+        """One /proposicoes/{id}/autores call per proposition; authors are diffed per proposition."""
+        from app.infra.db.models.entidades import proposicao_autores
+        
+        if not target_ids:
+            return 0
+        
         total_authors = 0
         
-        semaphore = asyncio.Semaphore(self.concurrency_limit)
-        
-        async def fetch_authors_for_proposition(proposition):
-            async with semaphore:
-                endpoint = f"/proposicoes/{proposition.id}/autores"
-                response = await camara_api_client.get(endpoint)
-                if response and 'dados' in response:
-                    authors = response['dados']
-                    relationship_data = []
-                    for author in authors:
-                        if 'uri' in author and '/deputados/' in author['uri']:
-                            try:
-                                deputado_id = int(author['uri'].split('/')[-1])
-                                relationship_data.append({
-                                    'proposicao_id': proposition.id,
-                                    'deputado_id': deputado_id
-                                })
-                            except (ValueError, IndexError):
-                                pass # Ignore if ID is not found
-                    return relationship_data
-                return []
-        
-        # Process in batches
-        for i in range(0, len(propositions), self.batch_size):
-            batch = propositions[i:i + self.batch_size]
-            tasks = [fetch_authors_for_proposition(prop) for prop in batch]
-            results = await asyncio.gather(*tasks)
+        async def discover():
+            for proposition_id in target_ids:
+                yield proposition_id
+        
+        async def fetch_authors(proposition_id):
+            response = await camara_api_client.get(f"/proposicoes/{proposition_id}/autores")
+            return response.get('dados', []) if response else None
+        
+        def transform(proposition_id, authors):
+            for author in authors:
+                if 'uri' in author and '/deputados/' in author['uri']:
+                    try:
+                        deputado_id = int(author['uri'].split('/')[-1])
+                        yield {'proposicao_id': proposition_id, 'deputado_id': deputado_id}
+                    except (ValueError, IndexError):
+                        pass # Ignore if ID is not found
+        
+        tracker = ChildKeyTracker(['proposicao_id', 'deputado_id'], 'proposicao_id')
+        failed = []
+        
+        def insert(session, relationships, completed_keys):
+            nonlocal total_authors
+            # Authors removed from a proposition are deleted; the others are kept as they are
+            ChildRepository(session, proposicao_autores, 'proposicao_id').sync(relationships, completed_keys)
+            total_authors += len(relationships)
+        
+        async with self._background_writer() as writer:
+            async def write(relationships, proposition_ids):
+                tracker.add(relationships)
+                completed_keys = tracker.pop(proposition_ids)
+                await writer.submit(lambda session: insert(session, relationships, completed_keys))
             
-            # Flatten results and insert
-            all_relationships = [item for sublist in results for item in sublist]
+            pipeline = SyncPipeline(
+                discover(), fetch_authors, transform, write,
+                workers=self.concurrency_limit, batch_size=self.batch_size,
+                on_failure=failed.append
+            )
+            await pipeline.run()
+        
+        self._dead_letter("authors", Proposicao, failed,
+                          endpoint_of=lambda proposition_id: f"/proposicoes/{proposition_id}/autores")
+        print(f"Sync of proposition authors completed. {total_authors} relationships processed.")
+        print(pipeline.report())
+        print(writer.report())
+        return total_authors
+    
+    async def _sync_authors_by_deputy(self, targets: Dict[int, Optional[datetime]]) -> int:
+        """
+        Inverted fan-out: page the propositions authored by each sitting deputy in the
+        presentation window of `targets` and keep the links to target propositions.
+        
+        The fan-out only sees sitting deputies, so it is only trusted for targets
+        with exactly one author found and no stored author outside the sitting
+        deputies. The rest are synced per proposition: targets without a sitting
+        deputy author (Executivo, Senado, committees, former deputies or no
+        presentation date), with several authors (a co-author may be a former
+        deputy) or with stored authors the fan-out cannot see.
+        """
+        from app.infra.db.models.entidades import proposicao_autores
+        
+        dates = [presented for presented in targets.values() if presented is not None]
+        deputy_ids = []
+        if dates:
+            try:
+                deputy_ids = [int(deputy['id']) async for deputy in camara_api_client.paginate(
+                    "/deputados", {"itens": AUTHOR_PAGE_SIZE}, strict=True)]
+            except IncompletePaginationError as e:
+                print(f"Could not list sitting deputies ({e}); syncing authors per proposition.")
+        if not deputy_ids:
+            return await self._sync_authors_per_proposition(list(targets))
+        
+        print(f"Fanning out over {len(deputy_ids)} deputies for {len(dates)} propositions...")
+        window_params = {
+            "dataApresentacaoInicio": min(dates).date().isoformat(),
+            "dataApresentacaoFim": max(dates).date().isoformat(),
+            "itens": AUTHOR_PAGE_SIZE,
+            "ordem": "ASC",
+            "ordenarPor": "id",
+        }
+        total_authors = 0
+        failed = []
+        tracker = ChildKeyTracker(['proposicao_id', 'deputado_id'], 'proposicao_id')
+        
+        async def discover():
+            for deputado_id in deputy_ids:
+                yield deputado_id
+        
+        async def fetch_authored(deputado_id):
+            params = {**window_params, "idDeputadoAutor": deputado_id}
+            try:
+                return [item async for item in camara_api_client.paginate("/proposicoes", params, strict=True)]
+            except IncompletePaginationError as e:
+                print(f"Skipping deputy {deputado_id}: {e}")
+                return None
+        
+        def transform(deputado_id, propositions):
+            for proposition in propositions:
+                if proposition.get('id') in targets:
+                    yield {'proposicao_id': proposition['id'], 'deputado_id': deputado_id}
+        
+        def insert(session, relationships):
+            nonlocal total_authors
+            ChildRepository(session, proposicao_autores, 'proposicao_id').upsert(relationships)
+            session.commit()
+            total_authors += len(relationships)
+        
+        def prune(session, current_keys):
+            # Only links to the deputies scanned here can be judged; the others are kept
+            repository = ChildRepository(session, proposicao_autores, 'proposicao_id')
+            repository.delete_vanished(current_keys, scope={'deputado_id': deputy_ids})
+            session.commit()
+            print(f"{repository.deleted} vanished author links removed.")
+        
+        async with self._background_writer() as writer:
+            async def write(relationships, deputies):
+                tracker.add(relationships)
+                await writer.submit(lambda session: insert(session, relationships))
             
-            if all_relationships:
-                from sqlalchemy.dialects.postgresql import insert as pg_insert
-                stmt = pg_insert(proposicao_autores).values(all_relationships)
-                stmt = stmt.on_conflict_do_nothing()
-                self.session.execute(stmt)
-                self.session.commit()
-                total_authors += len(all_relationships)
+            pipeline = SyncPipeline(
+                discover(), fetch_authored, transform, write,
+                workers=self.concurrency_limit, batch_size=self.batch_size,
+                on_failure=failed.append
+            )
+            await pipeline.run()
             
-            print(f"Processed batch {i//self.batch_size + 1}/{(len(propositions)//self.batch_size) + 1}")
+            found = {pid: keys for pid, keys in tracker.pop(list(targets)).items() if keys}
+            outside = self._authored_outside(list(found), deputy_ids)
+            complete = {pid: keys for pid, keys in found.items() if len(keys) == 1 and pid not in outside}
+            if failed:
+                print(f"{len(failed)} deputies failed; vanished authors are not pruned in this run.")
+            else:
+                await writer.submit(lambda session: prune(session, complete))
         
-        print(f"Sync of proposition authors completed. {total_authors} relationships processed.")
+        print(f"Fan-out over deputies completed. {total_authors} relationships processed "
+              f"for {len(found)} propositions ({len(complete)} complete).")
+        print(pipeline.report())
+        print(writer.report())
+        
+        remaining = [pid for pid in targets if pid not in complete]
+        if remaining:
+            print(f"{len(remaining)} propositions without a single sitting deputy author "
+                  f"({len(found) - len(complete)} with co-authors); syncing them per proposition.")
+            total_authors += await self._sync_authors_per_proposition(remaining)
         return total_authors
     
-    async def sync_tramitacoes(self, proposition_ids: Optional[List[int]] = None) -> int:
-        """Sync status updates (tramitações) for propositions."""
+    def _authored_outside(self, proposition_ids: List[int], deputy_ids: List[int]) -> set:
+        """Propositions with a stored author that is not among `deputy_ids`."""
+        from app.infra.db.models.entidades import proposicao_autores
+        
+        outside = set()
+        for start in range(0, len(proposition_ids), AUTHOR_QUERY_CHUNK):
+            chunk = proposition_ids[start:start + AUTHOR_QUERY_CHUNK]
+            query = (
+                self.session.query(proposicao_autores.c.proposicao_id).distinct()
+                .filter(proposicao_autores.c.proposicao_id.in_(chunk),
+                        proposicao_autores.c.deputado_id.notin_(deputy_ids))
+            )
+            outside.update(row[0] for row in query.all())
+        return outside
+    
+    async def sync_tramitacoes(self, proposition_ids: Optional[List[int]] = None, only_moved: bool = True,
+                               checkpoint_key: Optional[str] = None, resume: bool = False) -> int:
+        """
+        Sync status updates (tramitações) for propositions.
+        With `only_moved`, only propositions whose status sequence advanced past their
+        stored tramitações are fetched; run it after syncing the propositions themselves.
+        """
+        if only_moved:
+            candidates = len(proposition_ids) if proposition_ids else "all"
+            proposition_ids = ProposicaoRepository(self.session, Proposicao).get_with_stale_tramitacoes(proposition_ids)
+            print(f"{len(proposition_ids)} of {candidates} propositions have new tramitações.")
+            if not proposition_ids:
+                return 0
         return await self.sync_child_entities(
             Proposicao,
             Tramitacao,
             "/proposicoes/{id}/tramitacoes",
             "proposicao_id",
             paginated=False,
-            parent_ids_list=proposition_ids
+            parent_ids_list=proposition_ids,
+            checkpoint_key=checkpoint_key,
+            resume=resume
         )
     
     async def sync_related_propositions(self) -> int:
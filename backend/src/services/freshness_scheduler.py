@@ -0,0 +1,283 @@
+"""
+Staleness-driven refresh of synced entities.
+Every record (or partition, such as a reference table) has an entry in
+`sync_freshness` with its own revisit interval, based on how volatile its
+class is (active propositions and upcoming events often, archived
+propositions and reference tables rarely) and adapted to how often it
+actually changed. Each cycle refreshes the most overdue entries first,
+within a request budget per hour.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.infra.camara_api import camara_api_client
+from app.infra.db.models import entidades, referencias
+from src.data.archive import PayloadArchiver
+from src.data.codecs import get_codec
+from app.infra.db.crud.referencias import bulk_upsert_referencias
+from src.data.repository import FreshnessRepository, RawPayloadRepository
+from src.data.upsert import bulk_upsert
+
+# Partition entries for reference tables, refreshed as a whole
+REFERENCE_ENTITY = "referencias"
+REFERENCE_ENDPOINTS = {
+    "/referencias/tiposProposicao": referencias.TiposProposicao,
+    "/referencias/proposicoes/codTema": referencias.ProposicaoTemas,
+    "/referencias/situacoesProposicao": referencias.ProposicaoSituacoes,
+    "/referencias/tiposTramitacao": referencias.TiposTramitacao,
+    "/referencias/tiposAutor": referencias.TiposAutor,
+    "/referencias/situacoesDeputado": referencias.DeputadoSituacoes,
+    "/referencias/situacoesEvento": referencias.EventoSituacoes,
+    "/referencias/tiposEvento": referencias.TiposEvento,
+    "/referencias/tiposOrgao": referencias.TiposOrgao,
+    "/referencias/uf": referencias.UFs,
+}
+REFERENCE_INTERVAL = timedelta(days=30)
+
+# The revisit interval of an entry moves within [base / 4, base * 4]:
+# it shrinks when a refresh finds a change and grows when it does not
+SHRINK_ON_CHANGE = 0.5
+GROW_ON_NO_CHANGE = 1.5
+INTERVAL_SPREAD = 4
+# A failed refresh is retried after this delay (or the entry's interval, if shorter)
+RETRY_DELAY = timedelta(minutes=30)
+
+
+def _age(value: Optional[datetime], now: datetime) -> Optional[timedelta]:
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return now - value
+
+
+def classify_proposicao(row: Mapping[str, Any], now: datetime) -> str:
+    situacao = (row.get('statusProposicao_descricaoSituacao') or '').lower()
+    if 'arquivad' in situacao or 'transformad' in situacao:
+        return 'arquivada'
+    age = _age(row.get('statusProposicao_dataHora'), now)
+    if age is not None and age <= timedelta(days=90):
+        return 'ativa'
+    return 'parada'
+
+
+def classify_evento(row: Mapping[str, Any], now: datetime) -> str:
+    age = _age(row.get('dataHoraInicio'), now)
+    if age is None or age <= timedelta(days=1):
+        return 'proximo'
+    if age <= timedelta(days=30):
+        return 'recente'
+    return 'passado'
+
+
+def classify_votacao(row: Mapping[str, Any], now: datetime) -> str:
+    age = _age(row.get('data'), now)
+    return 'recente' if age is not None and age <= timedelta(days=7) else 'antiga'
+
+
+def _single_tier(row: Mapping[str, Any], now: datetime) -> str:
+    return 'padrao'
+
+
+@dataclass(frozen=True)
+class RefreshPolicy:
+    """How one entity is refreshed: its detail endpoint and revisit interval per volatility tier."""
+    model: Any
+    endpoint: str
+    intervals: Dict[str, timedelta]
+    classify: Callable[[Mapping[str, Any], datetime], str] = _single_tier
+    columns: Tuple[str, ...] = ()  # columns read by `classify`
+
+    @property
+    def entity(self) -> str:
+        return self.model.__tablename__
+
+
+POLICIES = {
+    policy.entity: policy for policy in (
+        RefreshPolicy(
+            entidades.Proposicao, "/proposicoes/{id}",
+            {'ativa': timedelta(hours=6), 'parada': timedelta(days=3), 'arquivada': timedelta(days=30)},
+            classify_proposicao, ('statusProposicao_descricaoSituacao', 'statusProposicao_dataHora'),
+        ),
+        RefreshPolicy(
+            entidades.Evento, "/eventos/{id}",
+            {'proximo': timedelta(hours=2), 'recente': timedelta(days=1), 'passado': timedelta(days=60)},
+            classify_evento, ('dataHoraInicio',),
+        ),
+        RefreshPolicy(
+            entidades.Votacao, "/votacoes/{id}",
+            {'recente': timedelta(hours=12), 'antiga': timedelta(days=90)},
+            classify_votacao, ('data',),
+        ),
+        RefreshPolicy(entidades.Deputado, "/deputados/{id}", {'padrao': timedelta(days=7)}),
+        RefreshPolicy(entidades.Partido, "/partidos/{id}", {'padrao': timedelta(days=30)}),
+        RefreshPolicy(entidades.Orgao, "/orgaos/{id}", {'padrao': timedelta(days=30)}),
+    )
+}
+
+
+def next_interval(entry: Any, base: timedelta, changed: bool, tier_changed: bool) -> int:
+    """New revisit interval in seconds for an entry after a refresh."""
+    base_seconds = int(base.total_seconds())
+    if tier_changed or not entry.interval_seconds:
+        return base_seconds
+    factor = SHRINK_ON_CHANGE if changed else GROW_ON_NO_CHANGE
+    low, high = base_seconds // INTERVAL_SPREAD, base_seconds * INTERVAL_SPREAD
+    return int(min(high, max(low, entry.interval_seconds * factor)))
+
+
+class FreshnessScheduler:
+    """Refreshes the stalest synced records first, within a request budget."""
+
+    def __init__(self, session: Session, budget_per_hour: int = 600, cycle_minutes: int = 10,
+                 seed_batch_size: int = 5000, archive_payloads: Optional[bool] = None):
+        self.session = session
+        self.repository = FreshnessRepository(session)
+        # Refreshed payloads join the raw archive like those of the bulk syncs (see src.data.archive)
+        self.archive_payloads = settings.RAW_ARCHIVE_ENABLED if archive_payloads is None else archive_payloads
+        self.budget_per_hour = budget_per_hour
+        self.cycle_minutes = cycle_minutes
+        self.seed_batch_size = seed_batch_size
+
+    @property
+    def cycle_budget(self) -> int:
+        return max(1, round(self.budget_per_hour * self.cycle_minutes / 60))
+
+    @staticmethod
+    def _new_entry(entity: str, record_id: str, tier: str, interval: timedelta, now: datetime) -> Dict[str, Any]:
+        # Records already in the database were synced recently by the bulk syncs;
+        # spreading their first revisit over one interval avoids a burst of due entries
+        return {
+            'entity': entity,
+            'record_id': record_id,
+            'tier': tier,
+            'interval_seconds': int(interval.total_seconds()),
+            'next_due_at': now + interval * random.random(),
+            'checks': 0,
+            'changes': 0,
+        }
+
+    def seed(self, now: Optional[datetime] = None) -> int:
+        """Register records (and reference partitions) that have no freshness entry yet."""
+        now = now or datetime.utcnow()
+        registered = 0
+        for policy in POLICIES.values():
+            rows = self.repository.unregistered(policy.entity, policy.model, list(policy.columns), self.seed_batch_size)
+            entries = []
+            for row in rows:
+                tier = policy.classify(row._mapping, now)
+                entries.append(self._new_entry(policy.entity, str(row.id), tier, policy.intervals[tier], now))
+            registered += self.repository.register(entries)
+        registered += self.repository.register([
+            self._new_entry(REFERENCE_ENTITY, endpoint, 'padrao', REFERENCE_INTERVAL, now)
+            for endpoint in REFERENCE_ENDPOINTS
+        ])
+        return registered
+
+    def pick(self, limit: int, now: Optional[datetime] = None) -> List[Any]:
+        """
+        Due entries to refresh, most overdue relative to their own interval first,
+        so volatile records win over rarely changing ones that are equally late.
+        """
+        return self.repository.due(now or datetime.utcnow(), limit)
+
+    def _record(self, entry: Any, changed: bool, tier: str, base: timedelta, now: datetime) -> None:
+        entry.interval_seconds = next_interval(entry, base, changed, tier != entry.tier)
+        entry.tier = tier
+        entry.last_synced_at = now
+        entry.next_due_at = now + timedelta(seconds=entry.interval_seconds)
+        entry.checks = (entry.checks or 0) + 1
+        if changed:
+            entry.changes = (entry.changes or 0) + 1
+            entry.last_changed_at = now
+
+    def _postpone(self, entry: Any, now: datetime) -> None:
+        delay = RETRY_DELAY
+        if entry.interval_seconds:
+            delay = min(delay, timedelta(seconds=entry.interval_seconds))
+        entry.next_due_at = now + delay
+
+    async def _refresh_records(self, policy: RefreshPolicy, entries: List[Any], now: datetime) -> Dict[str, int]:
+        uris = [policy.endpoint.format(id=entry.record_id) for entry in entries]
+        responses = await asyncio.gather(*[camara_api_client.get(uri) for uri in uris])
+        codec = get_codec(policy.model)
+        archiver = PayloadArchiver(policy.model.__tablename__) if self.archive_payloads else None
+        rows, fetched = [], []
+        for entry, uri, response in zip(entries, uris, responses):
+            if response and response.get('dados'):
+                if archiver is not None:
+                    archiver.add(uri, response['dados'])
+                rows.append(codec.decode(response['dados']))
+                fetched.append(entry)
+            else:
+                self._postpone(entry, now)
+
+        if archiver is not None:
+            RawPayloadRepository(self.session).store(archiver.entity, archiver.drain())
+        # Written rows are the ones whose content hash changed
+        result = bulk_upsert(self.session, policy.model, rows, returning=True)
+        written = {str(pk) for pk in result.returned}
+        for entry, row in zip(fetched, rows):
+            tier = policy.classify(row, now)
+            self._record(entry, entry.record_id in written, tier, policy.intervals[tier], now)
+        self.session.commit()
+        return {'refreshed': len(fetched), 'changed': len(written), 'failed': len(entries) - len(fetched)}
+
+    async def _refresh_reference(self, entry: Any, now: datetime) -> Dict[str, int]:
+        model = REFERENCE_ENDPOINTS.get(entry.record_id)
+        response = await camara_api_client.get(entry.record_id) if model is not None else None
+        if not (response and 'dados' in response):
+            self._postpone(entry, now)
+            self.session.commit()
+            return {'refreshed': 0, 'changed': 0, 'failed': 1}
+        data_list = response['dados']
+        for item in data_list:
+            if 'id' in item and 'cod' not in item:
+                item['cod'] = item.pop('id')
+            if item.get('cod') == '':
+                del item['cod']
+        changed = bulk_upsert_referencias(self.session, model, data_list) > 0
+        self._record(entry, changed, entry.tier, REFERENCE_INTERVAL, now)
+        self.session.commit()
+        return {'refreshed': 1, 'changed': int(changed), 'failed': 0}
+
+    async def run_cycle(self) -> Dict[str, Any]:
+        """Seed new records, then refresh up to one cycle's budget of the stalest entries."""
+        now = datetime.utcnow()
+        seeded = self.seed(now)
+        due = self.repository.count_due(now)
+        entries = self.pick(self.cycle_budget, now)
+        requests_before = camara_api_client.requests_total
+
+        totals = {'refreshed': 0, 'changed': 0, 'failed': 0}
+        by_entity: Dict[str, List[Any]] = {}
+        for entry in entries:
+            by_entity.setdefault(entry.entity, []).append(entry)
+        for entity, group in by_entity.items():
+            if entity == REFERENCE_ENTITY:
+                outcomes = [await self._refresh_reference(entry, now) for entry in group]
+            elif entity in POLICIES:
+                outcomes = [await self._refresh_records(POLICIES[entity], group, now)]
+            else:
+                continue
+            for outcome in outcomes:
+                for key, value in outcome.items():
+                    totals[key] += value
+
+        summary = {
+            'seeded': seeded,
+            'due': due,
+            'budget': self.cycle_budget,
+            'requests': camara_api_client.requests_total - requests_before,
+            **totals,
+        }
+        print(f"Freshness cycle: {summary}")
+        return summary
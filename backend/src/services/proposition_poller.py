@@ -0,0 +1,197 @@
+"""
+Continuous polling for newly filed propositions.
+The poller watches `/proposicoes` ordered by descending ID, syncs the details
+and authors of every proposition above the last ID it saw and hands the new
+IDs to a callback (e.g. the scoring queue). The interval adapts: short during
+legislative session hours and right after new filings, growing while
+nothing new shows up.
+"""
+
+import asyncio
+from datetime import datetime, time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.infra.camara_api import IncompletePaginationError, camara_api_client
+from app.infra.db.models.entidades import Proposicao
+from src.data.archive import PayloadArchiver
+from src.data.codecs import get_codec
+from src.data.repository import BaseRepository, DeadLetterRepository, RawPayloadRepository, SyncStateRepository
+from src.services.data_sync_service import DataSyncService
+
+TIMEZONE = ZoneInfo("America/Sao_Paulo")
+# Plenary and committee sessions: weekdays, 09:00 to 21:00 in Brasília
+SESSION_DAYS = range(0, 5)
+SESSION_HOURS = (time(9), time(21))
+
+# Watermark key in sync_state
+POLLER_ENDPOINT = "/proposicoes"
+POLLER_PARAMS = {"modo": "poller"}
+
+PAGE_SIZE = 100
+# Pages with new filings taken per poll; a longer backlog is worked through over several polls
+MAX_PAGES = 5
+BACKOFF_FACTOR = 1.5
+# In session hours the interval grows to at most this multiple of the session interval
+SESSION_BACKOFF_CEILING = 2
+
+
+def in_session(now: datetime) -> bool:
+    local = now.astimezone(TIMEZONE)
+    return local.weekday() in SESSION_DAYS and SESSION_HOURS[0] <= local.time() < SESSION_HOURS[1]
+
+
+class PropositionPoller:
+    """Long-running watcher of /proposicoes for new entries."""
+
+    def __init__(
+        self,
+        session: Session,
+        on_new: Optional[Callable[[List[int]], Awaitable[Any]]] = None,
+        session_interval: float = 60.0,
+        off_hours_interval: float = 900.0,
+        max_interval: float = 1800.0,
+        max_session_interval: Optional[float] = None,
+    ):
+        self.session = session
+        self.on_new = on_new
+        self.session_interval = session_interval
+        self.off_hours_interval = off_hours_interval
+        # Off hours the interval grows up to `max_interval`; in session it stays small
+        self.max_interval = max_interval
+        self.max_session_interval = max_session_interval or SESSION_BACKOFF_CEILING * session_interval
+        self.state = SyncStateRepository(session)
+        self.sync_service = DataSyncService(session)
+        self.interval = session_interval
+        self.polls = 0
+        self.found = 0
+
+    def last_seen_id(self) -> Optional[int]:
+        watermark = self.state.get_watermark(POLLER_ENDPOINT, POLLER_PARAMS)
+        if watermark:
+            return int(watermark)
+        return self.session.query(func.max(Proposicao.id)).scalar()
+
+    def next_interval(self, found_new: bool, now: Optional[datetime] = None) -> float:
+        """
+        Back to the base interval of the period after new filings, otherwise grow
+        slowly, up to `max_session_interval` in session hours and `max_interval` off hours.
+        """
+        now = now or datetime.now(TIMEZONE)
+        if in_session(now):
+            base, ceiling = self.session_interval, self.max_session_interval
+        else:
+            base, ceiling = self.off_hours_interval, self.max_interval
+        if found_new:
+            return base
+        return min(max(base, self.interval * BACKOFF_FACTOR), max(ceiling, base))
+
+    async def fetch_new(self, last_seen: Optional[int]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Summary items with an ID above `last_seen` that are not stored yet,
+        newest first, and the highest ID listed if the listing was read down to
+        `last_seen` (None when MAX_PAGES cut it short). Pages whose items were
+        all stored by an earlier, cut-short poll do not count towards the cap,
+        so successive polls work through a large backlog. A page that cannot
+        be fetched raises IncompletePaginationError.
+        """
+        new_items = []
+        newest = None
+        params = {"ordem": "DESC", "ordenarPor": "id", "itens": PAGE_SIZE}
+        page = pages_with_new = 0
+        while pages_with_new < MAX_PAGES:
+            page += 1
+            response = await camara_api_client.get(POLLER_ENDPOINT, params={**params, "pagina": page})
+            if response is None:
+                raise IncompletePaginationError(POLLER_ENDPOINT, page)
+            items = response.get('dados') or []
+            # First run without any stored proposition: start watching from here
+            if last_seen is None:
+                return items, max((item['id'] for item in items), default=None)
+            above = [item for item in items if item['id'] > last_seen]
+            if above and newest is None:
+                newest = above[0]['id']
+            stored = {
+                row[0] for row in
+                self.session.query(Proposicao.id).filter(Proposicao.id.in_([item['id'] for item in above]))
+            } if above else set()
+            fresh = [item for item in above if item['id'] not in stored]
+            new_items.extend(fresh)
+            pages_with_new += bool(fresh)
+            if len(above) < len(items) or len(items) < PAGE_SIZE:
+                return new_items, newest
+        return new_items, None
+
+    async def sync_details(self, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        Fetch and store the details of new propositions; returns the IDs stored.
+        Failed fetches go to the dead-letter table, like those of the regular
+        syncs, so `retry-failed` picks them up.
+        """
+        uris = [item['uri'].replace(camara_api_client.base_url, "") for item in items if item.get('uri')]
+        responses = await asyncio.gather(*[camara_api_client.get(uri) for uri in uris])
+        codec = get_codec(Proposicao)
+        # Archived like the details fetched by the regular syncs (see DataSyncService)
+        archiver = PayloadArchiver(Proposicao.__tablename__) if self.sync_service.archive_payloads else None
+        rows, failed = [], []
+        for uri, response in zip(uris, responses):
+            if response and response.get('dados'):
+                if archiver is not None:
+                    archiver.add(uri, response['dados'])
+                rows.append(codec.decode(response['dados']))
+            else:
+                failed.append((uri, camara_api_client.failure_reason(uri)))
+        if failed:
+            DeadLetterRepository(self.session).record("detail", Proposicao.__tablename__, failed)
+            print(f"{len(failed)} proposition details failed; saved for a later retry (retry-failed).")
+        if archiver is not None:
+            RawPayloadRepository(self.session).store(archiver.entity, archiver.drain())
+        BaseRepository(self.session, Proposicao).bulk_upsert(rows)
+        return [row['id'] for row in rows]
+
+    async def poll_once(self) -> List[int]:
+        """One poll: find, store and announce new propositions."""
+        self.polls += 1
+        last_seen = self.last_seen_id()
+        items, newest = await self.fetch_new(last_seen)
+        if not items and newest is None:
+            return []
+        if last_seen is None:
+            # Nothing stored yet: the backlog belongs to the regular syncs
+            self.state.set_watermark(POLLER_ENDPOINT, POLLER_PARAMS, str(newest), 0)
+            print(f"Poller starting after proposition {newest}.")
+            return []
+
+        stored_ids = await self.sync_details(items) if items else []
+        if stored_ids:
+            await self.sync_service.sync_proposition_authors(stored_ids, strategy="per-proposition")
+        if newest is not None:
+            # Propositions whose details failed are in the dead-letter table (see sync_details)
+            self.state.set_watermark(POLLER_ENDPOINT, POLLER_PARAMS, str(newest), len(stored_ids))
+            print(f"Poller found {len(items)} new propositions ({len(stored_ids)} stored), up to ID {newest}.")
+        else:
+            # The IDs between the watermark and the oldest one listed are still unseen
+            print(f"Poller found {len(items)} new propositions ({len(stored_ids)} stored); "
+                  f"more than {MAX_PAGES} pages are new, continuing on the next poll.")
+        self.found += len(stored_ids)
+
+        if stored_ids and self.on_new is not None:
+            await self.on_new(stored_ids)
+        return stored_ids
+
+    async def run(self, max_polls: Optional[int] = None) -> None:
+        """Poll until cancelled (or `max_polls` polls), sleeping the adaptive interval in between."""
+        while max_polls is None or self.polls < max_polls:
+            try:
+                new_ids = await self.poll_once()
+            except Exception as e:
+                self.session.rollback()
+                print(f"Poll failed: {e}")
+                new_ids = []
+            self.interval = self.next_interval(bool(new_ids))
+            if max_polls is not None and self.polls >= max_polls:
+                break
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,144 @@
+"""
+Offline re-transformation from the raw payload archive.
+Every fetched payload is kept compressed in `raw_payloads` (see
+src.data.archive). After a model gains a column or a flattening bug is fixed,
+`reprocess` rebuilds the tables from the latest archived version of each URI
+instead of re-downloading them: payloads are decompressed and decoded in
+parallel across worker processes while the main process writes the rows.
+No request is made to the API. Rows whose content did not change are skipped
+by the content hash, so only what the new transformation affects is rewritten;
+`force` rewrites every row, e.g. after the stored rows were edited by hand.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.infra.db.models import entidades  # noqa: F401 (maps the tables looked up by name)
+from app.infra.db.models.referencias import Base
+from src.data.archive import load_payload
+from src.data.codecs import get_codec
+from src.data.repository import BaseRepository, ChildRepository, RawPayloadRepository
+from src.data.upsert import bulk_upsert
+from src.services.data_sync_service import DataSyncService
+
+# (parent_fk, parent_id, codec, compressed payload)
+ArchivedPayload = Tuple[Optional[str], Optional[str], str, bytes]
+
+
+def _decode_chunk(entity: str, chunk: List[ArchivedPayload]) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """
+    Runs in a worker process: decompress and transform archived payloads the
+    same way the sync does. Returns the rows and, for child tables, their parents.
+    """
+    model = DataSyncService._model_for_table(entity)
+    codec = get_codec(model)
+    rows, parents = [], []
+    for parent_fk, parent_id, codec_name, blob in chunk:
+        payload = load_payload(codec_name, blob)
+        if parent_fk is None:
+            rows.append(codec.decode(payload))
+            continue
+        parent = model.__table__.columns[parent_fk].type.python_type(parent_id)
+        parents.append(parent)
+        for child_data in payload:
+            child_data[parent_fk] = parent
+            child_data.pop('id', None)
+            rows.append(codec.decode(child_data))
+    return rows, parents
+
+
+class _InlineExecutor(Executor):
+    """Decodes in the calling process (a single worker)."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class Reprocessor:
+    """Rebuilds tables from archived payloads, decoding chunks in parallel."""
+
+    def __init__(self, session: Session, workers: Optional[int] = None, chunk_size: int = 500,
+                 force: bool = False):
+        self.session = session
+        self.force = force
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.archive = RawPayloadRepository(session)
+
+    def _write(self, model: Type[Base], parent_fk: Optional[str], rows: List[Dict[str, Any]],
+               parents: List[Any]) -> int:
+        if parent_fk is None:
+            pk_name = model.__mapper__.primary_key[0].name
+            unique_rows = list({row.get(pk_name, id(row)): row for row in rows}.values())
+            written = bulk_upsert(self.session, model, unique_rows, index_elements=[pk_name],
+                                  only_changed=not self.force).written
+            self.session.commit()
+            return written
+        if ChildRepository.find_natural_key(model.__table__, parent_fk):
+            written = ChildRepository(self.session, model, parent_fk).upsert(rows, only_changed=not self.force)
+            self.session.commit()
+            return written
+        # Without a natural key the children of each parent are replaced as a whole
+        fk_column = model.__table__.columns[parent_fk]
+        for start in range(0, len(parents), 5000):
+            self.session.execute(delete(model.__table__).where(fk_column.in_(parents[start:start + 5000])))
+        return BaseRepository(self.session, model).bulk_insert(rows)
+
+    def reprocess_entity(self, executor: Executor, entity: str) -> Dict[str, Any]:
+        model = DataSyncService._model_for_table(entity)
+        stats = {"entity": entity, "payloads": 0, "rows": 0, "written": 0}
+        started = time.monotonic()
+        in_flight: deque = deque()
+        parent_fk = None
+
+        def collect(future: Future) -> None:
+            rows, parents = future.result()
+            stats["rows"] += len(rows)
+            stats["written"] += self._write(model, parent_fk, rows, parents)
+
+        chunk: List[ArchivedPayload] = []
+        for row in self.archive.iter_latest(entity, page_size=self.chunk_size):
+            parent_fk = row.parent_fk
+            chunk.append((row.parent_fk, row.parent_id, row.codec, row.payload))
+            stats["payloads"] += 1
+            if len(chunk) >= self.chunk_size:
+                in_flight.append(executor.submit(_decode_chunk, entity, chunk))
+                chunk = []
+                # Bounded look-ahead keeps every worker busy without loading the whole archive
+                if len(in_flight) >= self.workers * 2:
+                    collect(in_flight.popleft())
+        if chunk:
+            in_flight.append(executor.submit(_decode_chunk, entity, chunk))
+        while in_flight:
+            collect(in_flight.popleft())
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
+        print(f"Reprocessed {entity}: {stats['payloads']} payloads -> {stats['rows']} rows "
+              f"({stats['written']} written) in {stats['seconds']}s.")
+        return stats
+
+    def run(self, entities: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        entities = list(entities or self.archive.entities())
+        if not entities:
+            print("The raw payload archive is empty.")
+            return []
+        print(f"--- Reprocessing {', '.join(entities)} from the archive with {self.workers} workers ---")
+        if self.workers > 1:
+            # Spawned workers start clean instead of inheriting the parent's connections
+            executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = _InlineExecutor()
+        with executor:
+            return [self.reprocess_entity(executor, entity) for entity in entities]
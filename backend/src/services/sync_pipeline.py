@@ -0,0 +1,176 @@
+"""
+Streaming fetch -> transform -> write pipeline used by the data sync service.
+Stages are connected by bounded queues, so memory stays flat regardless of
+how many records are synced and a slow request never blocks unrelated ones.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+# Marks the end of the stream in every queue
+_DONE = object()
+# Follows the last row of a work item in the row queue
+_ITEM_END = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for a single pipeline stage."""
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.items} items, {self.rate:.1f}/s, busy {self.busy_seconds:.1f}s of {self.elapsed:.1f}s"
+
+
+class SyncPipeline:
+    """
+    Staged async pipeline: discovery producer -> N fetch workers -> transform -> batching writer.
+
+    - `source` yields work items (e.g. detail endpoints or parent IDs).
+    - `fetch(item)` downloads one item; a `None` result counts as a failure
+      and is reported to `on_failure(item)`.
+    - `transform(item, response)` turns a response into zero or more rows.
+    - `write(rows, items)` persists one batch; `items` are the work items whose
+      rows are all included in this or earlier batches, which lets callers
+      checkpoint progress. It may be a plain function or a coroutine.
+
+    A batch is flushed after `batch_size` work items or `row_batch_size` rows
+    (defaults to `batch_size`), whichever comes first.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[Any],
+        fetch: Callable[[Any], Awaitable[Any]],
+        transform: Callable[[Any, Any], Iterable[Dict[str, Any]]],
+        write: Callable[[List[Dict[str, Any]], List[Any]], Any],
+        workers: int = 10,
+        batch_size: int = 50,
+        queue_size: Optional[int] = None,
+        on_failure: Optional[Callable[[Any], Any]] = None,
+        row_batch_size: Optional[int] = None,
+    ):
+        self.source = source
+        self.fetch = fetch
+        self.transform = transform
+        self.write = write
+        self.on_failure = on_failure
+        self.failed = 0
+        self.workers = workers
+        self.batch_size = batch_size
+        self.row_batch_size = row_batch_size or batch_size
+        queue_size = queue_size or workers * 2
+        self.work_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.response_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.row_queue: asyncio.Queue = asyncio.Queue(maxsize=self.row_batch_size * 2)
+        self.stats = {
+            name: StageStats(name)
+            for name in ("discovery", "fetch", "transform", "write")
+        }
+        self._active_workers = workers
+
+    async def _discover(self):
+        stats = self.stats["discovery"]
+        async for item in self.source:
+            stats.items += 1
+            await self.work_queue.put(item)
+        for _ in range(self.workers):
+            await self.work_queue.put(_DONE)
+        stats.finished_at = time.monotonic()
+
+    async def _fetch_worker(self):
+        stats = self.stats["fetch"]
+        while True:
+            item = await self.work_queue.get()
+            if item is _DONE:
+                break
+            started = time.monotonic()
+            response = await self.fetch(item)
+            stats.busy_seconds += time.monotonic() - started
+            stats.items += 1
+            if response is not None:
+                await self.response_queue.put((item, response))
+            else:
+                self.failed += 1
+                if self.on_failure is not None:
+                    result = self.on_failure(item)
+                    if asyncio.iscoroutine(result):
+                        await result
+
+        self._active_workers -= 1
+        if self._active_workers == 0:
+            stats.finished_at = time.monotonic()
+            await self.response_queue.put(_DONE)
+
+    async def _transform(self):
+        stats = self.stats["transform"]
+        while True:
+            entry = await self.response_queue.get()
+            if entry is _DONE:
+                break
+            started = time.monotonic()
+            rows = list(self.transform(*entry))
+            stats.busy_seconds += time.monotonic() - started
+            stats.items += 1
+            for row in rows:
+                await self.row_queue.put(row)
+            await self.row_queue.put((_ITEM_END, entry[0]))
+        await self.row_queue.put(_DONE)
+        stats.finished_at = time.monotonic()
+
+    async def _flush(self, batch: List[Dict[str, Any]], items: List[Any]):
+        stats = self.stats["write"]
+        started = time.monotonic()
+        result = self.write(batch, items)
+        if asyncio.iscoroutine(result):
+            await result
+        stats.busy_seconds += time.monotonic() - started
+        stats.items += len(batch)
+
+    async def _writer(self):
+        batch, items = [], []
+        while True:
+            row = await self.row_queue.get()
+            if row is _DONE:
+                break
+            if isinstance(row, tuple) and row[0] is _ITEM_END:
+                items.append(row[1])
+                # Items without rows still need to be flushed eventually to be checkpointed
+                if len(items) < self.batch_size:
+                    continue
+            else:
+                batch.append(row)
+                if len(batch) < self.row_batch_size:
+                    continue
+            await self._flush(batch, items)
+            batch, items = [], []
+        if batch or items:
+            await self._flush(batch, items)
+        self.stats["write"].finished_at = time.monotonic()
+
+    async def run(self) -> Dict[str, StageStats]:
+        """Run all stages to completion; any stage failure cancels the others."""
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._discover())
+            for _ in range(self.workers):
+                group.create_task(self._fetch_worker())
+            group.create_task(self._transform())
+            group.create_task(self._writer())
+        return self.stats
+
+    def report(self) -> str:
+        return "\n".join(f"  - {stats}" for stats in self.stats.values())
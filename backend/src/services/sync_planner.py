@@ -0,0 +1,200 @@
+"""
+Dry-run planning of a sync.
+Only the cheap discovery calls are made: the first and last page of each list
+(the `last` link gives the page count, the last page gives the exact total).
+Parent counts for child tables come from the database. Each stage is then
+estimated in list pages, detail calls and child calls, net of what the
+response cache, the incremental watermarks and resumable checkpoints would
+save, with an expected duration under the current rate limit.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.infra.camara_api import CamaraAPI, camara_api_client
+from app.infra.db.models.entidades import Proposicao
+from app.infra.db.models.referencias import Base
+from src.data.repository import CheckpointRepository, ProposicaoRepository
+from src.services.data_sync_service import DataSyncService, INCREMENTAL_FILTERS
+
+DEFAULT_PAGE_SIZE = 15
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}min"
+    return f"{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}min"
+
+
+@dataclass
+class StagePlan:
+    """Estimated API calls of one sync stage."""
+    stage: str
+    list_pages: int = 0
+    detail_calls: int = 0
+    child_calls: int = 0
+    saved: int = 0  # calls a real run would avoid (cache, watermark, checkpoint)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        return self.list_pages + self.detail_calls + self.child_calls
+
+
+class SyncPlanner:
+    """Estimates the requests and duration of sync stages without running them."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.service = DataSyncService(session)
+        self.checkpoints = CheckpointRepository(session)
+        self.latencies: List[float] = []
+        self.stages: List[StagePlan] = []
+
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        started = time.monotonic()
+        response = await camara_api_client.get(endpoint, params=params)
+        self.latencies.append(time.monotonic() - started)
+        return response
+
+    async def count_items(self, endpoint: str, params: Dict[str, Any]) -> Tuple[int, int]:
+        """(pages, items) of a paginated list, from its first and last page."""
+        params = {**params, 'pagina': 1}
+        first = await self._get(endpoint, params)
+        if not (first and first.get('dados')):
+            return (1 if first is not None else 0), 0
+        last_page = CamaraAPI.last_page(first)
+        if last_page is None or last_page <= 1:
+            return 1, len(first['dados'])
+        last = await self._get(endpoint, {**params, 'pagina': last_page})
+        page_size = int(params.get('itens', DEFAULT_PAGE_SIZE))
+        last_items = len(last['dados']) if last and last.get('dados') else page_size
+        return last_page, (last_page - 1) * page_size + last_items
+
+    def _checkpoint(self, plan: StagePlan, checkpoint_key: Optional[str], resume: bool) -> Optional[int]:
+        """Items still pending in a resumable checkpoint, or None when the stage starts fresh."""
+        checkpoint = self.checkpoints.get(checkpoint_key) if checkpoint_key and resume else None
+        if checkpoint is None or checkpoint.discovered is None:
+            return None
+        if checkpoint.status == "done":
+            plan.notes.append("checkpoint already completed, skipped")
+            return 0
+        ranges = checkpoint.completed_ranges or []
+        pending = sum(1 for offset in range(len(checkpoint.discovered))
+                      if not self.checkpoints.is_completed(ranges, offset))
+        plan.notes.append(f"resumes checkpoint: {len(checkpoint.discovered) - pending} "
+                          f"of {len(checkpoint.discovered)} items already synced")
+        return pending
+
+    def _fresh_in_cache(self, prefix: str) -> int:
+        cache = camara_api_client.cache
+        return cache.count_fresh(prefix) if cache is not None else 0
+
+    async def plan_details(self, stage: str, endpoint: str, params: Dict[str, Any],
+                           checkpoint_key: Optional[str] = None, resume: bool = False,
+                           incremental: bool = False) -> StagePlan:
+        """A `sync_entity_with_details` (or `sync_incremental`) stage: list pages plus one call per item."""
+        plan = StagePlan(stage)
+        self.stages.append(plan)
+        pending = self._checkpoint(plan, checkpoint_key, resume)
+        run_params, watermark = params, None
+        if incremental:
+            run_params, _, watermark = self.service.incremental_params(endpoint, params)
+        if pending is not None:
+            checkpoint = self.checkpoints.get(checkpoint_key)
+            if checkpoint.status == "done":
+                return plan
+            # Discovery runs again; only items the checkpoint does not know yet are new
+            plan.list_pages, total = await self.count_items(endpoint, run_params)
+            plan.detail_calls = pending + max(0, total - len(checkpoint.discovered))
+            return plan
+
+        if incremental and watermark:
+            full_pages, full_items = await self.count_items(endpoint, params)
+            since = run_params[INCREMENTAL_FILTERS[endpoint]]
+            plan.list_pages, plan.detail_calls = await self.count_items(endpoint, run_params)
+            plan.saved += (full_pages - plan.list_pages) + (full_items - plan.detail_calls)
+            plan.notes.append(f"watermark {watermark}: only since {since} "
+                              f"({full_items - plan.detail_calls} of {full_items} items skipped)")
+            return plan
+        plan.list_pages, plan.detail_calls = await self.count_items(endpoint, run_params)
+
+        fresh = min(plan.detail_calls, self._fresh_in_cache(f"{endpoint}/"))
+        if fresh:
+            plan.detail_calls -= fresh
+            plan.saved += fresh
+            plan.notes.append(f"up to {fresh} detail responses still fresh in the cache")
+        return plan
+
+    async def plan_children(self, stage: str, parent_model: Type[Base], paginated: bool = True,
+                            parent_count: Optional[int] = None, checkpoint_key: Optional[str] = None,
+                            resume: bool = False) -> StagePlan:
+        """A `sync_child_entities` stage: one call per parent (at least one page each when paginated)."""
+        plan = StagePlan(stage)
+        self.stages.append(plan)
+        pending = self._checkpoint(plan, checkpoint_key, resume)
+        if pending is None:
+            stored = self.session.query(func.count()).select_from(parent_model).scalar() or 0
+            pending = max(stored, parent_count or 0)
+            plan.notes.append(f"{pending} {parent_model.__tablename__} parents")
+        plan.child_calls = pending
+        if paginated:
+            plan.notes.append("at least one page per parent")
+        return plan
+
+    def plan_tramitacoes(self, stage: str, new_propositions: int = 0, checkpoint_key: Optional[str] = None,
+                         resume: bool = False) -> StagePlan:
+        """
+        `sync_tramitacoes`: only stored propositions whose status moved, plus
+        `new_propositions` not stored yet that this run is about to sync.
+        """
+        plan = StagePlan(stage)
+        self.stages.append(plan)
+        pending = self._checkpoint(plan, checkpoint_key, resume)
+        if pending is None:
+            stale = len(ProposicaoRepository(self.session, Proposicao).get_with_stale_tramitacoes())
+            stored = self.session.query(func.count(Proposicao.id)).scalar() or 0
+            pending = stale + new_propositions
+            plan.saved += max(0, stored - stale)
+            plan.notes.append(f"{stale} stored propositions moved + {new_propositions} new in this run")
+        plan.child_calls = pending
+        return plan
+
+    def throughput(self) -> Tuple[float, float]:
+        """
+        Expected requests per second now and at the limiter's ceiling: the rate
+        limit, unless the concurrency limit over the latency seen while planning is lower.
+        """
+        limiter = camara_api_client.rate_limiter
+        latency = sum(self.latencies) / len(self.latencies) if self.latencies else 0
+        if not latency:
+            return limiter.rate, limiter.max_rate
+        return (min(limiter.rate, limiter.concurrency_limit / latency),
+                min(limiter.max_rate, limiter.max_concurrency / latency))
+
+    def report(self) -> Dict[str, Any]:
+        rate, best_rate = self.throughput()
+        total = sum(plan.requests for plan in self.stages)
+        print(f"\n{'stage':<14}{'list pages':>12}{'details':>10}{'children':>10}{'requests':>10}{'saved':>9}  notes")
+        for plan in self.stages:
+            print(f"{plan.stage:<14}{plan.list_pages:>12,}{plan.detail_calls:>10,}{plan.child_calls:>10,}"
+                  f"{plan.requests:>10,}{plan.saved:>9,}  {'; '.join(plan.notes)}")
+        eta, best_eta = total / rate, total / best_rate
+        print(f"\nTotal: {total:,} requests ({sum(p.saved for p in self.stages):,} avoided). "
+              f"Expected duration: {format_duration(eta)} at {rate:.1f} req/s "
+              f"(best case {format_duration(best_eta)} at {best_rate:.1f} req/s). "
+              f"Planning itself made {len(self.latencies)} requests.")
+        return {
+            "stages": [{**vars(plan), "requests": plan.requests} for plan in self.stages],
+            "requests": total,
+            "rate": rate,
+            "eta_seconds": eta,
+            "best_eta_seconds": best_eta,
+        }
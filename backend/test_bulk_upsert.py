@@ -0,0 +1,86 @@
+"""
+Checks the bulk write paths (src.data.upsert, src.data.copy_loader) against an
+in-memory SQLite database; the COPY path is checked for how it splits rows.
+"""
+
+import sys
+import os
+from datetime import date
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.infra.db.models import entidades as models
+from app.infra.db.models.referencias import Base
+from src.data import copy_loader
+from src.data.upsert import UpsertResult, bulk_upsert
+
+DESPESA_KEY = ["deputado_id", "codDocumento", "parcela"]
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def despesa(cod, **values):
+    return {"deputado_id": 1, "codDocumento": cod, "parcela": 0, **values}
+
+
+def test_partial_row_keeps_missing_columns():
+    session = make_session()
+    copy_loader.bulk_load(session, models.Despesa, [
+        despesa(1, ano=2023, tipoDespesa="COMBUSTÍVEIS", valorLiquido=10.0),
+        despesa(2, ano=2023, tipoDespesa="PASSAGENS", valorLiquido=20.0),
+    ], index_elements=DESPESA_KEY)
+    copy_loader.bulk_load(session, models.Despesa, [
+        despesa(1, valorLiquido=15.0),
+        despesa(2, ano=2023, tipoDespesa="PASSAGENS", valorLiquido=25.0),
+    ], index_elements=DESPESA_KEY)
+    stored = session.execute(
+        select(models.Despesa.codDocumento, models.Despesa.tipoDespesa, models.Despesa.valorLiquido)
+        .order_by(models.Despesa.codDocumento)
+    ).all()
+    assert stored == [(1, "COMBUSTÍVEIS", 15.0), (2, "PASSAGENS", 25.0)]
+
+
+def test_copy_merge_gets_one_column_set_per_staging_table(monkeypatch):
+    calls = []
+
+    def record(kind):
+        def write(session, table, rows, *args, **kwargs):
+            calls.append((kind, {tuple(sorted(row)) for row in rows}))
+            return UpsertResult(rows=len(rows), written=len(rows), statements=1)
+        return write
+
+    monkeypatch.setattr(copy_loader, "_copy_merge", record("copy"))
+    monkeypatch.setattr(copy_loader, "bulk_upsert", record("upsert"))
+    session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    rows = ([despesa(cod, ano=2023, dataDocumento=date(2023, 1, 1)) for cod in range(4)]
+            + [despesa(cod, valorLiquido=1.0) for cod in range(4, 6)])
+
+    result = copy_loader.bulk_load(session, models.Despesa, rows, index_elements=DESPESA_KEY, min_rows=3)
+    assert result.rows == 6 and result.written == 6
+    assert sorted(kind for kind, _ in calls) == ["copy", "upsert"]
+    assert all(len(column_sets) == 1 for _, column_sets in calls)
+
+
+def test_unchanged_hash_writes_nothing():
+    session = make_session()
+    partido = {"id": 1, "sigla": "PX", "nome": "Partido X"}
+    first = bulk_upsert(session, models.Partido, [dict(partido)], returning=True)
+    stored_hash = session.execute(select(models.Partido.content_hash)).scalar()
+
+    again = bulk_upsert(session, models.Partido, [dict(partido)], returning=True)
+    changed = bulk_upsert(session, models.Partido, [dict(partido, nome="Partido Y")], returning=True)
+
+    assert first.written == 1 and first.returned == [1]
+    assert again.written == 0 and again.returned == [] and again.unchanged == 1
+    assert changed.written == 1
+    assert session.execute(select(models.Partido.content_hash)).scalar() != stored_hash
@@ -0,0 +1,111 @@
+"""
+Checks that diff-based child syncs only prune rows inside the window they fetched.
+Runs against an in-memory SQLite database; no API access needed.
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.infra.db.models import entidades as models
+from app.infra.db.models.referencias import Base
+from src.data.repository import ChildRepository, ChildKeyTracker
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def despesa(ano, cod, valor=10.0):
+    return {"deputado_id": 1, "ano": ano, "mes": 1, "codDocumento": cod, "parcela": 0,
+            "dataDocumento": date(ano, 1, 10), "valorLiquido": valor}
+
+
+def sync_despesas(session, ano, rows):
+    repository = ChildRepository(session, models.Despesa, "deputado_id")
+    repository.sync(rows, {1: {ChildRepository.key_of(repository.natural_key, r) for r in rows}},
+                    {"ano": ano, "itens": 100})
+    return repository
+
+
+def stored_years(session):
+    return sorted(session.execute(select(models.Despesa.ano, models.Despesa.codDocumento)).all())
+
+
+def test_second_year_keeps_first_year():
+    session = make_session()
+    sync_despesas(session, 2022, [despesa(2022, 1), despesa(2022, 2)])
+    repository = sync_despesas(session, 2023, [despesa(2023, 3)])
+    assert repository.deleted == 0
+    assert stored_years(session) == [(2022, 1), (2022, 2), (2023, 3)]
+
+
+def test_empty_window_keeps_other_years():
+    session = make_session()
+    sync_despesas(session, 2022, [despesa(2022, 1)])
+    sync_despesas(session, 2023, [])
+    assert stored_years(session) == [(2022, 1)]
+
+
+def test_vanished_rows_inside_window_are_deleted():
+    session = make_session()
+    sync_despesas(session, 2022, [despesa(2022, 1), despesa(2022, 2)])
+    sync_despesas(session, 2023, [despesa(2023, 3)])
+    repository = sync_despesas(session, 2022, [despesa(2022, 2)])
+    assert repository.deleted == 1
+    assert stored_years(session) == [(2022, 2), (2023, 3)]
+
+
+def test_date_window_for_discursos():
+    session = make_session()
+    repository = ChildRepository(session, models.Discurso, "deputado_id")
+    old = {"deputado_id": 1, "dataHoraInicio": datetime(2022, 5, 1, 10)}
+    new = {"deputado_id": 1, "dataHoraInicio": datetime(2023, 5, 1, 10)}
+    repository.upsert([old, new])
+    repository.sync([], {1: set()}, {"dataInicio": "2023-01-01", "dataFim": "2023-04-30"})
+    assert session.execute(select(models.Discurso.dataHoraInicio)).scalars().all() == [old["dataHoraInicio"],
+                                                                                       new["dataHoraInicio"]]
+    repository.sync([], {1: set()}, {"dataInicio": "2023-01-01", "itens": 100})
+    assert session.execute(select(models.Discurso.dataHoraInicio)).scalars().all() == [old["dataHoraInicio"]]
+
+
+def test_unknown_filter_skips_pruning():
+    session = make_session()
+    repository = ChildRepository(session, models.Despesa, "deputado_id")
+    repository.upsert([despesa(2022, 1)])
+    repository.sync([], {1: set()}, {"cnpjCpfFornecedor": "123"})
+    assert repository.deleted == 0
+    assert stored_years(session) == [(2022, 1)]
+
+
+
+def test_backfill_partitions_are_scoped_to_their_year():
+    from src.services.backfill import _despesas_params, _discursos_params
+    session = make_session()
+    sync_despesas(session, 2022, [despesa(2022, 1)])
+    repository = ChildRepository(session, models.Despesa, "deputado_id")
+    repository.sync([despesa(2023, 2)], {1: {(1, 2, 0)}}, _despesas_params(2023))
+    assert stored_years(session) == [(2022, 1), (2023, 2)]
+    assert ChildRepository(session, models.Discurso, "deputado_id").window_clauses(_discursos_params(2022))
+
+
+def test_missing_key_parts_are_filled():
+    session = make_session()
+    row = {"deputado_id": 1, "ano": 2022, "mes": 3, "tipoDespesa": "COMBUSTÍVEIS", "valorDocumento": 50.0}
+    tracker = ChildKeyTracker(["deputado_id", "codDocumento", "parcela"], "deputado_id", "despesas")
+    tracker.add([row])
+    repository = ChildRepository(session, models.Despesa, "deputado_id")
+    repository.sync([row], tracker.pop([1]), {"ano": 2022})
+    repository.sync([dict(row, codDocumento=None, parcela=None)], {1: set()}, {"ano": 2023})
+    stored = session.execute(select(models.Despesa.codDocumento, models.Despesa.parcela)).all()
+    assert repository.skipped == 0
+    assert len(stored) == 1 and stored[0].parcela == 0 and stored[0].codDocumento < 0